@@ -0,0 +1,156 @@
+"""
+Generates synthetic courses of a given size for benchmarking.
+
+The course is written as a single `course.canvas.md.xml.jinja` file (plus the files it includes and zips)
+and exercises the main parts of the pipeline: Jinja, Markdown, includes nested several levels deep,
+course links between pages, zips, mermaid diagrams, quizzes and modules.
+"""
+import argparse
+import dataclasses
+from pathlib import Path
+
+
+@dataclasses.dataclass
+class CourseShape:
+    pages: int = 50
+    quizzes: int = 10
+    questions: int = 10  # per quiz
+    include_depth: int = 3
+    zips: int = 5
+    zip_files: int = 10  # per zip
+    mermaids: int = 5
+
+    def resource_count(self) -> int:
+        """Approximate number of resources: content, questions, zips, diagrams and module items."""
+        quiz_resources = self.quizzes * (self.questions + 2)  # + quiz and question order
+        content = self.pages + quiz_resources + self.zips + self.mermaids
+        module_items = self.pages + self.quizzes
+        return content + module_items + 1  # + module
+
+
+GLOBAL_ARGS = {'term': 'Fall 2026', 'instructor': 'Dr. Synthetic'}
+
+
+def _write_includes(root: Path, depth: int) -> str | None:
+    """Write a chain of include files, each including the next. Returns the path of the first."""
+    if depth == 0:
+        return None
+
+    include_dir = root / 'includes'
+    include_dir.mkdir(exist_ok=True)
+    for level in range(depth):
+        nested = f'\n<include path="level_{level + 1}.md" />\n' if level + 1 < depth else ''
+        (include_dir / f'level_{level}.md').write_text(
+            f'### Included section {level}\n\n'
+            f'Shared text at depth {level}, with **emphasis** and a [link](https://example.com).\n'
+            f'{nested}'
+        )
+    return 'includes/level_0.md'
+
+
+def _write_zips(root: Path, shape: CourseShape) -> list[str]:
+    paths = []
+    for z in range(shape.zips):
+        zip_dir = root / 'zips' / f'lab_{z}'
+        zip_dir.mkdir(parents=True, exist_ok=True)
+        for f in range(shape.zip_files):
+            (zip_dir / f'file_{f}.py').write_text(f'def lab_{z}_function_{f}():\n    return {f}\n' * 20)
+        paths.append(f'zips/lab_{z}')
+    return paths
+
+
+def _page(index: int, shape: CourseShape, include_path: str | None, zip_path: str | None) -> str:
+    next_page = f'<course-link type="page" id="page_{(index + 1) % shape.pages}">next page</course-link>'
+    include = f'<include path="{include_path}" />' if include_path else ''
+    zip_tag = f'Starter files: <zip name="lab_{index}.zip" path="{zip_path}" />' if zip_path else ''
+    mermaid = (
+        f'<mermaid>\ngraph TD\n    A{index}[Start] --> B{index}{{Decision}}\n    B{index} --> C{index}[Done]\n</mermaid>'
+        if index < shape.mermaids else ''
+    )
+    return f'''
+<page id="page_{index}" title="Page {index}">
+# Page {index} - {{{{ term }}}}
+
+Taught by {{{{ instructor }}}}. See the {next_page}.
+
+{{% for topic in ['syntax', 'semantics', 'style'] %}}
+- Topic {{{{ topic }}}} for page {index}
+{{% endfor %}}
+
+```python
+def example_{index}():
+    return {index} * 2
+```
+
+{include}
+
+{zip_tag}
+
+{mermaid}
+</page>
+'''
+
+
+def _quiz(index: int, shape: CourseShape) -> str:
+    questions = '\n'.join(f'''
+    <question id="q{index}_{q}" type="multiple-choice">
+        Question {q} of quiz {index}: what is `{q} + {index}`?
+
+        <correct>{q + index}</correct>
+        <incorrect>{q + index + 1}</incorrect>
+        <incorrect>{q + index + 2}</incorrect>
+    </question>''' for q in range(shape.questions))
+
+    return f'''
+<quiz id="quiz_{index}" title="Quiz {index}">
+<description>
+    Quiz {index} for {{{{ term }}}}.
+</description>
+<questions>
+{questions}
+</questions>
+</quiz>
+'''
+
+
+def _module(shape: CourseShape) -> str:
+    items = '\n'.join(
+        [f'    <item type="page" content_id="page_{i}" />' for i in range(shape.pages)]
+        + [f'    <item type="quiz" content_id="quiz_{i}" />' for i in range(shape.quizzes)]
+    )
+    return f'<module id="everything" title="Everything">\n{items}\n</module>\n'
+
+
+def generate_course(root: Path, shape: CourseShape) -> Path:
+    """Writes the course to root and returns the path of the input file."""
+    root.mkdir(parents=True, exist_ok=True)
+
+    include_path = _write_includes(root, shape.include_depth)
+    zip_paths = _write_zips(root, shape)
+
+    parts = [
+        _page(i, shape, include_path, zip_paths[i] if i < len(zip_paths) else None)
+        for i in range(shape.pages)
+    ]
+    parts += [_quiz(i, shape) for i in range(shape.quizzes)]
+    parts.append(_module(shape))
+
+    input_file = root / 'course.canvas.md.xml.jinja'
+    input_file.write_text('\n'.join(parts))
+    return input_file
+
+
+def entry():
+    parser = argparse.ArgumentParser(description='Generate a synthetic course for benchmarking')
+    parser.add_argument('output', type=Path)
+    for field in dataclasses.fields(CourseShape):
+        parser.add_argument(f'--{field.name.replace("_", "-")}', type=int, default=field.default)
+    args = parser.parse_args()
+
+    shape = CourseShape(**{field.name: getattr(args, field.name) for field in dataclasses.fields(CourseShape)})
+    input_file = generate_course(args.output, shape)
+    print(f'Wrote {input_file} (~{shape.resource_count()} resources)')
+
+
+if __name__ == '__main__':
+    entry()
@@ -0,0 +1,128 @@
+"""
+Times `deploy_to_canvas` against a FakeCanvas, so deployment throughput can be compared
+between worker counts, schedulers and call-reduction changes without a network or a real course.
+
+    python benchmarks/deploy_benchmark.py --workers 1 --workers 8 --workers 32
+    python benchmarks/deploy_benchmark.py --profile large --latency 0.1 --throttle-probability 0.02
+
+For every worker count, a fresh fake course receives a full deployment,
+then an unchanged redeployment (which should only read the manifest).
+"""
+import argparse
+import copy
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from course_generator import GLOBAL_ARGS, CourseShape, generate_course  # noqa: E402
+from mdxcanvas.deploy.canvas_deploy import deploy_to_canvas  # noqa: E402
+from mdxcanvas.deployment_report import DeploymentReport  # noqa: E402
+from mdxcanvas.main import build_resources  # noqa: E402
+from mdxcanvas.our_logging import get_logger  # noqa: E402
+from tests.fake_canvas import FakeCanvas, connect  # noqa: E402
+
+# Mermaid diagrams are rendered with mermaid-cli at deploy time, which is not measured here
+PROFILES = {
+    'small': CourseShape(pages=20, quizzes=5, questions=5, include_depth=1, zips=2, zip_files=5, mermaids=0),
+    'large': CourseShape(pages=600, quizzes=60, questions=20, include_depth=1, zips=20, zip_files=20, mermaids=0),
+}
+
+TIME_ZONE = 'America/Denver'
+
+
+def _deploy(fake: FakeCanvas, course, resources, deploy_root: Path, workers: int, type_limits: dict) -> dict:
+    requests_before = sum(fake.requests.values())
+    throttled_before = fake.throttled
+
+    report = DeploymentReport()
+    start = time.perf_counter()
+    deploy_to_canvas(course, TIME_ZONE, copy.deepcopy(resources), report, deploy_root=deploy_root,
+                     max_workers=workers, type_worker_limits=type_limits)
+    seconds = time.perf_counter() - start
+
+    if report.report['error']:
+        raise RuntimeError(report.report['error'])
+
+    return {
+        'seconds': round(seconds, 3),
+        'deployed': len(report.get_deployed_content()),
+        'requests': sum(fake.requests.values()) - requests_before,
+        'throttled': fake.throttled - throttled_before,
+    }
+
+
+def run(shape: CourseShape, worker_counts: list[int], fake_options: dict, type_limits: dict) -> list[dict]:
+    with tempfile.TemporaryDirectory() as tmp:
+        deploy_root = Path(tmp)
+        input_file = generate_course(deploy_root, shape)
+        resources = build_resources(input_file, deploy_root, GLOBAL_ARGS)
+
+        results = []
+        for workers in worker_counts:
+            fake = FakeCanvas(**fake_options)
+            course = connect(fake, workers)
+            results.append({
+                'workers': workers,
+                'resources': len(resources),
+                'full': _deploy(fake, course, resources, deploy_root, workers, type_limits),
+                'unchanged': _deploy(fake, course, resources, deploy_root, workers, type_limits),
+                'max_in_flight': fake.max_in_flight,
+            })
+        return results
+
+
+def print_results(results: list[dict]):
+    print(f'{"workers":>8}  {"run":<10}{"seconds":>9}{"deployed":>10}{"requests":>10}{"req/s":>8}{"throttled":>10}')
+    for result in results:
+        for run_name in ['full', 'unchanged']:
+            r = result[run_name]
+            rate = r['requests'] / r['seconds'] if r['seconds'] else 0
+            print(f'{result["workers"]:>8}  {run_name:<10}{r["seconds"]:>9.2f}{r["deployed"]:>10}'
+                  f'{r["requests"]:>10}{rate:>8.1f}{r["throttled"]:>10}')
+
+
+def entry():
+    parser = argparse.ArgumentParser(description='Benchmark mdxcanvas deployments against a fake Canvas')
+    parser.add_argument('--profile', choices=list(PROFILES), default='small')
+    parser.add_argument('--workers', type=int, action='append', help='Worker count to run (repeatable)')
+    parser.add_argument('--max-type-workers', type=str, action='append', default=[], metavar='TYPE=N')
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds per request (default: 0.05)')
+    parser.add_argument('--latency-for', type=str, action='append', default=[], metavar='"METHOD ENDPOINT=SECONDS"',
+                        help='Latency of one endpoint, e.g. "POST /api/v1/courses/:id/pages=0.2"')
+    parser.add_argument('--throttle-probability', type=float, default=0.0)
+    parser.add_argument('--high-water-mark', type=float, default=700.0)
+    parser.add_argument('--preflight-cost', type=float, default=50.0)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--output', type=Path, help='Also write the results to this JSON file')
+    args = parser.parse_args()
+
+    get_logger().setLevel(logging.WARNING)
+
+    fake_options = {
+        'default_latency': args.latency,
+        'latency': {
+            endpoint: float(seconds)
+            for endpoint, seconds in (item.rsplit('=', 1) for item in args.latency_for)
+        },
+        'throttle_probability': args.throttle_probability,
+        'high_water_mark': args.high_water_mark,
+        'preflight_cost': args.preflight_cost,
+        'page_size': args.page_size,
+    }
+    type_limits = {rtype: int(n) for rtype, n in (item.split('=', 1) for item in args.max_type_workers)}
+
+    results = run(PROFILES[args.profile], args.workers or [1, 8, 32], fake_options, type_limits)
+    print_results(results)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + '\n')
+
+
+if __name__ == '__main__':
+    entry()
@@ -0,0 +1,81 @@
+"""
+Measures the peak memory (RSS) of hashing and zipping a course file as the file grows.
+
+    python benchmarks/memory_benchmark.py                      # 16, 64, 256 and 1024 MB
+    python benchmarks/memory_benchmark.py --size-mb 100 --size-mb 500
+
+Each measurement runs in a fresh interpreter, so the peaks do not mask each other.
+With chunked reads the peak stays flat: it should not grow with the file size.
+Unix only (uses the resource module).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+OPERATIONS = ['baseline', 'checksum', 'zip']
+
+
+def peak_rss_mb() -> float:
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+
+def run_operation(operation: str, path: Path):
+    from mdxcanvas.deploy.checksums import _compute_checksum_of_path
+    from mdxcanvas.deploy.zip import _write_files
+
+    if operation == 'checksum':
+        _compute_checksum_of_path(path)
+    elif operation == 'zip':
+        _write_files({path.name: path.name}, str(path.with_suffix('.zip')), path.parent)
+        path.with_suffix('.zip').unlink()
+
+    print(json.dumps({'peak_rss_mb': peak_rss_mb()}))
+
+
+def write_file(path: Path, size_mb: int):
+    # Random data, so the zip actually has to compress it
+    with open(path, 'wb') as f:
+        for _ in range(size_mb):
+            f.write(os.urandom(1024 * 1024))
+
+
+def measure(operation: str, path: Path) -> float:
+    output = subprocess.run(
+        [sys.executable, __file__, '--child', operation, str(path)],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output)['peak_rss_mb']
+
+
+def entry():
+    parser = argparse.ArgumentParser(description='Peak memory of hashing and zipping large course files')
+    parser.add_argument('--size-mb', type=int, action='append', help='File size to measure (repeatable)')
+    parser.add_argument('--child', nargs=2, metavar=('OPERATION', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_operation(args.child[0], Path(args.child[1]))
+        return
+
+    print(f'{"size MB":>8}' + ''.join(f'{op + " MB":>13}' for op in OPERATIONS))
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in args.size_mb or [16, 64, 256, 1024]:
+            path = Path(tmp) / 'dataset.bin'
+            write_file(path, size_mb)
+            peaks = [measure(operation, path) for operation in OPERATIONS]
+            print(f'{size_mb:>8}' + ''.join(f'{peak:>13.1f}' for peak in peaks))
+            path.unlink()
+
+
+if __name__ == '__main__':
+    entry()
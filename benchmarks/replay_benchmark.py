@@ -0,0 +1,83 @@
+"""
+Times `deploy_to_canvas` against a recording of a real deployment (made with `mdxcanvas --record FILE`).
+
+    python benchmarks/replay_benchmark.py recording.json.gz course.canvas.md.xml --course-info course.json
+    python benchmarks/replay_benchmark.py recording.json.gz course.canvas.md.xml --workers 4 --workers 16
+
+The content must be the same as when the recording was made, so the deployment makes the same requests.
+The local manifest cache in the deploy root is reset to its state at the start of the recording before each run.
+Requests the recording does not have (e.g. because the code changed how it calls Canvas)
+are answered with a response recorded for the same endpoint, and reported as unmatched.
+"""
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mdxcanvas.course_info import get_deploy_root, load_config  # noqa: E402
+from mdxcanvas.deploy.canvas_deploy import deploy_to_canvas  # noqa: E402
+from mdxcanvas.deploy.journal import get_journal_path  # noqa: E402
+from mdxcanvas.deployment_report import DeploymentReport  # noqa: E402
+from mdxcanvas.main import build_resources  # noqa: E402
+from mdxcanvas.our_logging import get_logger  # noqa: E402
+from mdxcanvas.recording import connect_replay, load_recording, restore_manifest_cache  # noqa: E402
+
+
+def recorded_seconds(recording: dict) -> float:
+    exchanges = recording['exchanges']
+    if not exchanges:
+        return 0.0
+    return max(e['start'] + e['elapsed'] for e in exchanges) - min(e['start'] for e in exchanges)
+
+
+def entry():
+    parser = argparse.ArgumentParser(description='Benchmark a deployment against a recording of Canvas traffic')
+    parser.add_argument('recording', type=Path)
+    parser.add_argument('filename', type=Path)
+    parser.add_argument('--course-info', type=Path, default='canvas_course_info.json')
+    parser.add_argument('--args', type=Path, default=None)
+    parser.add_argument('--global-args', type=Path, default=None)
+    parser.add_argument('--templates', nargs='+', type=Path, default=[])
+    parser.add_argument('--css', type=Path, default=None)
+    parser.add_argument('--workers', type=int, action='append', help='Worker count to run (repeatable)')
+    parser.add_argument('--time-scale', type=float, default=1.0,
+                        help='Multiplier for the recorded latencies (default: 1.0)')
+    args = parser.parse_args()
+
+    get_logger().setLevel(logging.WARNING)
+
+    recording = load_recording(args.recording)
+    course_info = load_config(args.course_info)
+    deploy_root = get_deploy_root(args.course_info, course_info)
+    global_args = course_info.get('GLOBAL_ARGS', {})
+    if args.global_args:
+        global_args |= load_config(args.global_args)
+
+    # The replayed deployment writes a journal next to the content, like a real one
+    if get_journal_path(deploy_root, recording['course']['id']).exists():
+        sys.exit('Found the journal of an interrupted deployment in the deploy root; '
+                 'finish or discard it before replaying')
+
+    print(f'Recorded: {len(recording["exchanges"])} requests in {recorded_seconds(recording):.2f}s')
+    print(f'{"workers":>8}{"seconds":>9}{"matched":>9}{"unmatched":>11}')
+    for workers in args.workers or [None]:
+        resources = build_resources(args.filename, deploy_root, global_args, args.args, args.templates, args.css)
+        restore_manifest_cache(recording, deploy_root)
+        course, replay = connect_replay(recording, args.time_scale, workers)
+
+        report = DeploymentReport()
+        start = time.perf_counter()
+        deploy_to_canvas(course, course_info['LOCAL_TIME_ZONE'], resources, report,
+                         deploy_root=deploy_root, max_workers=workers)
+        seconds = time.perf_counter() - start
+        if report.report['error']:
+            sys.exit(report.report['error'])
+
+        print(f'{workers or "default":>8}{seconds:>9.2f}{replay.matched:>9}{replay.unmatched:>11}')
+
+
+if __name__ == '__main__':
+    entry()
@@ -0,0 +1,151 @@
+"""
+Times the offline pipeline on synthetic courses and compares the results with stored baselines.
+
+    python benchmarks/run_benchmarks.py                   # run and compare with baselines.json
+    python benchmarks/run_benchmarks.py --save-baseline   # run and overwrite baselines.json
+
+Each stage is timed on its own (best of --repeat runs), so a regression points at the stage that caused it.
+Exits with status 1 if any stage is slower than its baseline by more than --tolerance.
+"""
+import argparse
+import copy
+import json
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from course_generator import GLOBAL_ARGS, CourseShape, generate_course  # noqa: E402
+from mdxcanvas.deploy.algorithms import linearize_dependencies  # noqa: E402
+from mdxcanvas.deploy.canvas_deploy import SHELL_DEPLOYERS, get_dependencies  # noqa: E402
+from mdxcanvas.deploy.checksums import CHECKSUM_ALGORITHM, compute_checksums, compute_md5  # noqa: E402
+from mdxcanvas.main import process_file, read_content  # noqa: E402
+from mdxcanvas.resources import ResourceManager  # noqa: E402
+from mdxcanvas.xml_processing.xml_processing import process_canvas_xml  # noqa: E402
+
+BASELINE_FILE = Path(__file__).parent / 'baselines.json'
+
+# Differences smaller than this are timer noise, whatever the relative change
+MIN_DIFFERENCE = 0.005
+
+PROFILES = {
+    'small': CourseShape(pages=20, quizzes=5, questions=5, include_depth=2, zips=2, zip_files=5, mermaids=2),
+    'large': CourseShape(pages=600, quizzes=60, questions=20, include_depth=4, zips=20, zip_files=20, mermaids=20),
+}
+
+
+def _best_of(repeat: int, setup: Callable[[], tuple], func: Callable) -> float:
+    times = []
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return round(min(times), 4)
+
+
+def benchmark_profile(shape: CourseShape, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        input_file = generate_course(root, shape)
+        content_type, content = read_content(input_file)
+
+        def run_process_file():
+            resources = ResourceManager()
+            return resources, process_file(resources, root, root, content, content_type, GLOBAL_ARGS)
+
+        resources, processed = run_process_file()
+        process_canvas_xml(resources, processed)
+        resource_dict = dict(resources)
+        dependencies = get_dependencies(resource_dict)
+        shell_deployers = list(SHELL_DEPLOYERS.keys())
+
+        results = {
+            'resources': len(resource_dict),
+            'process_file': _best_of(repeat, lambda: (), run_process_file),
+            'process_canvas_xml': _best_of(
+                repeat,
+                lambda: (copy.deepcopy(resources), processed),
+                process_canvas_xml
+            ),
+            'get_dependencies': _best_of(repeat, lambda: (dict(resource_dict),), get_dependencies),
+            'linearize_dependencies': _best_of(
+                repeat, lambda: (dependencies, shell_deployers), linearize_dependencies
+            ),
+            'compute_md5': _best_of(
+                repeat,
+                lambda: (),
+                lambda: [compute_md5(r['data'], root) for r in resource_dict.values() if r.get('data')]
+            ),
+            'compute_checksums': _best_of(
+                repeat,
+                lambda: (),
+                lambda: compute_checksums(resource_dict, root, algorithm=CHECKSUM_ALGORITHM)
+            ),
+        }
+    return results
+
+
+def compare(results: dict, baselines: dict, tolerance: float) -> list[str]:
+    regressions = []
+    for profile, stages in results.items():
+        for stage, seconds in stages.items():
+            if stage == 'resources' or (baseline := baselines.get(profile, {}).get(stage)) is None:
+                continue
+            if seconds > baseline * (1 + tolerance) and seconds - baseline > MIN_DIFFERENCE:
+                regressions.append(f'{profile}/{stage}: {seconds:.3f}s vs baseline {baseline:.3f}s '
+                                   f'(+{(seconds / baseline - 1):.0%})')
+    return regressions
+
+
+def print_results(results: dict, baselines: dict):
+    for profile, stages in results.items():
+        print(f'{profile} ({stages["resources"]} resources)')
+        for stage, seconds in stages.items():
+            if stage == 'resources':
+                continue
+            baseline = baselines.get(profile, {}).get(stage)
+            versus = f'  (baseline {baseline:.3f}s, {seconds / baseline - 1:+.0%})' if baseline else ''
+            print(f'  {stage:<24}{seconds:8.3f}s{versus}')
+
+
+def entry():
+    parser = argparse.ArgumentParser(description='Benchmark the offline mdxcanvas pipeline')
+    parser.add_argument('--profile', choices=list(PROFILES), action='append',
+                        help='Profile to run (repeatable, default: all)')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown relative to the baseline (default: 0.25 = 25%%)')
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+
+    results = {name: benchmark_profile(PROFILES[name], args.repeat) for name in args.profile or PROFILES}
+
+    stored = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    baselines = stored.get('results', {})
+    print_results(results, baselines)
+
+    if args.save_baseline:
+        stored = {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'results': baselines | results,
+        }
+        BASELINE_FILE.write_text(json.dumps(stored, indent=2) + '\n')
+        print(f'Saved baselines to {BASELINE_FILE}')
+        return
+
+    if regressions := compare(results, baselines, args.tolerance):
+        print('\nRegressions:')
+        for regression in regressions:
+            print(f'  {regression}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    entry()
@@ -0,0 +1,66 @@
+"""
+Counts the shell deployments planned for generated courses of densely interlinked pages (a "see also" web).
+
+    python benchmarks/shell_benchmark.py                           # 50, 200 and 1000 pages, 2 to 8 links each
+    python benchmarks/shell_benchmark.py --pages 500 --links 5
+
+A shell is an extra write to Canvas (and an extra page revision) before the full deployment of a resource.
+Every page links to --links others picked at random, so most pages end up on one large cycle.
+The "every member" column is the previous rule, which made a shell of every member of a cycle
+that another member depends on; "greedy" is linearize_dependencies (see _find_cycle_breakers).
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mdxcanvas.deploy.algorithms import linearize_dependencies, tarjan_scc  # noqa: E402
+from mdxcanvas.deploy.canvas_deploy import SHELL_DEPLOYERS  # noqa: E402
+
+
+def generate_links(pages: int, links: int, seed: int) -> dict[tuple[str, str], list[tuple[str, str]]]:
+    rng = random.Random(seed)
+    return {
+        ('page', f'page-{i}'): [('page', f'page-{j}') for j in rng.sample(range(pages), links + 1) if j != i][:links]
+        for i in range(pages)
+    }
+
+
+def every_member_shells(graph: dict, shell_deployers: list[str]) -> int:
+    """The number of shells of the previous rule."""
+    shells = 0
+    for scc in tarjan_scc(graph):
+        members = set(scc)
+        dependencies = {dep for node in scc for dep in graph.get(node, []) if dep in members and dep != node}
+        if len(scc) > 1:
+            shells += sum(1 for node in scc if node[0] in shell_deployers and node in dependencies)
+    return shells
+
+
+def entry():
+    parser = argparse.ArgumentParser(description='Shell deployments planned for densely linked pages')
+    parser.add_argument('--pages', type=int, action='append', help='Number of pages (repeatable)')
+    parser.add_argument('--links', type=int, action='append', help='Links per page (repeatable)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    shell_deployers = list(SHELL_DEPLOYERS.keys())
+    print(f'{"pages":>7}{"links":>7}{"every member":>14}{"greedy":>8}{"saved":>8}{"seconds":>9}')
+    for pages in args.pages or [50, 200, 1000]:
+        for links in args.links or [2, 4, 8]:
+            graph = generate_links(pages, links, args.seed)
+
+            start = time.perf_counter()
+            order = linearize_dependencies(graph, shell_deployers)
+            seconds = time.perf_counter() - start
+
+            before = every_member_shells(graph, shell_deployers)
+            after = sum(1 for _, is_shell in order if is_shell)
+            print(f'{pages:>7}{links:>7}{before:>14}{after:>8}{1 - after / before if before else 0:>8.0%}{seconds:>9.3f}')
+
+
+if __name__ == '__main__':
+    entry()
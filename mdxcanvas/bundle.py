@@ -0,0 +1,176 @@
+"""
+Compiled deployment bundles: process content once, deploy it elsewhere.
+
+`mdxcanvas compile` runs the full Jinja/Markdown/XML pipeline and writes the resulting
+resources, their dependency graph, and the digests of the local files they upload
+to a gzipped JSON bundle. `mdxcanvas apply` deploys a bundle without importing
+any of the content processors (Markdown, bs4, cssutils, Jinja).
+
+The files referenced by the bundle are still uploaded from the deploy root,
+so they must be present (and unchanged) where the bundle is applied.
+"""
+import argparse
+import gzip
+import json
+import os
+from pathlib import Path
+
+from . import __version__
+from .cli import add_deploy_arguments, configure_logging
+from .course_info import get_course, get_deploy_root, load_config
+from .deploy.canvas_deploy import deploy_to_canvas
+from .deploy.checksums import _compute_checksum_of_path
+from .deployment_report import DeploymentReport
+from .http_metrics import HttpMetrics
+from .http_session import get_session
+from .our_logging import get_logger
+from .recording import record_to
+from .resources import CanvasResource
+from .tracing import span, trace_to
+from .util import relative_to_abs
+
+logger = get_logger()
+
+BUNDLE_FORMAT = 'mdxcanvas-bundle'
+BUNDLE_VERSION = 1
+
+
+def _get_checksum_paths(resources: dict[tuple[str, str], CanvasResource]) -> set[str]:
+    return {
+        path
+        for resource in resources.values()
+        for path in (resource.get('data') or {}).get('checksum_paths', [])
+    }
+
+
+def _compute_file_digests(paths: set[str], deploy_root: Path) -> dict[str, str]:
+    return {
+        path: _compute_checksum_of_path(relative_to_abs(Path(path), deploy_root)).decode('utf-8')
+        for path in sorted(paths)
+    }
+
+
+def write_bundle(bundle_file: Path, resources: dict[tuple[str, str], CanvasResource],
+                 resource_dependencies: dict[tuple[str, str], list[tuple[str, str]]], deploy_root: Path):
+    bundle = {
+        'format': BUNDLE_FORMAT,
+        'version': BUNDLE_VERSION,
+        'mdxcanvas_version': __version__,
+        'resources': [[rtype, rid, resource] for (rtype, rid), resource in resources.items()],
+        'dependencies': [[list(key), [list(dep) for dep in deps]] for key, deps in resource_dependencies.items()],
+        'file_digests': _compute_file_digests(_get_checksum_paths(resources), deploy_root),
+    }
+
+    # mtime=0 keeps the bundle byte-for-byte reproducible, so it can be cached by content
+    with gzip.GzipFile(bundle_file, 'wb', mtime=0) as f:
+        f.write(json.dumps(bundle, separators=(',', ':')).encode('utf-8'))
+
+
+def read_bundle(bundle_file: Path, deploy_root: Path) -> tuple[dict[tuple[str, str], CanvasResource],
+                                                              dict[tuple[str, str], list[tuple[str, str]]]]:
+    """
+    Returns the resources and dependency graph stored in the bundle.
+    Raises a ValueError if the bundle cannot be read by this version of mdxcanvas
+    or if a referenced file changed since the bundle was compiled.
+    """
+    with gzip.open(bundle_file, 'rb') as f:
+        bundle = json.loads(f.read())
+
+    if bundle.get('format') != BUNDLE_FORMAT:
+        raise ValueError(f'{bundle_file} is not an mdxcanvas bundle')
+
+    if bundle.get('version') != BUNDLE_VERSION:
+        raise ValueError(f'Unsupported bundle version {bundle.get("version")} in {bundle_file} '
+                         f'(expected {BUNDLE_VERSION}); recompile it with this version of mdxcanvas')
+
+    if bundle['mdxcanvas_version'] != __version__:
+        logger.warning(f'Bundle was compiled with mdxcanvas {bundle["mdxcanvas_version"]}, '
+                       f'applying with {__version__}')
+
+    file_digests = bundle['file_digests']
+    current_digests = _compute_file_digests(set(file_digests), deploy_root)
+    if changed := [path for path, digest in file_digests.items() if current_digests[path] != digest]:
+        raise ValueError('Files changed since the bundle was compiled:\n'
+                         + '\n'.join(f'  {path}' for path in changed))
+
+    resources = {(rtype, rid): resource for rtype, rid, resource in bundle['resources']}
+    resource_dependencies = {
+        tuple(key): [tuple(dep) for dep in deps]
+        for key, deps in bundle['dependencies']
+    }
+    return resources, resource_dependencies
+
+
+def apply_bundle(
+        canvas_api_token: str,
+        course_info_file: Path,
+        bundle_file: Path,
+        dryrun: bool = False,
+        cleanup: bool = False,
+        discard_journal: bool = False,
+        output_file: str | None = None,
+        max_workers: int | None = None,
+        type_worker_limits: dict[str, int] | None = None,
+        metrics_file: Path | None = None,
+        record_file: Path | None = None
+):
+    report = DeploymentReport(output_file)
+    http_metrics = HttpMetrics()
+
+    try:
+        course_info = load_config(course_info_file)
+        deploy_root = get_deploy_root(course_info_file, course_info)
+
+        with span('get_course'):
+            course = get_course(canvas_api_token, course_info['CANVAS_API_URL'], course_info['CANVAS_COURSE_ID'],
+                                max_workers=max_workers)
+        logger.info(f'Connected to Canvas: {course.name} - {course_info["CANVAS_API_URL"]}/courses/{course.id}')
+
+        with span('read_bundle'):
+            resources, resource_dependencies = read_bundle(bundle_file, deploy_root)
+        logger.info(f'Loaded {len(resources)} resources from {bundle_file}')
+
+        with http_metrics.watch(get_session(course)), record_to(record_file, course, deploy_root):
+            deploy_to_canvas(course, course_info['LOCAL_TIME_ZONE'], resources, report, dryrun=dryrun,
+                             cleanup=cleanup, discard_journal=discard_journal, deploy_root=deploy_root, max_workers=max_workers,
+                             type_worker_limits=type_worker_limits, resource_dependencies=resource_dependencies)
+
+    except Exception as e:
+        logger.exception(f"{type(e).__name__}: {e}")
+        report.add_error(e)
+
+    finally:
+        report.add_http_metrics(http_metrics.summary())
+        report.save_report()
+        report.print_report()
+        if metrics_file:
+            http_metrics.write_prometheus(metrics_file)
+
+
+def apply_entry(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog='mdxcanvas apply', description='Deploy a compiled bundle to Canvas')
+    parser.add_argument("--course-info", type=Path, default="canvas_course_info.json")
+    parser.add_argument("bundle", type=Path)
+    add_deploy_arguments(parser)
+    args = parser.parse_args(argv)
+
+    api_token = os.environ.get("CANVAS_API_TOKEN")
+    if api_token is None:
+        raise ValueError("Please set the CANVAS_API_TOKEN environment variable")
+
+    configure_logging(args)
+
+    with trace_to(args.trace):
+        apply_bundle(
+            canvas_api_token=api_token,
+            course_info_file=args.course_info,
+            bundle_file=args.bundle,
+            dryrun=args.dryrun,
+            cleanup=args.cleanup,
+            discard_journal=args.discard_journal,
+            output_file=args.output_file,
+            max_workers=args.max_workers,
+            type_worker_limits=dict(args.max_type_workers),
+            metrics_file=args.metrics_file,
+            record_file=args.record
+        )
@@ -1,12 +1,106 @@
+import argparse
+import logging
 import sys
 from pathlib import Path
 
 
+def parse_worker_limit(text: str) -> int:
+    if not text.isdigit() or int(text) < 1:
+        raise argparse.ArgumentTypeError(f'Expected a number >= 1, got "{text}"')
+    return int(text)
+
+
+def parse_type_worker_limit(text: str) -> tuple[str, int]:
+    rtype, sep, limit = text.partition('=')
+    if not sep or not rtype or not limit.isdigit() or int(limit) < 1:
+        raise argparse.ArgumentTypeError(f'Expected TYPE=N with N >= 1, got "{text}"')
+    return rtype, int(limit)
+
+
+def add_deploy_arguments(parser: argparse.ArgumentParser):
+    """Options shared by every command that deploys to Canvas."""
+    parser.add_argument('--debug', action='store_true')
+    parser.add_argument('--dryrun', '--dry-run', action='store_true')
+    parser.add_argument(
+        '--cleanup',
+        action='store_true',
+        help='Remove all Canvas resources not present in the input file. '
+             'Stale quiz questions and module items are removed by default.'
+    )
+    parser.add_argument(
+        '--discard-journal',
+        action='store_true',
+        help='Discard the progress of an interrupted deployment, recorded in the local deploy journal, '
+             'instead of resuming it. The resources it created are then created again.'
+    )
+    parser.add_argument('--output-file', type=str, default=None)
+    parser.add_argument(
+        '--metrics-file',
+        type=Path,
+        default=None,
+        help='Write the HTTP request metrics of the deployment to this file in the Prometheus text format. '
+             'The metrics are also included in the --output-file report.'
+    )
+    parser.add_argument(
+        '--record',
+        type=Path,
+        default=None,
+        metavar='FILE',
+        help='Record the Canvas requests and responses of the deployment to FILE (gzipped if it ends in .gz), '
+             'with tokens and signatures redacted. Recordings can be replayed with benchmarks/replay_benchmark.py.'
+    )
+    parser.add_argument(
+        '--max-workers',
+        type=parse_worker_limit,
+        default=None,
+        help='Maximum number of concurrent Canvas requests. '
+             'Concurrency adapts below this limit to the Canvas rate-limit budget.'
+    )
+    parser.add_argument(
+        '--max-type-workers',
+        nargs='+',
+        type=parse_type_worker_limit,
+        default=[],
+        metavar='TYPE=N',
+        help='Maximum number of concurrent deployments of a resource type, e.g. file=4 quiz_question=8'
+    )
+    add_trace_argument(parser)
+
+
+def add_trace_argument(parser: argparse.ArgumentParser):
+    parser.add_argument(
+        '--trace',
+        type=Path,
+        default=None,
+        metavar='FILE',
+        help='Write a trace of the processing stages, deployment tasks and HTTP requests to FILE '
+             '(Chrome trace format; open it in https://ui.perfetto.dev)'
+    )
+
+
+def configure_logging(args: argparse.Namespace):
+    from .our_logging import get_logger
+
+    if args.debug:
+        get_logger().setLevel(logging.DEBUG)
+
+
 def entry():
     if sys.argv[1:] == ['skilldir']:
         print(Path(__file__).resolve().parent / 'skills')
         return
 
+    # Subcommands are imported lazily: `apply` must not load the content processors
+    if sys.argv[1:2] == ['compile']:
+        from .main import compile_entry
+        compile_entry(sys.argv[2:])
+        return
+
+    if sys.argv[1:2] == ['apply']:
+        from .bundle import apply_entry
+        apply_entry(sys.argv[2:])
+        return
+
     from .main import entry as deploy
 
     deploy()
@@ -0,0 +1,112 @@
+"""Adaptive concurrency limits driven by Canvas rate-limit headers."""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Hashable, Iterator, Mapping
+
+import requests
+
+from .our_logging import get_logger
+from .retry import is_throttled
+
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+logger = get_logger()
+
+
+def _parse_header_float(value: str | None) -> float | None:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD controller for the number of tasks allowed in flight.
+
+    Canvas reports the remaining throttle budget in ``X-Rate-Limit-Remaining``
+    and the cost of each request in ``X-Request-Cost``.
+    While the budget stays above the headroom needed by the tasks in flight,
+    the limit grows by one task per ``limit`` responses (additive increase).
+    When the budget runs low, or a request is throttled (403 "Rate Limit Exceeded" or 429),
+    the limit is halved (multiplicative decrease), at most once per ``decrease_interval`` seconds.
+
+    ``group_limits`` caps how many tasks of one group (e.g. resource type) may run at once,
+    independent of the adaptive limit.
+    """
+
+    def __init__(
+            self,
+            max_limit: int = DEFAULT_MAX_WORKERS,
+            group_limits: Mapping[Hashable, int] | None = None,
+            min_limit: int = 1,
+            initial_limit: int = 8,
+            low_watermark: float = 100.0,
+            decrease_interval: float = 1.0,
+    ):
+        if max_limit < 1:
+            raise ValueError('max_limit must be >= 1')
+        if min_limit < 1 or min_limit > max_limit:
+            raise ValueError('min_limit must be between 1 and max_limit')
+        if any(limit < 1 for limit in (group_limits or {}).values()):
+            raise ValueError('group limits must be >= 1')
+
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.group_limits = dict(group_limits or {})
+        self.low_watermark = low_watermark
+        self.decrease_interval = decrease_interval
+
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._request_cost = 1.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def group_limit(self, group: Hashable) -> int | None:
+        return self.group_limits.get(group)
+
+    def observe_response(self, response: requests.Response, *_args, **_kwargs):
+        """Response hook for a requests.Session: adjusts the limit from the rate-limit headers."""
+        remaining = _parse_header_float(response.headers.get('X-Rate-Limit-Remaining'))
+        cost = _parse_header_float(response.headers.get('X-Request-Cost'))
+
+        with self._lock:
+            if cost is not None:
+                # Exponentially weighted average of recent request costs
+                self._request_cost = 0.8 * self._request_cost + 0.2 * cost
+
+            headroom = self.low_watermark + self._limit * self._request_cost
+            if is_throttled(response) or (remaining is not None and remaining < headroom):
+                self._decrease()
+            else:
+                self._increase()
+
+    def _increase(self):
+        self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+
+    def _decrease(self):
+        now = time.monotonic()
+        if now - self._last_decrease < self.decrease_interval:
+            return
+        self._last_decrease = now
+
+        previous = self.limit
+        self._limit = max(float(self.min_limit), self._limit / 2)
+        if self.limit != previous:
+            logger.debug(f'Canvas rate limit budget is low; reducing concurrency from {previous} to {self.limit}')
+
+    @contextmanager
+    def watch(self, session: requests.Session) -> Iterator['AdaptiveConcurrency']:
+        """Observe every response made through the session while the context is active."""
+        session.hooks['response'].append(self.observe_response)
+        try:
+            yield self
+        finally:
+            session.hooks['response'].remove(self.observe_response)
@@ -0,0 +1,60 @@
+import json
+from pathlib import Path
+from typing import TypedDict
+
+import yaml
+from canvasapi import Canvas
+from canvasapi.course import Course
+
+from .concurrency import DEFAULT_MAX_WORKERS
+from .http_session import make_session, use_session
+
+
+class CourseInfo(TypedDict):
+    CANVAS_API_URL: str
+    CANVAS_COURSE_ID: int
+    LOCAL_TIME_ZONE: str
+    DEPLOY_ROOT: str
+
+
+def load_config(config_path: Path):
+    ext = config_path.suffix.lower()
+    if ext in ['.yaml', '.yml']:
+        return yaml.safe_load(config_path.read_text())
+
+    elif ext in ['.json']:
+        return json.loads(config_path.read_text())
+
+    elif ext in ['.md', '.mdd']:
+        # Imported here because it pulls in the Markdown processor
+        import markdowndata
+        return markdowndata.loads(config_path.read_text())
+
+    else:
+        raise NotImplementedError(f'Unsupported course info format: {config_path.suffix}')
+
+
+def get_deploy_root(course_info_file: Path, course_info: CourseInfo) -> Path:
+    """DEPLOY_ROOT is relative to the folder containing the course info file."""
+    course_info_dir = course_info_file.parent.resolve().absolute()
+    return (course_info_dir / Path(course_info['DEPLOY_ROOT'])).resolve().absolute()
+
+
+def get_course(api_token: str, api_url: str, canvas_course_id: int, max_workers: int | None = None) -> Course:
+    """
+    Returns a Canvas Course object for the given API URL, API token, and course ID.
+
+    :param api_url: str: The URL for the Canvas API.
+    :param api_token: str: The authentication token for the Canvas API.
+    :param canvas_course_id: int: The ID of the Canvas course.
+    :param max_workers: int | None: The number of concurrent workers the connection pool must serve.
+    :return: Course: A Canvas Course object.
+    """
+    canvas = Canvas(api_url, api_token)
+    use_session(canvas, make_session(max_workers or DEFAULT_MAX_WORKERS))
+    course: Course = canvas.get_course(canvas_course_id)
+
+    # NB: this is a hack, but it makes things MUCH easier down the line when dealing with announcements
+    course.canvas = canvas  # type: ignore
+
+    return course
@@ -1,125 +1,253 @@
+"""
+Graph algorithms for ordering deployments.
+
+The graphs map each resource to the resources it depends on. Internally the resources are numbered
+and the graph is an adjacency list of numbers. Every algorithm is iterative, so a dependency chain
+of any depth is fine, and the time grows about linearly with the number of dependencies.
+"""
+
+import heapq
 from collections import deque
 
 from ..our_logging import get_logger
 
 logger = get_logger()
 
+Node = tuple[str, str]
 
-def tarjan_scc(graph: dict[tuple[str, str], list[tuple[str, str]]]) -> list[list[tuple[str, str]]]:
-    """Find strongly connected components (cycles) using Tarjan's algorithm."""
-    index_counter = [0]
+
+def _index_graph(graph: dict[Node, list[Node]]) -> tuple[list[Node], list[list[int]]]:
+    """
+    Number the nodes of the graph: the keys first, in order, then the dependencies that are not keys.
+    Returns the nodes by number and the numbers of the dependencies of each node.
+    """
+    nodes = list(graph)
+    numbers = {node: number for number, node in enumerate(nodes)}
+    adjacency = []
+    for deps in graph.values():
+        successors = []
+        for dep in deps:
+            if (number := numbers.get(dep)) is None:
+                number = numbers[dep] = len(nodes)
+                nodes.append(dep)
+            successors.append(number)
+        adjacency.append(successors)
+    adjacency.extend([] for _ in range(len(nodes) - len(adjacency)))
+    return nodes, adjacency
+
+
+def _strongly_connected_components(adjacency: list[list[int]]) -> list[list[int]]:
+    """Tarjan's algorithm, with an explicit stack instead of recursion."""
+    count = len(adjacency)
+    index = [-1] * count
+    lowlink = [0] * count
+    next_successor = [0] * count
+    on_stack = [False] * count
     stack = []
-    lowlink = {}
-    index = {}
-    on_stack = set()
     sccs = []
+    counter = 0
+
+    for root in range(count):
+        if index[root] != -1:
+            continue
 
-    def strongconnect(node):
-        index[node] = index_counter[0]
-        lowlink[node] = index_counter[0]
-        index_counter[0] += 1
-        stack.append(node)
-        on_stack.add(node)
-
-        for successor in graph.get(node, []):
-            if successor not in index:
-                strongconnect(successor)
-                lowlink[node] = min(lowlink[node], lowlink[successor])
-            elif successor in on_stack:
-                lowlink[node] = min(lowlink[node], index[successor])
-
-        if lowlink[node] == index[node]:
-            scc = []
-            while True:
-                w = stack.pop()
-                on_stack.remove(w)
-                scc.append(w)
-                if w == node:
-                    break
-            sccs.append(scc)
-
-    for node in graph.keys():
-        if node not in index:
-            strongconnect(node)
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        path = [root]
+
+        while path:
+            node = path[-1]
+            successors = adjacency[node]
+            if next_successor[node] < len(successors):
+                successor = successors[next_successor[node]]
+                next_successor[node] += 1
+                if index[successor] == -1:
+                    index[successor] = lowlink[successor] = counter
+                    counter += 1
+                    stack.append(successor)
+                    on_stack[successor] = True
+                    path.append(successor)
+                elif on_stack[successor] and index[successor] < lowlink[node]:
+                    lowlink[node] = index[successor]
+                continue
+
+            # Every successor is done: return to the parent
+            path.pop()
+            if path and lowlink[node] < lowlink[path[-1]]:
+                lowlink[path[-1]] = lowlink[node]
+
+            if lowlink[node] == index[node]:
+                scc = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    scc.append(member)
+                    if member == node:
+                        break
+                sccs.append(scc)
 
     return sccs
 
 
-def kahns_topological_sort(graph: dict[tuple[str, str], list[tuple[str, str]]]) -> list[tuple[str, str]]:
-    """Topological sort using Kahn's algorithm (dependencies first)."""
-    in_degree = {node: 0 for node in graph}
-    for deps in graph.values():
-        for dep in deps:
-            if dep in graph:
+def _topological_order(adjacency: list[list[int]], count: int) -> list[int]:
+    """Kahn's algorithm over the first ``count`` nodes (dependencies first); other dependencies are ignored."""
+    in_degree = [0] * count
+    for node in range(count):
+        for dep in adjacency[node]:
+            if dep < count:
                 in_degree[dep] += 1
 
-    queue = deque([node for node, degree in in_degree.items() if degree == 0])
+    queue = deque(node for node in range(count) if in_degree[node] == 0)
     result = []
 
     while queue:
         node = queue.popleft()
         result.append(node)
 
-        for dep in graph.get(node, []):
-            if dep in in_degree:
+        for dep in adjacency[node]:
+            if dep < count:
                 in_degree[dep] -= 1
                 if in_degree[dep] == 0:
                     queue.append(dep)
 
-    if len(result) != len(graph):
+    if len(result) != count:
         raise ValueError("Internal error: acyclic graph still has cycles")
 
     return result[::-1]
 
 
+def tarjan_scc(graph: dict[Node, list[Node]]) -> list[list[Node]]:
+    """Find strongly connected components (cycles) using Tarjan's algorithm."""
+    nodes, adjacency = _index_graph(graph)
+    return [[nodes[member] for member in scc] for scc in _strongly_connected_components(adjacency)]
+
+
+def kahns_topological_sort(graph: dict[Node, list[Node]]) -> list[Node]:
+    """Topological sort using Kahn's algorithm (dependencies first)."""
+    nodes, adjacency = _index_graph(graph)
+    return [nodes[node] for node in _topological_order(adjacency, len(graph))]
+
+
+def _find_cycle_breakers(
+        scc: list[int],
+        component: list[int],
+        adjacency: list[list[int]],
+        breakable: list[bool]
+) -> tuple[list[int], list[int]]:
+    """
+    Choose the resources of a strongly connected component to deploy as shells first:
+    a small set whose removal leaves the component without cycles (a feedback vertex set).
+
+    Finding the smallest such set is NP-hard, so the choice is greedy:
+    resources that are not on a cycle of what remains are set aside,
+    then the resource on the most cycles (by in-degree times out-degree) is chosen, until no cycle remains.
+    Only ``breakable`` resources (of types that support shell deployments) can be chosen.
+    The candidates are kept in a heap and re-ranked when they are popped, so this is about O(E log V).
+
+    Returns the cycle breakers and the resources left on cycles that no shell can break.
+    """
+    dependencies = {node: {dep for dep in adjacency[node] if component[dep] == component[node]} for node in scc}
+    dependents = {node: set() for node in scc}
+    for node, deps in dependencies.items():
+        for dep in deps:
+            dependents[dep].add(node)
+
+    position = {node: number for number, node in enumerate(scc)}
+    size = len(scc)
+
+    def rank(node) -> int:
+        # Smallest first: resources that depend on themselves (only they can break that cycle),
+        # then by in-degree times out-degree (largest first), then in the order of the component
+        degrees = len(dependencies[node]) * len(dependents[node])  # at most size ** 2
+        return -((node in dependencies[node]) * (size ** 2 + 1) + degrees) * size + position[node]
+
+    def remove(node) -> set[int]:
+        for dep in dependencies[node]:
+            if dep != node:
+                dependents[dep].discard(node)
+        for dependent in dependents[node]:
+            if dependent != node:
+                dependencies[dependent].discard(node)
+        return (dependencies.pop(node) | dependents.pop(node)) - {node}
+
+    def set_aside_acyclic(nodes):
+        queue = list(nodes)
+        while queue:
+            node = queue.pop()
+            if node in dependencies and not (dependencies[node] and dependents[node]):
+                queue.extend(remove(node))
+
+    set_aside_acyclic(scc)
+
+    # Ranks only grow as resources are removed, so an entry is never ranked worse than its resource:
+    # a popped entry that is out of date goes back with its current rank
+    candidates = [(rank(node), node) for node in dependencies if breakable[node]]
+    heapq.heapify(candidates)
+
+    cycle_breakers = []
+    while dependencies:
+        if not candidates:
+            return cycle_breakers, list(dependencies)
+
+        breaker_rank, breaker = heapq.heappop(candidates)
+        if breaker not in dependencies:
+            continue
+        if (current_rank := rank(breaker)) != breaker_rank:
+            heapq.heappush(candidates, (current_rank, breaker))
+            continue
+
+        cycle_breakers.append(breaker)
+        set_aside_acyclic(remove(breaker))
+
+    return cycle_breakers, []
+
+
 def linearize_dependencies(
-        graph: dict[tuple[str, str], list[tuple[str, str]]],
+        graph: dict[Node, list[Node]],
         shell_deployers: list[str]
-) -> list[tuple[tuple[str, str], bool]]:
+) -> list[tuple[Node, bool]]:
     """
     Linearize dependencies with cycle breaking via shell deployments.
     Example: A→B→C→A returns [((page, C),True), ((page, B), False), ((page, A), False), ((page, C), False)]
 
+    Only the cycle breakers chosen by _find_cycle_breakers are deployed as shells.
+    Within a cycle, the other resources are still deployed after the resources they depend on.
+
     Note: Only certain resource types support shell deployments (assignment, page, quiz).
     Other types (syllabus, file, etc.) have deterministic IDs and don't need shell deployments.
     """
+    nodes, adjacency = _index_graph(graph)
+    shell_types = set(shell_deployers)
+    breakable = [node[0] in shell_types for node in nodes]
 
-    sccs = tarjan_scc(graph)
-
-    cycle_breakers = set()
-    scc_map = {}
+    sccs = _strongly_connected_components(adjacency)
+    component = [0] * len(nodes)
+    for number, scc in enumerate(sccs):
+        for node in scc:
+            component[node] = number
 
+    is_breaker = [False] * len(nodes)
+    unbreakable = [False] * len(nodes)
     for scc in sccs:
-        if len(scc) > 1:
-            # All nodes in an SCC that are depended upon by other nodes in the SCC
-            # need to be cycle breakers (deployed as shells first)
-            for node in scc:
-                scc_map[node] = scc
-                # Check if any other node in the SCC depends on this node
-                # and that this node supports shell deployment
-                if node[0] in shell_deployers:
-                    for other_node in scc:
-                        if other_node != node and node in graph.get(other_node, []):
-                            cycle_breakers.add(node)
-                            break
-
-    for node, deps in graph.items():
-        # Self-loops only need cycle breaking if the type supports shell deployment
-        if node in deps and node[0] in shell_deployers:
-            cycle_breakers.add(node)
-
-    acyclic_graph = {}
-    for node, deps in graph.items():
-        if node in scc_map:
-            # Remove all edges within the same SCC to break cycles
-            acyclic_graph[node] = [d for d in deps if d not in scc_map[node]]
-        elif node in cycle_breakers:
-            # Self-loop case
-            acyclic_graph[node] = [d for d in deps if d != node]
-        else:
-            acyclic_graph[node] = deps
-
-    topo_order = kahns_topological_sort(acyclic_graph)
+        if len(scc) > 1 or scc[0] in adjacency[scc[0]]:
+            breakers, unbroken = _find_cycle_breakers(scc, component, adjacency, breakable)
+            for node in breakers:
+                is_breaker[node] = True
+            for node in unbroken:
+                unbreakable[node] = True
+
+    # Drop the edges to a cycle breaker (satisfied by its shell), and those between resources no shell can break
+    acyclic_adjacency = [
+        [
+            dep for dep in adjacency[node]
+            if component[dep] != component[node] or not (is_breaker[dep] or (unbreakable[node] and unbreakable[dep]))
+        ]
+        for node in range(len(graph))
+    ]
+    topo_order = [nodes[node] for node in _topological_order(acyclic_adjacency, len(graph))]
+    cycle_breakers = {nodes[node] for node in range(len(nodes)) if is_breaker[node]}
 
     # Identify assignment groups that are dependencies of cycle breakers
     group_deps = set()
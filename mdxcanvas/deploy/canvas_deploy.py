@@ -1,5 +1,3 @@
-import json
-import re
 import threading
 import time
 from collections import defaultdict
@@ -16,23 +14,33 @@ from canvasapi.exceptions import ResourceDoesNotExist
 from .algorithms import linearize_dependencies
 from .announcement import deploy_announcement
 from .assignment import deploy_assignment, deploy_shell_assignment
-from .checksums import MD5Sums, compute_md5
+from .checksums import CHECKSUM_ALGORITHM, MD5Sums, PathDigestCache, compute_checksums, get_digest_cache_path
 from .course_settings import deploy_settings
 from .file import deploy_file
 from .group import deploy_group
+from .invalidation import (
+    describe_changed_links, find_changed_links, get_links, get_recorded_links, links_unchanged, may_be_unchanged,
+    propagate_changes
+)
 from .mermaid import deploy_mermaid
-from .migration import migrate
+from .migration import migrate, migrate_checksum_algorithm
 from .module import deploy_module, deploy_module_item, get_module_item
 from .override import deploy_override, get_override
 from .page import deploy_page, deploy_shell_page
+from .plan import CHECKSUM_CHANGED, DEPENDENCY_CHANGED, NEW, get_deploy_cost, log_plan, plan_deployment
 from .quarto_slides import deploy_quarto_slides
 from .quiz import deploy_quiz, deploy_quiz_question, deploy_quiz_question_order, deploy_shell_quiz, get_quiz_question
+from .rendering import ResourceRenderer, Resolver
 from .syllabus import deploy_syllabus
 from .zip import deploy_zip
+from ..concurrency import AdaptiveConcurrency, DEFAULT_MAX_WORKERS
 from ..deployment_report import DeploymentReport
+from ..http_metrics import track_resource
+from ..http_session import get_session
 from ..our_logging import get_logger
 from ..parallel import threaded_execute
-from ..resources import CanvasResource, iter_keys, ResourceInfo
+from ..resources import CanvasResource, ResourceInfo, ResourceManager, find_dependencies
+from ..tracing import span
 
 logger = get_logger()
 
@@ -122,15 +130,19 @@ def fix_dates(data: dict, time_zone: str, resource: CanvasResource):
 
 
 def get_dependencies(resources: dict[tuple[str, str], CanvasResource]) -> dict[tuple[str, str], list[tuple[str, str]]]:
-    """Returns the dependency graph in resources. Adds missing resources to the input dictionary."""
+    """
+    Returns the dependency graph in resources. Adds missing resources to the input dictionary.
+
+    A ResourceManager already indexed the dependencies of its resources; other dictionaries are scanned.
+    """
     deps = {}
     missing_resources = []
     for key, resource in resources.items():
-        deps[key] = []
-        text = json.dumps(resource)
-        for _, rtype, rid, _ in iter_keys(text):
-            resource_key = (rtype, rid)
-            deps[key].append(resource_key)
+        if isinstance(resources, ResourceManager):
+            deps[key] = resources.get_dependencies_of(key)
+        else:
+            deps[key] = list(find_dependencies(resource))
+        for resource_key in deps[key]:
             if resource_key not in resources:
                 missing_resources.append(resource_key)
 
@@ -140,14 +152,17 @@ def get_dependencies(resources: dict[tuple[str, str], CanvasResource]) -> dict[t
     return deps
 
 
-def update_links(md5s: MD5Sums, data: dict, resource_objs: dict, current_resource: CanvasResource) -> dict:
-    text = json.dumps(data)
-
-    for key, rtype, rid, field in iter_keys(text):
+def _link_resolver(md5s: MD5Sums, resource_objs: dict, current_resource: CanvasResource,
+                   rendered: dict[tuple[str, str, str], str] | None = None) -> Resolver:
+    """
+    Resolves placeholders from the resources deployed in this run, or else from the manifest.
+    Each resolved value is added to ``rendered`` (if given), by (type, id, field).
+    """
+    def resolve(rtype: str, rid: str, field: str) -> str:
         canvas_info = resource_objs.get((rtype, rid)) or md5s.get_canvas_info((rtype, rid))
 
         if not canvas_info:
-            logger.debug(data)
+            logger.debug(current_resource.get('data'))
             raise ValueError(
                 f"No canvas info for {rtype} {rid}\n  Referenced in {current_resource['type']} {current_resource['id']}\n  in {current_resource['content_path']}")
 
@@ -155,9 +170,15 @@ def update_links(md5s: MD5Sums, data: dict, resource_objs: dict, current_resourc
             raise ValueError(
                 f"Missing field '{field}' in {rtype} {rid}\n  Referenced in {current_resource['type']} {current_resource['id']}\n  in {current_resource['content_path']}")
 
-        text = text.replace(key, str(repl_text))
+        if rendered is not None:
+            rendered[rtype, rid, field] = str(repl_text)
+        return str(repl_text)
 
-    return json.loads(text)
+    return resolve
+
+
+def update_links(md5s: MD5Sums, data: dict, resource_objs: dict, current_resource: CanvasResource) -> dict:
+    return ResourceRenderer().render(data, _link_resolver(md5s, resource_objs, current_resource))
 
 
 def post_process_resource(resource_data, timezone) -> dict:
@@ -165,15 +186,8 @@ def post_process_resource(resource_data, timezone) -> dict:
     Post-processing involves changes that shouldn't be included
     when considering whether a resource has changed and should be redeployed.
     """
-    text = json.dumps(resource_data)
-
     # <timestamp /> tags
-    # Because we are searching in JSON, double quotes will be escaped with \
-    while m := re.search(r'''<\s*timestamp\s*(?:format\s*=\s*(\\"|')([^"']*)\1)?\s*(\/>|>\s*<\/timestamp>)''', text):
-        timestamp = datetime.now(ZoneInfo(timezone)).strftime(m.group(2) or '%B %d, %Y at %I:%M %p')
-        text = text.replace(m.group(0), timestamp)
-
-    return json.loads(text)
+    return ResourceRenderer().render(resource_data, now=datetime.now(ZoneInfo(timezone)))
 
 
 def deploy_resource(deployers: dict, course: Course, rtype: str, data: dict, resource: CanvasResource, deploy_root: Path) -> tuple[
@@ -202,16 +216,22 @@ def identify_modified_or_outdated(
         linearized_resources: list[tuple[tuple[str, str], bool]],
         resource_dependencies: dict[tuple[str, str], list[tuple[str, str]]],
         md5s: MD5Sums,
-        deploy_root: Path
-) -> dict[tuple[str, str], tuple[str, CanvasResource]]:
+        deploy_root: Path,
+        digests: PathDigestCache | None = None
+) -> dict[tuple[tuple[str, str], bool], tuple[str, CanvasResource, str]]:
     """
     A resource is modified or outdated if:
         - It is new
         - It has changed its own data
-        - It depends on another resource with a new ID (a file)
+        - A value it renders (e.g. the id of a file or the title of a page) changed since it was deployed,
+          or may change because the resource it refers to is deployed (see invalidation.py)
+
+    ``digests`` caches the checksums of local files between runs, so unchanged files are not read again.
+    The checksums are computed in parallel (see compute_checksums), with the algorithm of the manifest.
 
     Returns:
-        dict: A dictionary mapping resource keys to their current MD5 and resource data.
+        dict: A dictionary mapping deployments to the current checksum, data and reason of the resource,
+            in deployment order.
             - Key: (resource_key, is_shell)
                 - resource_key: (type, id)
                     - type: str, the resource type (e.g., 'assignment', 'page', etc.)
@@ -219,11 +239,16 @@ def identify_modified_or_outdated(
                 - is_shell: bool, indicating if this is a shell deployment
                     - Unfortunately needed to handle shell deployments properly, otherwise shell deployments are
                       overwritten by full deployments of the same resource.
-            - Value: (current_md5, resource)
-                - current_md5: str, the current MD5 checksum of the resource data
+            - Value: (current_md5, resource, reason)
+                - current_md5: str, the current checksum of the resource data (see get_checksum_algorithm)
                 - resource: CanvasResource, the resource data itself
+                - reason: str, why the resource needs to be deployed (see plan.py),
+                  with the chain of changes that lead to it for a dependency change
     """
     modified = {}
+    unchanged = {}
+    checksums = compute_checksums({key: resources[key] for key, _ in linearized_resources}, deploy_root, digests,
+                                  md5s.get_checksum_algorithm())
 
     for resource_key, is_shell in linearized_resources:
         resource = resources[resource_key]
@@ -235,7 +260,7 @@ def identify_modified_or_outdated(
 
         stored_md5 = md5s.get_checksum(item)
 
-        current_md5 = compute_md5(resource_data, deploy_root)  # pyright: ignore[reportArgumentType]
+        current_md5 = checksums[resource_key]
 
         # Attach the Canvas object id (stored as `canvas_id`) to the resource data
         # so deployment can detect whether to create a new item or update an existing one.
@@ -243,7 +268,7 @@ def identify_modified_or_outdated(
 
         if stored_md5 is None:
             # New resource that needs to be deployed
-            modified[resource_key, is_shell] = current_md5, resource
+            modified[resource_key, is_shell] = current_md5, resource, NEW
             continue
 
         if is_shell:
@@ -255,15 +280,25 @@ def identify_modified_or_outdated(
         if stored_md5 != current_md5:
             # Changed data, need to deploy
             logger.debug(f'MD5 {resource_key}: {current_md5} vs {stored_md5}')
-            modified[resource_key, is_shell] = current_md5, resource
+            modified[resource_key, is_shell] = current_md5, resource, CHECKSUM_CHANGED
             continue
 
-        for dep_type, dep_name in resource_dependencies[resource_key]:
-            if dep_type in ['file', 'zip'] and (dep_type, dep_name) in modified:
-                modified[resource_key, is_shell] = current_md5, resource
-                break
+        links = get_recorded_links(md5s, resource_key, resource)
+        if changed_links := find_changed_links(links, md5s):
+            # Deployed with values that have changed since (e.g. a deployment was interrupted in between)
+            modified[resource_key, is_shell] = current_md5, resource, describe_changed_links(changed_links)
+            continue
+
+        unchanged[resource_key] = current_md5
+
+    propagated = propagate_changes(
+        {resource_key: reason for (resource_key, is_shell), (_, _, reason) in modified.items() if not is_shell},
+        set(unchanged), resource_dependencies, resources.__getitem__
+    )
+    for resource_key, reason in propagated.items():
+        modified[resource_key, False] = unchanged[resource_key], resources[resource_key], reason
 
-    return modified
+    return {entry: modified[entry] for entry in linearized_resources if entry in modified}
 
 
 # =============================================================================
@@ -325,7 +360,8 @@ def _lookup_stale_canvas_resource(course: Course, item_type: str, item_id: str,
     return canvas_resource
 
 
-def remove_stale_resources(course: Course, stale: list[tuple[str, str, dict]], md5s: MD5Sums):
+def remove_stale_resources(course: Course, stale: list[tuple[str, str, dict]], md5s: MD5Sums,
+                           concurrency: AdaptiveConcurrency | None = None):
     # Logging stale resource information
     logger.info('=' * 80)
     logger.info(f"Stale resources to remove: {len(stale)}")
@@ -346,10 +382,11 @@ def remove_stale_resources(course: Course, stale: list[tuple[str, str, dict]], m
         logger.info(f'[{index:>{index_width}}/{total}] {rtype:{max_len}}  {rid}')
 
         try:
-            if canvas_resource := _lookup_stale_canvas_resource(course, rtype, rid, canvas_info):
-                canvas_resource.delete()
-                with lock:
-                    md5s.remove((rtype, rid))
+            with track_resource((rtype, rid)), span(f'{rtype} {rid}', category='remove'):
+                if canvas_resource := _lookup_stale_canvas_resource(course, rtype, rid, canvas_info):
+                    canvas_resource.delete()
+                    with lock:
+                        md5s.remove((rtype, rid))
         except ResourceDoesNotExist:
             logger.warning(f'{rtype} {rid} not found on Canvas - already removed')
             with lock:
@@ -360,14 +397,21 @@ def remove_stale_resources(course: Course, stale: list[tuple[str, str, dict]], m
         for index, (rtype, rid, canvas_info) in enumerate(stale, start=1)
     ]
 
-    threaded_execute(items=items, execute=execute)
+    concurrency = concurrency or AdaptiveConcurrency()
+    with concurrency.watch(get_session(course)):
+        threaded_execute(
+            items=items,
+            execute=execute,
+            concurrency=concurrency,
+            get_group=lambda index: stale[index - 1][0],
+        )
 
 
 # =============================================================================
 # Logging
 # =============================================================================
 
-def log_to_deploy(to_deploy: dict, dryrun=False):
+def log_to_deploy(to_deploy: dict):
     grouped = defaultdict(int)
     for (rtype, _), _ in to_deploy.keys():
         grouped[rtype] += 1
@@ -381,29 +425,36 @@ def log_to_deploy(to_deploy: dict, dryrun=False):
 
     logger.info('=' * 40)
 
-    if dryrun:
-        logger.info('Dry run - no resources deployed')
-        return
-
 
 # =============================================================================
 # Main deployment - private helpers
 # =============================================================================
 
-def _prepare_deployment_order(resources: dict) -> tuple[dict, list]:
-    resource_dependencies = get_dependencies(resources)
+def _prepare_deployment_order(resources: dict, resource_dependencies: dict | None = None) -> tuple[dict, list]:
+    if resource_dependencies is None:
+        with span('get_dependencies'):
+            resource_dependencies = get_dependencies(resources)
     logger.debug(f'Dependency graph: {resource_dependencies}')
 
-    resource_order = linearize_dependencies(resource_dependencies, list(SHELL_DEPLOYERS.keys()))
+    with span('linearize_dependencies'):
+        resource_order = linearize_dependencies(resource_dependencies, list(SHELL_DEPLOYERS.keys()))
     logger.debug(f'Linearized dependencies: {resource_order}')
 
     return resource_dependencies, resource_order
 
 
+def _strip_shell_content(resource: CanvasResource) -> dict:
+    """The data of the resource without its content field, which may refer to the other resources of a cycle."""
+    if content_field := SHELL_CONTENT_FIELDS.get(resource['type']):
+        return {**resource['data'], content_field: ''}
+    return resource['data']
+
+
 def _deploy_resources(course: Course, to_deploy: dict, md5s: MD5Sums, report: DeploymentReport,
                       timezone: str, resource_dependencies: dict, resource_order: list, deploy_root: Path,
-                      dryrun=False):
-    log_to_deploy(to_deploy, dryrun=dryrun)
+                      concurrency: AdaptiveConcurrency) -> int:
+    """Deploy the resources in dependency order. Returns the number of resources deployed (not counting shells)."""
+    log_to_deploy(to_deploy)
 
     logger.info('Deploying resources to Canvas')
 
@@ -413,44 +464,79 @@ def _deploy_resources(course: Course, to_deploy: dict, md5s: MD5Sums, report: De
     max_len = max(len(rtype) for (rtype, _), _ in to_deploy.keys())
 
     lock = threading.Lock()
+    renderer = ResourceRenderer()
+    deployed = set()
 
-    # Build ordered items: (resource_key, task_data)
-    # resource_key (without is_shell) is used for dependency tracking
+    # Build ordered items: ((resource_key, is_shell), task_data)
     items = []
+    dependencies = {}
     assigned_index = 0
     for entry in resource_order:
         if entry not in to_deploy:
             continue
         assigned_index += 1
         resource_key, is_shell = entry
-        current_md5, resource = to_deploy[entry]
-        items.append((resource_key, (assigned_index, resource_key, is_shell, current_md5, resource)))
+        current_md5, resource, _ = to_deploy[entry]
+        items.append((entry, (assigned_index, resource_key, is_shell, current_md5, resource)))
 
-    def execute(task_data):
+        if is_shell:
+            # A shell only waits for what its stripped data refers to (e.g. its assignment group),
+            # so the shells of a cycle are created in parallel
+            dependencies[entry] = [
+                (dep, False) for dep in dict.fromkeys(find_dependencies(_strip_shell_content(resource)))
+            ]
+        else:
+            # The shell of a resource that was deployed earlier stands in for it
+            dependencies[entry] = [(resource_key, True)] + [
+                (dep, dep_is_shell)
+                for dep in resource_dependencies.get(resource_key, [])
+                for dep_is_shell in (False, True)
+            ]
+
+    priorities = {
+        resource_key: resource.get('priority', 0)
+        for (resource_key, _), (_, resource, _) in to_deploy.items()
+    }
+
+    # Taken before any resource is deployed, so entries recorded without links are compared
+    # against the values they were rendered with (see get_recorded_links)
+    recorded_links = {
+        resource_key: get_recorded_links(md5s, resource_key, resource)
+        for (resource_key, is_shell), (_, resource, _) in to_deploy.items() if not is_shell
+    }
+
+    def deploy(task_data):
         index, resource_key, is_shell, current_md5, resource = task_data
         rtype, rid = resource_key
 
         if resource_data := resource.get('data'):
             shell_tag = '(shell) ' if is_shell else ''
             logger.info(f'[{index:>{index_width}}/{total}] {shell_tag}{rtype:{max_len}}  {rid}')
+            start = time.perf_counter()
 
+            # Every resource this one refers to has been deployed (or is in the manifest),
+            # so the links can be resolved while other resources are being deployed
+            rendered = {}
+            resolve = _link_resolver(md5s, resource_objs, resource, rendered)
             if is_shell:
                 # Strip the content field to remove cyclic references before resolving,
                 # then resolve remaining structural links (e.g. assignment_group_id)
-                if content_field := SHELL_CONTENT_FIELDS.get(rtype):
-                    resource_data = {**resource_data, content_field: ''}
-                with lock:
-                    snapshot_objs = dict(resource_objs)
-                resource_data = update_links(md5s, resource_data, snapshot_objs, resource)
+                resource_data = renderer.render(_strip_shell_content(resource), resolve)
                 canvas_obj_info, info = deploy_resource(
                     SHELL_DEPLOYERS, course, rtype, resource_data, resource, deploy_root)
                 with lock:
                     resource['data']['canvas_id'] = canvas_obj_info.get('id') if canvas_obj_info else None
             else:
-                with lock:
-                    snapshot_objs = dict(resource_objs)
-                resource_data = update_links(md5s, resource_data, snapshot_objs, resource)
-                resource_data = post_process_resource(resource_data, timezone)
+                # Links and timestamps in a single pass
+                resource_data = renderer.render(resource_data, resolve, datetime.now(ZoneInfo(timezone)))
+                links = get_links(rendered)
+                if links_unchanged(md5s, resource_key, current_md5, recorded_links[resource_key], links):
+                    # Planned because a resource it refers to was deployed, but the values it renders are the same
+                    logger.info(f'{rtype} {rid}: links unchanged - skipped')
+                    if links and 'links' not in (entry := md5s[resource_key]):
+                        with lock:
+                            md5s[resource_key] = entry | {'links': links}
+                    return
                 canvas_obj_info, info = deploy_resource(DEPLOYERS, course, rtype, resource_data, resource, deploy_root)
 
             if canvas_obj_info:
@@ -466,19 +552,38 @@ def _deploy_resources(course: Course, to_deploy: dict, md5s: MD5Sums, report: De
 
             if not is_shell:
                 with lock:
-                    md5s[resource_key] = {"checksum": current_md5, "canvas_info": canvas_obj_info}
+                    md5s[resource_key] = {
+                        "checksum": current_md5,
+                        "canvas_info": canvas_obj_info,
+                        "duration": round(time.perf_counter() - start, 2),
+                        **({"links": links} if links else {})
+                    }
+                    deployed.add(resource_key)
 
-    threaded_execute(
-        items=items,
-        execute=execute,
-        get_dependencies=lambda key: resource_dependencies.get(key, []),
-    )
+    def execute(task_data):
+        _, (rtype, rid), is_shell, _, _ = task_data
+        with track_resource((rtype, rid)), span(f'{rtype} {rid}', category='deploy', shell=is_shell):
+            deploy(task_data)
+
+    with concurrency.watch(get_session(course)):
+        threaded_execute(
+            items=items,
+            execute=execute,
+            get_dependencies=lambda entry: dependencies[entry],
+            concurrency=concurrency,
+            get_group=lambda entry: entry[0][0],
+            get_cost=lambda entry: get_deploy_cost(md5s, entry[0]),
+            get_priority=lambda entry: priorities.get(entry[0], 0),
+        )
+
+    return len(deployed)
 
 
 def _remove_stale_resources(course: Course, resources: dict, md5s: MD5Sums,
-                            allowed_types: set[str] | frozenset[str] | None = None) -> int:
+                            allowed_types: set[str] | frozenset[str] | None = None,
+                            concurrency: AdaptiveConcurrency | None = None) -> int:
     if stale_resources := get_stale_resources(resources, md5s, allowed_types=allowed_types):
-        remove_stale_resources(course, stale_resources, md5s)
+        remove_stale_resources(course, stale_resources, md5s, concurrency=concurrency)
 
     return len(stale_resources) if stale_resources else 0
 
@@ -495,27 +600,69 @@ def _log_completion(actions: list[str], elapsed: float):
 # =============================================================================
 
 def deploy_to_canvas(course: Course, timezone: str, resources: dict[tuple[str, str], CanvasResource],
-                     report: DeploymentReport, deploy_root: Path, dryrun=False, cleanup=False):
+                     report: DeploymentReport, deploy_root: Path, dryrun=False, cleanup=False, discard_journal=False,
+                     max_workers: int | None = None, type_worker_limits: dict[str, int] | None = None,
+                     resource_dependencies: dict[tuple[str, str], list[tuple[str, str]]] | None = None):
+    """
+    Deploy the resources to Canvas.
+
+    ``resource_dependencies`` may be provided when the dependency graph was already computed,
+    e.g. by `mdxcanvas compile`; otherwise it is computed from the resources.
+    """
     logger.info('Preparing resources for deployment to Canvas')
 
-    resource_dependencies, resource_order = _prepare_deployment_order(resources)
+    concurrency = AdaptiveConcurrency(max_workers or DEFAULT_MAX_WORKERS, group_limits=type_worker_limits)
+
+    resource_dependencies, resource_order = _prepare_deployment_order(resources, resource_dependencies)
 
     actions = []
     start_time = time.perf_counter()
 
-    with MD5Sums(course, deploy_root) as md5s:
-        migrate(course, md5s)
+    stale_resource_types = None if cleanup else DEFAULT_STALE_RESOURCE_TYPES
 
-        if to_deploy := identify_modified_or_outdated(
-            resources, resource_order, resource_dependencies, md5s, deploy_root=deploy_root
-        ):
-            _deploy_resources(course, to_deploy, md5s, report, timezone,
-                              resource_dependencies, resource_order, deploy_root=deploy_root, dryrun=dryrun)
-            actions.append(f'{len(to_deploy)} resources deployed')
-
-        stale_resource_types = None if cleanup else DEFAULT_STALE_RESOURCE_TYPES
-        if removed_count := _remove_stale_resources(
-                course, resources, md5s, allowed_types=stale_resource_types):
+    with MD5Sums(course, deploy_root, discard_journal=discard_journal, dryrun=dryrun) as md5s:
+        if dryrun:
+            # Migration edits Canvas (e.g. prunes stale quiz questions), so it waits for a real deployment
+            logger.info('Dry run - skipping migration')
+        else:
+            with span('migrate'):
+                migrate(course, md5s)
+
+        digests = PathDigestCache(get_digest_cache_path(deploy_root))
+        # Also in a dry run: the plan compares checksums of the new algorithm
+        with span('migrate_checksum_algorithm'):
+            migrate_checksum_algorithm(resources, md5s, deploy_root, CHECKSUM_ALGORITHM, digests)
+
+        with span('identify_modified_or_outdated'):
+            to_deploy = identify_modified_or_outdated(
+                resources, resource_order, resource_dependencies, md5s, deploy_root=deploy_root, digests=digests
+            )
+            digests.save()
+
+        if dryrun:
+            possible_updates = {
+                resource_key for (resource_key, is_shell), (checksum, resource, reason) in to_deploy.items()
+                if not is_shell and reason.startswith(DEPENDENCY_CHANGED)
+                and may_be_unchanged(md5s, resource_key, checksum, resource)
+            }
+            plan = plan_deployment(to_deploy, get_stale_resources(resources, md5s, stale_resource_types), md5s,
+                                   possible_updates)
+            report.add_plan(plan)
+            log_plan(plan)
+            return
+
+        if to_deploy:
+            with span('deploy_resources'):
+                deployed_count = _deploy_resources(course, to_deploy, md5s, report, timezone,
+                                  resource_dependencies, resource_order, deploy_root=deploy_root,
+                                  concurrency=concurrency)
+            if deployed_count:
+                actions.append(f'{deployed_count} resources deployed')
+
+        with span('remove_stale_resources'):
+            removed_count = _remove_stale_resources(
+                course, resources, md5s, allowed_types=stale_resource_types, concurrency=concurrency)
+        if removed_count:
             actions.append(f'{removed_count} stale resources removed')
 
     _log_completion(actions, time.perf_counter() - start_time)
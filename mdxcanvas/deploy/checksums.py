@@ -1,38 +1,149 @@
+import gzip
 import hashlib
 import json
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from stat import S_ISDIR, S_ISREG
 from tempfile import TemporaryDirectory
 import unicodedata
 
-import requests
 from canvasapi.course import Course
+from canvasapi.exceptions import ResourceDoesNotExist
+from canvasapi.file import File
 
-from .file import get_file, deploy_file
+from .file import get_file, get_folder_index
+from .journal import STATE_DIR_NAME, DeployJournal, get_journal_path
+from ..concurrency import DEFAULT_MAX_WORKERS
+from ..http_session import get_session
 from ..our_logging import get_logger
 from ..resources import CanvasResource, FileData, MermaidData, QuartoSlidesData, SyllabusData, ZipFileData
-from ..util import to_relative_posix, relative_to_abs
+from ..tracing import span
+from ..util import hash_file, relative_to_abs
 
 logger = get_logger()
 
+MD5_FOLDER_NAME = '_md5s'
+MANIFEST_FILE_NAME = '_manifest.json'
+# The single-file manifest of older versions
 MD5_FILE_NAME = '_md5sums.json'
 
+GZIP_MAGIC = b'\x1f\x8b'
 
-def _compute_checksum_of_path(resource_path: Path) -> bytes:
+# The checksum algorithm of new manifests; existing manifests are migrated to it (see migration.py).
+# Any hashlib algorithm with a fixed digest size works; sha256 is hardware-accelerated on most CPUs.
+CHECKSUM_ALGORITHM = 'sha256'
+# Manifests written before the algorithm was recorded
+LEGACY_CHECKSUM_ALGORITHM = 'md5'
+
+
+def _compute_checksum_of_path(resource_path: Path, digests: 'PathDigestCache | None' = None,
+                              algorithm: str = LEGACY_CHECKSUM_ALGORITHM) -> bytes:
     """Compute checksum of file-tree identified by path"""
 
+    if digests is not None:
+        return digests.get(resource_path, algorithm)
+
     if resource_path.is_file():
-        return hashlib.md5(resource_path.read_bytes()).hexdigest().encode('utf-8')
+        return hash_file(resource_path, algorithm).encode('utf-8')
 
     if resource_path.is_dir():
         file_digests = []
         for file_path in sorted(p for p in resource_path.glob('*')):
-            file_digests.append(_compute_checksum_of_path(file_path))
+            file_digests.append(_compute_checksum_of_path(file_path, algorithm=algorithm))
 
-        return hashlib.md5(b''.join(file_digests)).hexdigest().encode('utf-8')
+        return hashlib.new(algorithm, b''.join(file_digests)).hexdigest().encode('utf-8')
 
     raise FileNotFoundError(f'Path does not exist or is not a file/directory: {resource_path}')
 
 
+class PathDigestCache:
+    """
+    Checksums of local files and directories (as computed by _compute_checksum_of_path), kept between runs
+    for each algorithm.
+
+    A file is only hashed again when its size, mtime or inode changed.
+    A directory checksum is reused while it has the same children and none of them changed.
+    Files modified in the last RACY_SECONDS are hashed again next time:
+    a write within the same mtime tick would otherwise go unnoticed.
+
+    Only the entries used in a run are saved, so the cache does not grow with deleted files.
+    """
+    VERSION = 2
+    RACY_SECONDS = 2
+
+    def __init__(self, path: Path | None = None):
+        self.path = path
+        self.hashed = 0  # Files read this run
+        self._entries: dict[str, tuple[str, str]] = {}
+        self._used: dict[str, tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+        if path is not None:
+            try:
+                data = json.loads(path.read_text())
+                if data.get('version') == self.VERSION:
+                    self._entries = {key: tuple(entry) for key, entry in data['entries'].items()}
+            except (FileNotFoundError, json.JSONDecodeError, KeyError):
+                pass
+
+    def get(self, path: Path, algorithm: str = LEGACY_CHECKSUM_ALGORITHM) -> bytes:
+        return self._get(path, algorithm)[0].encode('utf-8')
+
+    def _get(self, path: Path, algorithm: str) -> tuple[str, str, bool]:
+        """The checksum of the path, its stamp, and whether the checksum may be remembered."""
+        try:
+            stat = path.stat()
+        except OSError:
+            raise FileNotFoundError(f'Path does not exist or is not a file/directory: {path}')
+
+        if S_ISREG(stat.st_mode):
+            stamp = f'{stat.st_size}:{stat.st_mtime_ns}:{stat.st_ino}'
+            cacheable = stat.st_mtime_ns < time.time_ns() - self.RACY_SECONDS * 1_000_000_000
+            if (digest := self._lookup(path, algorithm, stamp)) is None:
+                digest = hash_file(path, algorithm)
+                with self._lock:
+                    self.hashed += 1
+        elif S_ISDIR(stat.st_mode):
+            children = [(child.name, *self._get(child, algorithm)) for child in sorted(path.glob('*'))]
+            stamp = hashlib.md5(
+                '/'.join(f'{name}={child_stamp}' for name, _, child_stamp, _ in children).encode('utf-8')
+            ).hexdigest()
+            cacheable = all(child_cacheable for *_, child_cacheable in children)
+            if (digest := self._lookup(path, algorithm, stamp)) is None:
+                digest = hashlib.new(algorithm, b''.join(d.encode('utf-8') for _, d, _, _ in children)).hexdigest()
+        else:
+            raise FileNotFoundError(f'Path does not exist or is not a file/directory: {path}')
+
+        if cacheable:
+            with self._lock:
+                self._used[f'{algorithm}:{path}'] = stamp, digest
+        return digest, stamp, cacheable
+
+    def _lookup(self, path: Path, algorithm: str, stamp: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(f'{algorithm}:{path}')
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+        return None
+
+    def save(self):
+        with self._lock:
+            if self.path is None or not self._used:
+                return
+            data = {'version': self.VERSION, 'entries': dict(self._used)}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        tmp_path.write_text(json.dumps(data), encoding='utf-8')
+        tmp_path.replace(self.path)
+
+
+def get_digest_cache_path(deploy_root: Path) -> Path:
+    return deploy_root / STATE_DIR_NAME / 'digests.json'
+
+
 def _normalize_json_for_hashing(data: dict) -> str:
     """Normalize JSON data for consistent hashing across platforms"""
     json_str = json.dumps(data, sort_keys=True, ensure_ascii=False)
@@ -41,7 +152,8 @@ def _normalize_json_for_hashing(data: dict) -> str:
 
 
 def compute_md5(obj: CanvasResource | FileData | ZipFileData | MermaidData | QuartoSlidesData | SyllabusData,
-                deploy_root: Path) -> str:
+                deploy_root: Path, digests: PathDigestCache | None = None,
+                algorithm: str = LEGACY_CHECKSUM_ALGORITHM) -> str:
     # Keys that should not affect change detection:
     # - canvas_id: injected by the deployment system at runtime
     FILTERED_KEYS = {'canvas_id'}
@@ -51,7 +163,7 @@ def compute_md5(obj: CanvasResource | FileData | ZipFileData | MermaidData | Qua
     # Hash file *contents* from checksum_paths
     paths = obj.get('checksum_paths', [])
     for path in sorted(paths):
-        hashable += _compute_checksum_of_path(relative_to_abs(Path(path), deploy_root))
+        hashable += _compute_checksum_of_path(relative_to_abs(Path(path), deploy_root), digests, algorithm)
 
     # Build a dict for JSON hashing
     filtered = {k: v for k, v in obj.items() if k not in FILTERED_KEYS}
@@ -60,69 +172,304 @@ def compute_md5(obj: CanvasResource | FileData | ZipFileData | MermaidData | Qua
     json_str = _normalize_json_for_hashing(filtered)
     hashable += json_str.encode('utf-8')
 
-    return hashlib.md5(hashable).hexdigest()
+    return hashlib.new(algorithm, hashable).hexdigest()
+
+
+def compute_checksums(
+        resources: dict[tuple[str, str], CanvasResource],
+        deploy_root: Path,
+        digests: PathDigestCache | None = None,
+        algorithm: str = LEGACY_CHECKSUM_ALGORITHM,
+        max_workers: int = DEFAULT_MAX_WORKERS
+) -> dict[tuple[str, str], str]:
+    """
+    The checksum of every resource with data.
+
+    Resources backed by local files are checksummed on a thread pool, as hashlib releases the GIL
+    while hashing and reading files waits on the disk. Meanwhile, the other resources
+    (only their JSON is hashed) are checksummed on this thread.
+    """
+    checksums = {}
+    with ThreadPoolExecutor(max_workers) as executor:
+        futures = {}
+        for key, resource in resources.items():
+            if (resource_data := resource.get('data')) is None:
+                continue
+            if resource_data.get('checksum_paths'):
+                futures[key] = executor.submit(compute_md5, resource_data, deploy_root, digests, algorithm)
+            else:
+                checksums[key] = compute_md5(resource_data, deploy_root, digests, algorithm)  # pyright: ignore[reportArgumentType]
+
+        for key, future in futures.items():
+            checksums[key] = future.result()
+
+    return checksums
+
+
+class ManifestCache:
+    """
+    Local copy of the manifest last seen on Canvas: the Canvas file id, version (updated_at) and text
+    of its header, and the text of each shard.
+
+    Finding the manifest by name means listing files, so the id is remembered instead:
+    a warm start fetches the header metadata by id, and only downloads the header if its version changed,
+    and then only the shards whose digest changed.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        try:
+            self._data = json.loads(path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._data = {}
+
+    @property
+    def file_id(self) -> int | None:
+        return self._data.get('file_id')
+
+    def get_text(self, header_file: File) -> str | None:
+        """The cached header, if it is the version of the file on Canvas."""
+        updated_at = getattr(header_file, 'updated_at', None)
+        if updated_at is None or self._data.get('file_id') != header_file.id or self._data.get('updated_at') != updated_at:
+            return None
+        return self._data.get('text')
+
+    def get_shard(self, rtype: str, digest: str) -> str | None:
+        shard = self._data.get('shards', {}).get(rtype)
+        return shard['text'] if shard and shard['digest'] == digest else None
+
+    def save(self, file_id: int, updated_at: str | None, text: str, shards: dict[str, str]):
+        self._data = {
+            'file_id': file_id,
+            'updated_at': updated_at,
+            'text': text,
+            'shards': {rtype: {'digest': _shard_digest(shard), 'text': shard} for rtype, shard in shards.items()},
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        tmp_path.write_text(json.dumps(self._data), encoding='utf-8')
+        tmp_path.replace(self.path)
+
+
+def get_manifest_cache_path(deploy_root: Path, course_id: int) -> Path:
+    return deploy_root / STATE_DIR_NAME / f'manifest_{course_id}.json'
+
+
+def _shard_file_name(rtype: str) -> str:
+    return f'_manifest.{rtype}.json.gz'
+
+
+def _shard_digest(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
 
 
 class MD5Sums:
     """
-    Format:
+    The manifest is stored in the _md5s folder on Canvas as a header file (_manifest.json):
     {
         "mdxcanvas_version": <str>,
-        "resources": {
-            "{rtype}|{rid}": {
-                "canvas_info": {
-                    "id":  <str>,
-                    "uri": <str | None>,
-                    "url": <str | None>
-                },
-                "checksum": <str>
-            }
+        "checksum_algorithm": <str>,
+        "shards": {
+            "{rtype}": {"id": <Canvas file id>, "digest": <sha256 of the shard>}
+        }
+    }
+    and a gzipped shard per resource type (_manifest.{rtype}.json.gz):
+    {
+        "{rid}": {
+            "canvas_info": {
+                "id":  <str>,
+                "uri": <str | None>,
+                "url": <str | None>
+            },
+            "checksum": <str>,
+            "checksum_algorithm": <str, if it is not the one of the header (see migrate_checksum_algorithm)>
         }
     }
+
+    Saving uploads only the shards whose content changed, then the header if it changed,
+    so deploying an unchanged course writes nothing.
+    Older versions kept the whole manifest in a single file (_md5sums.json, with "resources" keyed by
+    "{rtype}|{rid}", and no "checksum_algorithm": md5); it is read if there is no header yet,
+    and saved in the new format.
+
+    Every change is also written to a local DeployJournal, which is discarded once the manifest
+    is saved to Canvas. The journal left behind by an interrupted deployment is replayed into the manifest,
+    so its progress is kept and the resources it created are not created again;
+    with ``discard_journal``, it is discarded instead.
+
+    With ``dryrun``, the manifest is only read: nothing is saved to Canvas and the journal is left as is.
+
+    The manifest is cached locally (see ManifestCache).
     """
 
-    def __init__(self, course: Course, deploy_root: Path):
+    def __init__(self, course: Course, deploy_root: Path, discard_journal: bool = False, dryrun: bool = False):
         self._version = None
+        self._checksum_algorithm = CHECKSUM_ALGORITHM
         self._course = course
         self._deploy_root = deploy_root
+        self._discard_journal = discard_journal
+        self._dryrun = dryrun
+        self._journal = DeployJournal(get_journal_path(deploy_root, course.id))
+        self._cache = ManifestCache(get_manifest_cache_path(deploy_root, course.id))
+        # The manifest as it is on Canvas, to only upload what changed
+        self._remote_header: str | None = None
+        self._remote_shards: dict[str, dict] = {}
+
+    def _find_manifest_file(self) -> File | None:
+        if (file_id := self._cache.file_id) is not None:
+            try:
+                header_file = self._course.get_file(file_id)
+                if header_file.display_name == MANIFEST_FILE_NAME:
+                    return header_file
+            except ResourceDoesNotExist:
+                pass
+            logger.debug(f'Cached manifest file {file_id} no longer exists')
+
+        return get_file(self._course, MANIFEST_FILE_NAME, MD5_FOLDER_NAME)
+
+    def _download(self, file: File) -> str:
+        content = get_session(self._course).get(file.url).content
+        # Canvas may or may not serve a .gz file with a gzip Content-Encoding
+        if content[:2] == GZIP_MAGIC:
+            content = gzip.decompress(content)
+        return content.decode('utf-8')
+
+    def _download_shard(self, rtype: str, shard: dict) -> str:
+        if (text := self._cache.get_shard(rtype, shard['digest'])) is not None:
+            return text
+
+        try:
+            shard_file = self._course.get_file(shard['id'])
+        except ResourceDoesNotExist:
+            # Replaced by an upload whose header was never saved, e.g. because the deployment was interrupted
+            logger.debug(f'Manifest shard {shard["id"]} no longer exists; looking it up by name')
+            if (shard_file := get_file(self._course, _shard_file_name(rtype), MD5_FOLDER_NAME)) is None:
+                raise FileNotFoundError(f'The {rtype} shard of the manifest is missing from Canvas')
+        return self._download(shard_file)
+
+    def _read_manifest(self, header_file: File):
+        if (header_text := self._cache.get_text(header_file)) is None:
+            header_text = self._download(header_file)
+
+        header = json.loads(header_text)
+        self._version = header.get('mdxcanvas_version')
+        self._checksum_algorithm = header['checksum_algorithm']
+        shard_texts = {rtype: self._download_shard(rtype, shard) for rtype, shard in header['shards'].items()}
+        self._md5s = {
+            (rtype, rid): entry
+            for rtype, text in shard_texts.items()
+            for rid, entry in json.loads(text).items()
+        }
 
-    def _download_md5s(self):
-        md5_file = get_file(self._course, MD5_FILE_NAME)
-        if md5_file is None:
-            self._version = None
-            self._md5s = {}
+        self._remote_header = header_text
+        self._remote_shards = header['shards']
+        self._cache.save(header_file.id, getattr(header_file, 'updated_at', None), header_text, shard_texts)
+
+    def _read_legacy_manifest(self, md5_file: File):
+        logger.info(f'Converting the manifest ({MD5_FILE_NAME}) to the sharded format')
+        data = json.loads(self._download(md5_file))
+        if 'resources' in data:
+            # Nested format
+            self._version = data.get('mdxcanvas_version')
+            self._checksum_algorithm = data.get('checksum_algorithm', LEGACY_CHECKSUM_ALGORITHM)
+            self._md5s = {
+                tuple(k.split('|', maxsplit=1)): v
+                for k, v in data['resources'].items()
+            }
         else:
-            data = json.loads(requests.get(md5_file.url).text)
-            if 'resources' in data:
-                # New nested format
-                self._version = data.get('mdxcanvas_version')
-                self._md5s = {
-                    tuple(k.split('|', maxsplit=1)): v
-                    for k, v in data['resources'].items()
-                }
+            # Old flat format — no version existed in this format
+            self._version = None
+            self._checksum_algorithm = LEGACY_CHECKSUM_ALGORITHM
+            self._md5s = {
+                tuple(k.split('|', maxsplit=1)): v
+                for k, v in data.items()
+            }
+
+    def _download_md5s(self):
+        self._version = None
+        self._checksum_algorithm = CHECKSUM_ALGORITHM
+        self._md5s = {}
+
+        if header_file := self._find_manifest_file():
+            self._read_manifest(header_file)
+        elif md5_file := get_file(self._course, MD5_FILE_NAME, MD5_FOLDER_NAME):
+            self._read_legacy_manifest(md5_file)
+
+        if not self._dryrun:
+            self._save_md5s()
+
+    def _replay_journal(self):
+        if not self._journal.exists():
+            return
+
+        if self._discard_journal:
+            if self._dryrun:
+                logger.warning(f'Found the journal of an interrupted deployment: {self._journal.path}\n'
+                               f'  The plan does not include its progress, which a deployment would discard')
+                return
+            logger.warning(f'Discarding the journal of an interrupted deployment: {self._journal.path}')
+            self._journal.discard()
+            return
+
+        self._journal.open()
+        entries = self._journal.entries()
+        logger.info(f'Resuming interrupted deployment: restoring {len(entries)} manifest entries')
+        for key, entry in entries:
+            if entry is None:
+                self._md5s.pop(key, None)
             else:
-                # Old flat format — no version existed in this format
-                self._version = None
-                self._md5s = {
-                    tuple(k.split('|', maxsplit=1)): v
-                    for k, v in data.items()
-                }
+                self._md5s[key] = entry
+
+        if self._dryrun:
+            self._journal.close()
+            return
+
+        # Once the restored manifest is on Canvas, the journal is no longer needed
         self._save_md5s()
+        self._journal.discard()
+
+    def _shard_texts(self) -> dict[str, str]:
+        shards = defaultdict(dict)
+        for (rtype, rid), entry in self._md5s.items():
+            shards[rtype][rid] = entry
+        return {rtype: _normalize_json_for_hashing(entries) for rtype, entries in shards.items()}
+
+    def _upload(self, name: str, content: bytes) -> dict:
+        with TemporaryDirectory() as tmpdir:
+            tmpfile = Path(tmpdir) / name
+            tmpfile.write_bytes(content)
+            index = get_folder_index(self._course)
+            return index.upload(index.get_folder(MD5_FOLDER_NAME), tmpfile)
 
     def _save_md5s(self):
-        data = {
+        shard_texts = self._shard_texts()
+
+        shards = {}
+        for rtype, text in sorted(shard_texts.items()):
+            digest = _shard_digest(text)
+            if (remote := self._remote_shards.get(rtype)) and remote['digest'] == digest:
+                shards[rtype] = remote
+                continue
+            logger.debug(f'Uploading the {rtype} shard of the manifest')
+            # mtime=0 keeps the upload reproducible
+            file_json = self._upload(_shard_file_name(rtype), gzip.compress(text.encode('utf-8'), mtime=0))
+            shards[rtype] = {'id': file_json['id'], 'digest': digest}
+            # Uploaded shards are kept even if the header upload fails, so they are not uploaded again
+            self._remote_shards[rtype] = shards[rtype]
+
+        header_text = _normalize_json_for_hashing({
             'mdxcanvas_version': self._version,
-            'resources': {'|'.join(k): v for k, v in self._md5s.items()}
-        }
-        with TemporaryDirectory() as tmpdir:
-            tmpfile = Path(tmpdir) / MD5_FILE_NAME
-            tmpfile.write_text(_normalize_json_for_hashing(data), encoding='utf-8')
-            deploy_file(self._course, FileData(
-                path=(p := to_relative_posix(tmpfile.absolute(), self._deploy_root)),
-                checksum_paths=[p],
-                canvas_folder="_md5s",
-                lock_at=None, unlock_at=None
-            ), self._deploy_root)
+            'checksum_algorithm': self._checksum_algorithm,
+            'shards': shards,
+        })
+        if header_text == self._remote_header:
+            logger.debug('Manifest unchanged; not uploading it')
+            return
+
+        file_json = self._upload(MANIFEST_FILE_NAME, header_text.encode('utf-8'))
+        self._remote_header = header_text
+        self._remote_shards = shards
+        self._cache.save(file_json['id'], file_json.get('updated_at'), header_text, shard_texts)
 
     def items(self):
         return self._md5s.items()
@@ -139,6 +486,12 @@ class MD5Sums:
     def has_mdxcanvas_version(self):
         return self._version is not None
 
+    def get_checksum_algorithm(self) -> str:
+        return self._checksum_algorithm
+
+    def set_checksum_algorithm(self, algorithm: str):
+        self._checksum_algorithm = algorithm
+
     def get_canvas_info(self, item):
         return self.get(item, {}).get('canvas_info')
 
@@ -155,6 +508,8 @@ class MD5Sums:
     def remove(self, item):
         if item in self._md5s:
             del self._md5s[item]
+            if not self._dryrun:
+                self._journal.record(item, None)
 
     def __getitem__(self, item):
         # Act like a dictionary
@@ -162,10 +517,25 @@ class MD5Sums:
 
     def __setitem__(self, key, value):
         self._md5s[key] = value
+        if not self._dryrun:
+            self._journal.record(key, value)
 
     def __enter__(self):
-        self._download_md5s()
+        with span('download_manifest'):
+            self._download_md5s()
+        self._replay_journal()
+        if not self._dryrun:
+            self._journal.open()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self._save_md5s()
+        if self._dryrun:
+            return
+
+        try:
+            with span('save_manifest'):
+                self._save_md5s()
+        finally:
+            self._journal.close()
+        # Only reached if the manifest was saved; otherwise the journal is kept for the next deployment
+        self._journal.discard()
@@ -1,11 +1,14 @@
+import threading
+from collections import defaultdict
+from pathlib import Path
+
 from canvasapi.course import Course
+from canvasapi.exceptions import ResourceDoesNotExist
 from canvasapi.file import File
 from canvasapi.folder import Folder
-from pathlib import Path
 
 from mdxcanvas.util import relative_to_abs
 
-from .util import get_canvas_object
 from ..resources import FileData, FileInfo, StrLike
 from ..our_logging import get_logger
 
@@ -13,10 +16,132 @@ logger = get_logger()
 
 DEFAULT_CANVAS_FOLDER = 'deployed_files'
 
+_index_lock = threading.Lock()
+
+
+class FolderIndex:
+    """
+    The folders of a course by name, and the files of each folder by display name.
+
+    Folders are listed once, on first use, instead of on every lookup.
+    A missing folder is created once, even when several threads ask for it at the same time.
+    The file listing of a folder (or of the course) is dropped when a file is uploaded through the index.
+    """
+
+    def __init__(self, course: Course):
+        self._course = course
+        self._folders: dict[str, Folder] | None = None
+        # Folders looked up by path, including those that do not exist (None)
+        self._paths: dict[str, Folder | None] = {}
+        self._files: dict[int, dict[str, File]] = {}
+        self._course_files: dict[str, File] | None = None
+        self._lock = threading.Lock()
+        # One lock per folder name, so only one thread creates a missing folder
+        self._creating: dict[str, threading.Lock] = defaultdict(threading.Lock)
+
+    def _listed_folders(self) -> dict[str, Folder]:
+        with self._lock:
+            if self._folders is None:
+                folders = {}
+                for folder in self._course.get_folders():
+                    # Like a linear scan, the first folder with a name wins
+                    folders.setdefault(folder.name, folder)
+                self._folders = folders
+            return self._folders
+
+    def find_folder(self, name: StrLike) -> Folder | None:
+        return self._listed_folders().get(str(name))
+
+    def find_folder_by_path(self, path: str) -> Folder | None:
+        """The folder at the path from the root of the course files, looked up without listing every folder."""
+        with self._lock:
+            if path in self._paths:
+                return self._paths[path]
+
+        try:
+            folder = list(self._course.resolve_path(path))[-1]
+        except ResourceDoesNotExist:
+            folder = None
+
+        with self._lock:
+            return self._paths.setdefault(path, folder)
+
+    def get_folder(self, name: StrLike, parent_folder_path="") -> Folder:
+        """The folder with the given name; if it does not exist, it is created (hidden)."""
+        name = str(name)
+        if folder := self.find_folder(name):
+            return folder
+
+        with self._lock:
+            creating = self._creating[name]
+        with creating:
+            if folder := self.find_folder(name):
+                return folder
+
+            logger.debug(f"Creating folder: {name}")
+            folder = self._course.create_folder(name=name, parent_folder_path=parent_folder_path, hidden=True)
+            with self._lock:
+                self._folders[name] = folder
+                self._paths[f'{parent_folder_path}/{name}'.strip('/')] = folder
+            return folder
+
+    def find_file(self, folder: Folder, name: str) -> File | None:
+        with self._lock:
+            files = self._files.get(folder.id)
+        if files is None:
+            files = {}
+            for file in folder.get_files():
+                files.setdefault(file.display_name, file)
+            with self._lock:
+                self._files[folder.id] = files
+        return files.get(name)
+
+    def find_course_file(self, name: str) -> File | None:
+        """A file anywhere in the course; every file of the course is listed once."""
+        with self._lock:
+            files = self._course_files
+        if files is None:
+            files = {}
+            for file in self._course.get_files():
+                # Like a linear scan, the first file with a name wins
+                files.setdefault(file.display_name, file)
+            with self._lock:
+                self._course_files = files
+        return files.get(name)
+
+    def upload(self, folder: Folder, file_path: Path) -> dict:
+        """Upload a file to the folder; returns the JSON of the uploaded file."""
+        try:
+            return folder.upload(file_path)[1]
+        finally:
+            with self._lock:
+                self._files.pop(folder.id, None)
+                self._course_files = None
+
+
+def get_folder_index(course: Course) -> FolderIndex:
+    """The folder index of the course, shared by every deployment made with the course object."""
+    with _index_lock:
+        if (index := getattr(course, '_mdxcanvas_folder_index', None)) is None:
+            index = FolderIndex(course)
+            course._mdxcanvas_folder_index = index  # type: ignore
+        return index
+
 
 # Keeping for Checksums retrieval
-def get_file(course: Course, name: str) -> File | None:
-    return get_canvas_object(course.get_files, 'display_name', name)
+def get_file(course: Course, name: str, folder_path: str | None = None) -> File | None:
+    """
+    Looks up a file by name. With a folder path (from the root of the course files),
+    the folder is looked up by path and only its files are listed,
+    instead of every file in the course (unless the folder does not exist).
+    """
+    index = get_folder_index(course)
+    if folder_path is not None:
+        if folder := index.find_folder_by_path(folder_path):
+            return index.find_file(folder, name)
+        logger.debug(f'Folder {folder_path} not found; searching all course files for {name}')
+
+    return index.find_course_file(name)
 
 
 def get_canvas_folder(course: Course, folder_name: StrLike, parent_folder_path="") -> Folder:
@@ -24,11 +149,7 @@ def get_canvas_folder(course: Course, folder_name: StrLike, parent_folder_path="
     Retrieves an object representing a digital folder in Canvas.
     If the folder does not exist, it is created.
     """
-    if folder := get_canvas_object(course.get_folders, 'name', folder_name):
-        return folder
-
-    logger.debug(f"Creating folder: {folder_name}")
-    return course.create_folder(name=folder_name, parent_folder_path=parent_folder_path, hidden=True)
+    return get_folder_index(course).get_folder(folder_name, parent_folder_path)
 
 
 def deploy_file(course: Course, data: FileData, deploy_root: Path) -> tuple[FileInfo, None]:
@@ -36,9 +157,10 @@ def deploy_file(course: Course, data: FileData, deploy_root: Path) -> tuple[File
     unlock_at = data.get('unlock_at')
 
     canvas_folder = data.get('canvas_folder') or DEFAULT_CANVAS_FOLDER
-    folder = get_canvas_folder(course, canvas_folder)
+    index = get_folder_index(course)
+    folder = index.get_folder(canvas_folder)
     file_path = relative_to_abs(Path(data['path']), deploy_root)
-    file_id = folder.upload(file_path)[1]['id']
+    file_id = index.upload(folder, file_path)['id']
     file = course.get_file(file_id)
 
     # Update the file with lock_at and unlock_at if provided
@@ -0,0 +1,134 @@
+"""
+Which resources to redeploy because a resource they link to changed.
+
+A resource renders fields (id, uri, url, title) of the resources its placeholders refer to
+(see resources.get_key). The manifest records the values a resource was deployed with (its links),
+so a dependent is redeployed when a value it renders changes,
+not whenever a resource it refers to is redeployed.
+
+Whether a value changes is often only known once the dependency is deployed
+(e.g. a re-uploaded file may or may not get a new id), so the plan lists every dependent that may change
+as a possible update (see may_be_unchanged), and the deployment skips those whose links turn out to be the same
+(see links_unchanged).
+"""
+
+from collections import defaultdict, deque
+from typing import Callable
+
+from .checksums import MD5Sums
+from .plan import DEPENDENCY_CHANGED
+from ..resources import CanvasResource, find_references
+
+# [type, id, field, value], e.g. ['file', 'logo.png', 'id', '123']
+Link = list[str]
+
+
+def get_links(values: dict[tuple[str, str, str], str]) -> list[Link]:
+    """The links of a rendered resource, from the value of each (type, id, field) it rendered."""
+    return sorted([rtype, rid, field, value] for (rtype, rid, field), value in values.items())
+
+
+def get_recorded_links(md5s: MD5Sums, resource_key: tuple[str, str], resource: CanvasResource) -> list[Link]:
+    """
+    The links the resource was last deployed with.
+
+    An entry recorded before links were is assumed to be rendered with the values the manifest has now,
+    so the deployment takes them before any dependency is updated (see _deploy_resources).
+    """
+    entry = md5s.get(resource_key) or {}
+    if (links := entry.get('links')) is not None:
+        return links
+
+    values = {}
+    for rtype, rid, field in find_references(resource.get('data')):
+        if (value := (md5s.get_canvas_info((rtype, rid)) or {}).get(field)) is not None:
+            values[rtype, rid, field] = str(value)
+    return get_links(values)
+
+
+def find_changed_links(links: list[Link], md5s: MD5Sums) -> list[tuple[str, str, str]]:
+    """The (type, id, field) of each link whose value in the manifest is no longer the recorded one."""
+    return [
+        (rtype, rid, field)
+        for rtype, rid, field, value in links
+        if str((md5s.get_canvas_info((rtype, rid)) or {}).get(field)) != value
+    ]
+
+
+def links_unchanged(md5s: MD5Sums, resource_key: tuple[str, str], checksum: str,
+                    recorded_links: list[Link], links: list[Link]) -> bool:
+    """
+    Whether the deployed resource is what it would be deployed as: same data, rendered with the same links.
+
+    :param recorded_links: The result of get_recorded_links, before the deployment
+    """
+    return md5s.get_checksum(resource_key) == checksum and recorded_links == links
+
+
+def may_be_unchanged(md5s: MD5Sums, resource_key: tuple[str, str], checksum: str, resource: CanvasResource) -> bool:
+    """
+    Whether the deployment may still skip the resource (see links_unchanged): its data is unchanged,
+    and the values it was rendered with are still those of the manifest,
+    so only the deployment of a resource it refers to can change them.
+    """
+    return (md5s.get_checksum(resource_key) == checksum
+            and not find_changed_links(get_recorded_links(md5s, resource_key, resource), md5s))
+
+
+def describe_dependency_change(dependency: tuple[str, str], fields: list[str], dependency_reason: str) -> str:
+    """e.g. "dependency changed: id of file logo.png (checksum changed)"."""
+    rtype, rid = dependency
+    return f'{DEPENDENCY_CHANGED}: {", ".join(fields)} of {rtype} {rid} ({dependency_reason})'
+
+
+def describe_changed_links(changed: list[tuple[str, str, str]]) -> str:
+    """The reason of a resource rendered with values that have changed since (e.g. by an interrupted deployment)."""
+    fields = defaultdict(list)
+    for rtype, rid, field in changed:
+        fields[rtype, rid].append(field)
+    return '; '.join(
+        describe_dependency_change(dependency, dependency_fields, 'updated since')
+        for dependency, dependency_fields in fields.items()
+    )
+
+
+def propagate_changes(
+        changed: dict[tuple[str, str], str],
+        candidates: set[tuple[str, str]],
+        resource_dependencies: dict[tuple[str, str], list[tuple[str, str]]],
+        get_resource: Callable[[tuple[str, str]], CanvasResource]
+) -> dict[tuple[str, str], str]:
+    """
+    The candidates that render a field of a changed resource, directly or through other candidates.
+
+    Walks the reverse dependency graph from the changed resources, so each dependent is visited once.
+
+    :param changed: The reason of each resource that will be deployed
+    :param candidates: The resources that are unchanged themselves
+    :returns: The reason of each candidate that may change, naming the resource and fields it renders
+    """
+    dependents = defaultdict(list)
+    for resource_key, dependencies in resource_dependencies.items():
+        if resource_key in candidates:
+            for dependency in dict.fromkeys(dependencies):
+                dependents[dependency].append(resource_key)
+
+    reasons = dict(changed)
+    propagated = {}
+    queue = deque(changed)
+    while queue:
+        dependency = queue.popleft()
+        for resource_key in dependents.get(dependency, []):
+            if resource_key in reasons:
+                continue
+
+            fields = sorted({
+                field
+                for rtype, rid, field in find_references(get_resource(resource_key).get('data'))
+                if (rtype, rid) == dependency
+            })
+            reasons[resource_key] = propagated[resource_key] = describe_dependency_change(
+                dependency, fields, reasons[dependency])
+            queue.append(resource_key)
+
+    return propagated
@@ -0,0 +1,75 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+
+from ..our_logging import get_logger
+
+logger = get_logger()
+
+STATE_DIR_NAME = '.mdxcanvas'
+
+
+def get_journal_path(deploy_root: Path, course_id: int) -> Path:
+    return deploy_root / STATE_DIR_NAME / f'deploy_journal_{course_id}.sqlite3'
+
+
+class DeployJournal:
+    """
+    Local, crash-safe record of the manifest changes made during a deployment.
+
+    The manifest (see MD5Sums) is only uploaded to Canvas at the end of a deployment,
+    so every change is also committed here as soon as it happens.
+    If the process dies before the manifest is saved, the next run can replay the journal
+    instead of recreating resources that already exist in Canvas.
+
+    Each row holds the manifest entry of a resource, or NULL if the resource was removed.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit: every statement is durable once it returns
+        self._connection = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            '  rtype TEXT NOT NULL,'
+            '  rid TEXT NOT NULL,'
+            '  entry TEXT,'
+            '  PRIMARY KEY (rtype, rid)'
+            ')'
+        )
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def record(self, key: tuple[str, str], entry: dict | None):
+        with self._lock:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO entries (rtype, rid, entry) VALUES (?, ?, ?)',
+                (*key, None if entry is None else json.dumps(entry))
+            )
+
+    def entries(self) -> list[tuple[tuple[str, str], dict | None]]:
+        with self._lock:
+            rows = self._connection.execute('SELECT rtype, rid, entry FROM entries').fetchall()
+        return [
+            ((rtype, rid), None if entry is None else json.loads(entry))
+            for rtype, rid, entry in rows
+        ]
+
+    def discard(self):
+        """Close and delete the journal, e.g. once its changes are saved in the manifest."""
+        self.close()
+        for suffix in ['', '-wal', '-shm']:
+            self.path.with_name(self.path.name + suffix).unlink(missing_ok=True)
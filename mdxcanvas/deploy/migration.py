@@ -1,10 +1,12 @@
 from collections import defaultdict
+from pathlib import Path
 
 from canvasapi.quiz import Quiz
 
-from .checksums import MD5Sums
+from .checksums import MD5Sums, PathDigestCache, compute_checksums
 from .. import __version__
 from ..our_logging import get_logger
+from ..resources import CanvasResource
 
 logger = get_logger()
 
@@ -144,3 +146,45 @@ def migrate(course, md5s: MD5Sums):
 
     # Now that migration is finished, set the version we are using
     md5s.add_mdxcanvas_version(current_version)
+
+
+def migrate_checksum_algorithm(resources: dict[tuple[str, str], CanvasResource], md5s: MD5Sums,
+                               deploy_root: Path, algorithm: str, digests: PathDigestCache | None = None):
+    """
+    Re-key the stored checksums to another algorithm, without redeploying the course.
+
+    The manifest holds the entries of every input file deployed to the course (and of stale resources),
+    but only those of ``resources`` can be checksummed again. So when the algorithm changes,
+    every entry first records the algorithm of its checksum (see MD5Sums), and keeps it until it is re-keyed.
+
+    Each resource whose entry has another algorithm is checksummed with both algorithms.
+    A resource whose stored checksum matches its current content in the algorithm of its entry
+    gets the checksum of that content in the new algorithm.
+    Changed resources keep the old checksum, which no longer matches, so they are redeployed as usual.
+    The entries of other input files are re-keyed when those are deployed.
+    """
+    stored_algorithm = md5s.get_checksum_algorithm()
+    if stored_algorithm != algorithm:
+        logger.info(f'Migrating checksums from {stored_algorithm} to {algorithm}')
+        for key, entry in md5s.items():
+            if 'checksum_algorithm' not in entry:
+                md5s[key] = entry | {'checksum_algorithm': stored_algorithm}
+        md5s.set_checksum_algorithm(algorithm)
+
+    pending = defaultdict(dict)
+    for key, resource in resources.items():
+        if (entry := md5s.get(key)) and (entry_algorithm := entry.get('checksum_algorithm', algorithm)) != algorithm:
+            pending[entry_algorithm][key] = resource
+    if not pending:
+        return
+
+    for entry_algorithm, entry_resources in pending.items():
+        old_checksums = compute_checksums(entry_resources, deploy_root, digests, entry_algorithm)
+        new_checksums = compute_checksums(entry_resources, deploy_root, digests, algorithm)
+
+        for key, checksum in old_checksums.items():
+            if (entry := md5s[key]).get('checksum') == checksum:
+                md5s[key] = {
+                    **{field: value for field, value in entry.items() if field != 'checksum_algorithm'},
+                    'checksum': new_checksums[key]
+                }
@@ -0,0 +1,166 @@
+from collections import defaultdict
+from typing import TypedDict
+
+from .checksums import MD5Sums
+from ..our_logging import get_logger
+
+logger = get_logger()
+
+CREATE = 'create'
+UPDATE = 'update'
+# Redeployed only if a value it renders changes when a resource it refers to is deployed (see invalidation.py)
+POSSIBLE_UPDATE = 'possible update'
+SHELL = 'shell'
+DELETE = 'delete'
+
+# Why a resource is in the plan
+NEW = 'new'
+CHECKSUM_CHANGED = 'checksum changed'
+DEPENDENCY_CHANGED = 'dependency changed'
+STALE = 'stale'
+
+# Expected seconds to deploy one resource of each type. Used to find the critical path
+# of a deployment until a resource has a measured duration from an earlier run.
+DEFAULT_DEPLOY_COSTS: dict[str, float] = {
+    'announcement': 1.0,
+    'assignment': 1.0,
+    'assignment_group': 0.5,
+    'course_settings': 0.5,
+    'file': 3.0,
+    'mermaid': 6.0,
+    'module': 0.5,
+    'module_item': 0.7,
+    'override': 1.5,
+    'page': 1.0,
+    'quarto-slides': 15.0,
+    'quiz': 2.5,
+    'quiz_question': 2.5,
+    'quiz_question_order': 2.5,
+    'syllabus': 0.5,
+    'zip': 4.0,
+}
+
+DEFAULT_DELETE_COST = 0.5
+
+# HTTP calls made by each deployer when (creating, updating) a resource.
+# Quiz edits unpublish and republish the quiz around the change.
+# File uploads look up the folder, then preflight, upload, confirm and fetch the file.
+ESTIMATED_HTTP_CALLS: dict[str, tuple[int, int]] = {
+    'announcement': (1, 2),
+    'assignment': (1, 2),
+    'assignment_group': (2, 2),
+    'course_settings': (1, 1),
+    'file': (5, 5),
+    'mermaid': (5, 5),
+    'module': (1, 2),
+    'module_item': (2, 3),
+    'override': (2, 3),
+    'page': (1, 2),
+    'quarto-slides': (5, 5),
+    'quiz': (1, 5),
+    'quiz_question': (2, 6),
+    'quiz_question_order': (5, 5),
+    'syllabus': (1, 1),
+    'zip': (5, 5),
+}
+
+# Resources looked up through their parent (module, assignment, quiz) before deletion
+_NESTED_TYPES = {'module_item', 'override', 'quiz_question'}
+
+
+class PlannedAction(TypedDict):
+    type: str
+    id: str
+    action: str
+    reason: str
+    estimated_calls: int
+    estimated_seconds: float
+
+
+def get_deploy_cost(md5s: MD5Sums, resource_key: tuple[str, str]) -> float:
+    """Seconds the resource took to deploy last time, or the default for its type."""
+    if (entry := md5s.get(resource_key)) and (duration := entry.get('duration')):
+        return duration
+    return DEFAULT_DEPLOY_COSTS.get(resource_key[0], 1.0)
+
+
+def _estimate_calls(rtype: str, action: str) -> int:
+    if action == DELETE:
+        return 3 if rtype in _NESTED_TYPES else 2
+
+    create_calls, update_calls = ESTIMATED_HTTP_CALLS.get(rtype, (1, 2))
+    return update_calls if action in (UPDATE, POSSIBLE_UPDATE) else create_calls
+
+
+def plan_deployment(
+        to_deploy: dict,
+        stale: list[tuple[str, str, dict]],
+        md5s: MD5Sums,
+        possible_updates: set[tuple[str, str]] | frozenset[tuple[str, str]] = frozenset()
+) -> list[PlannedAction]:
+    """
+    Describe what a deployment would do, in deployment order, without touching Canvas.
+
+    :param to_deploy: The result of identify_modified_or_outdated
+    :param stale: The result of get_stale_resources
+    :param possible_updates: The resources the deployment may skip (see invalidation.may_be_unchanged)
+    """
+    plan = []
+
+    for ((rtype, rid), is_shell), (_, resource, reason) in to_deploy.items():
+        action = (
+            SHELL if is_shell else
+            POSSIBLE_UPDATE if (rtype, rid) in possible_updates else
+            UPDATE if resource['data'].get('canvas_id') is not None else
+            CREATE
+        )
+        plan.append(PlannedAction(
+            type=rtype,
+            id=rid,
+            action=action,
+            reason=reason,
+            estimated_calls=_estimate_calls(rtype, action),
+            estimated_seconds=get_deploy_cost(md5s, (rtype, rid)),
+        ))
+
+    for rtype, rid, _ in stale:
+        plan.append(PlannedAction(
+            type=rtype,
+            id=rid,
+            action=DELETE,
+            reason=STALE,
+            estimated_calls=_estimate_calls(rtype, DELETE),
+            estimated_seconds=DEFAULT_DELETE_COST,
+        ))
+
+    return plan
+
+
+def log_plan(plan: list[PlannedAction]):
+    logger.info('=' * 80)
+    logger.info(f'Dry run - planned actions: {len(plan)}')
+
+    if plan:
+        max_action_len = max(len(entry['action']) for entry in plan)
+        max_len = max(len(entry['type']) for entry in plan)
+        for entry in plan:
+            logger.info(f"  {entry['action']:{max_action_len}}  {entry['type']:{max_len}}  {entry['id']}"
+                        f"  ({entry['reason']})")
+
+    counts = defaultdict(int)
+    for entry in plan:
+        counts[entry['action']] += 1
+    summary = ', '.join(f'{count} {action}' for action, count in sorted(counts.items()))
+
+    certain = [entry for entry in plan if entry['action'] != POSSIBLE_UPDATE]
+    possible = [entry for entry in plan if entry['action'] == POSSIBLE_UPDATE]
+    total_calls = sum(entry['estimated_calls'] for entry in certain)
+    total_seconds = sum(entry['estimated_seconds'] for entry in certain)
+    logger.info('=' * 80)
+    logger.info(f'Estimated cost: {total_calls} HTTP calls, {total_seconds:.0f}s of deployment work'
+                + (f' ({summary})' if summary else ''))
+    if possible:
+        logger.info(f'Possible updates add up to {sum(entry["estimated_calls"] for entry in possible)} HTTP calls, '
+                    f'{sum(entry["estimated_seconds"] for entry in possible):.0f}s; they are skipped '
+                    f'if the values they render are unchanged once their dependencies are deployed')
+    logger.info('Dry run - nothing was changed in Canvas')
@@ -0,0 +1,105 @@
+"""
+Resolution of placeholders (see resources.get_key) and <timestamp> tags in resource data.
+
+Each string is split once into segments: literal text, placeholders and timestamp tags.
+Rendering then joins the segments of every string in a single pass,
+without serializing the resource to JSON and parsing it back.
+"""
+
+import re
+import threading
+from datetime import datetime
+from typing import Any, Callable
+
+DEFAULT_TIMESTAMP_FORMAT = '%B %d, %Y at %I:%M %p'
+
+_SEGMENT_PATTERN = re.compile(
+    r'''__@@(?P<rtype>[^|]+)\|\|(?P<rid>.+?)\|\|(?P<field>[^@]+)@@__'''
+    r'''|<\s*timestamp\s*(?:format\s*=\s*(?P<quote>["'])(?P<format>[^"']*)(?P=quote))?\s*(?:/>|>\s*</timestamp>)'''
+)
+
+# A placeholder segment is (text, (rtype, rid, field)); a timestamp segment is (text, format)
+Segment = str | tuple[str, tuple[str, str, str]] | tuple[str, str | None]
+
+# Resolves the field of a resource, e.g. ('page', 'intro', 'uri') -> '/courses/1/pages/intro'
+Resolver = Callable[[str, str, str], str]
+
+
+def compile_string(text: str) -> list[Segment] | None:
+    """The segments of the text, or None if it has neither placeholders nor timestamps."""
+    # Most strings have neither; the substring tests are much cheaper than the regex
+    if '__@@' not in text and 'timestamp' not in text:
+        return None
+
+    segments: list[Segment] = []
+    position = 0
+    for match in _SEGMENT_PATTERN.finditer(text):
+        if match.start() > position:
+            segments.append(text[position:match.start()])
+        if match['rtype'] is not None:
+            segments.append((match[0], (match['rtype'], match['rid'], match['field'])))
+        else:
+            segments.append((match[0], match['format']))
+        position = match.end()
+
+    if position == 0:
+        return None
+    if position < len(text):
+        segments.append(text[position:])
+    return segments
+
+
+class ResourceRenderer:
+    """
+    Renders resource data with its placeholders resolved and its timestamps filled in.
+
+    The segments of each distinct string are compiled once and reused,
+    e.g. when a resource is rendered for its shell deployment and again for its full deployment.
+    """
+
+    def __init__(self):
+        self._compiled: dict[str, list[Segment] | None] = {}
+        self._lock = threading.Lock()
+
+    def _segments(self, text: str) -> list[Segment] | None:
+        try:
+            return self._compiled[text]
+        except KeyError:
+            segments = compile_string(text)
+            with self._lock:
+                self._compiled[text] = segments
+            return segments
+
+    def render_string(self, text: str, resolve: Resolver | None = None, now: datetime | None = None) -> str:
+        if (segments := self._segments(text)) is None:
+            return text
+
+        parts = []
+        for segment in segments:
+            if isinstance(segment, str):
+                parts.append(segment)
+                continue
+
+            source, value = segment
+            if isinstance(value, tuple):
+                parts.append(resolve(*value) if resolve else source)
+            else:
+                parts.append(now.strftime(value or DEFAULT_TIMESTAMP_FORMAT) if now else source)
+        return ''.join(parts)
+
+    def render(self, data: Any, resolve: Resolver | None = None, now: datetime | None = None) -> Any:
+        """
+        A copy of the data with placeholders resolved (if ``resolve`` is given)
+        and timestamp tags replaced by ``now`` (if given).
+        Containers are always copied, so the result can be changed without changing the resource.
+        """
+        if isinstance(data, str):
+            return self.render_string(data, resolve, now)
+        if isinstance(data, dict):
+            return {
+                self.render_string(key, resolve, now) if isinstance(key, str) else key: self.render(value, resolve, now)
+                for key, value in data.items()
+            }
+        if isinstance(data, (list, tuple)):
+            return [self.render(item, resolve, now) for item in data]
+        return data
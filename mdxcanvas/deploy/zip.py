@@ -1,4 +1,7 @@
+import codecs
+import io
 import os
+import shutil
 import stat
 from pathlib import Path
 from tempfile import TemporaryDirectory
@@ -6,7 +9,7 @@ from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED
 
 from canvasapi.course import Course
 
-from mdxcanvas.util import to_relative_posix, relative_to_abs
+from mdxcanvas.util import CHUNK_SIZE, to_relative_posix, relative_to_abs
 
 from .file import deploy_file
 from ..our_logging import get_logger
@@ -47,15 +50,40 @@ def _make_zip_info(zip_name: str, file_path: Path):
     return zinfo
 
 
+def _is_text(head: bytes) -> bool:
+    """
+    Whether a file starting with ``head`` is UTF-8 text.
+    A character cut off at the end of the head does not make it binary.
+    """
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(head)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+
 def _write_file(file: Path, zip_name: str, zipf: ZipFile):
+    """
+    Text files are written with normalized line endings, other files as they are.
+    Whether a file is text is decided from its first chunk, so each file is read once,
+    and both are streamed in chunks, so large files are never held in memory.
+    """
     zinfo = _make_zip_info(zip_name, file)
-    try:
-        with open(file) as f:
-            zipf.writestr(zinfo, f.read())
-    except UnicodeDecodeError as _:
-        logger.debug(f'File {file} encountered a decode error during zip {zipf.filename} creation.')
-        with open(file, 'rb') as f:
-            zipf.writestr(zinfo, f.read())
+    # Only decides whether the entry needs ZIP64 extensions (files over 2 GiB)
+    zinfo.file_size = file.stat().st_size
+
+    with open(file, 'rb') as f, zipf.open(zinfo, 'w') as dest:
+        head = f.read(CHUNK_SIZE)
+        if _is_text(head):
+            f.seek(0)
+            # Bytes that are not UTF-8 further into the file are kept as they are
+            text = io.TextIOWrapper(f, encoding='utf-8', errors='surrogateescape')
+            while chunk := text.read(CHUNK_SIZE):
+                dest.write(chunk.encode('utf-8', errors='surrogateescape'))
+        else:
+            logger.debug(f'File {file} encountered a decode error during zip {zipf.filename} creation.')
+            dest.write(head)
+            shutil.copyfileobj(f, dest, CHUNK_SIZE)
 
 
 def _write_files(files: dict[str, str], path_to_zip: str, deploy_root: Path):
@@ -24,6 +24,12 @@ class DeploymentReport:
     def get_content_to_review(self):
         return self.report["content_to_review"]
 
+    def add_plan(self, plan: list[dict]):
+        self.report["plan"] = plan
+
+    def add_http_metrics(self, metrics: dict):
+        self.report["http_metrics"] = metrics
+
     def add_error(self, error: Exception):
         error_type = type(error).__name__
         error_msg = str(error)
@@ -5,7 +5,7 @@ from pathlib import Path
 from canvasapi import exceptions
 from canvasapi.exceptions import ResourceDoesNotExist
 
-from ..main import get_course, load_config
+from ..course_info import get_course, load_config
 from ..our_logging import get_logger
 from ..parallel import threaded_execute
 
@@ -0,0 +1,218 @@
+"""Per-resource instrumentation of the HTTP requests made to Canvas."""
+
+import dataclasses
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Iterator
+from urllib.parse import urlparse
+
+import requests
+
+from .concurrency import _parse_header_float
+
+# The resource (rtype, rid) a worker thread is currently deploying or removing
+_current_resource: ContextVar[tuple[str, str] | None] = ContextVar('current_resource', default=None)
+
+# Requests made outside of any resource, e.g. loading the course or the manifest
+OTHER = 'other'
+
+
+@contextmanager
+def track_resource(resource_key: tuple[str, str]) -> Iterator[None]:
+    """Attribute the requests made by this thread inside the context to the resource."""
+    token = _current_resource.set(resource_key)
+    try:
+        yield
+    finally:
+        _current_resource.reset(token)
+
+
+def endpoint_template(url: str) -> str:
+    """
+    Reduce a URL to the endpoint it calls, so that requests for different objects group together:
+    .../courses/123/pages/syllabus-page -> /api/v1/courses/:id/pages/:url
+    """
+    parsed = urlparse(url)
+    segments = []
+    for segment in parsed.path.split('/'):
+        if segment.isdigit():
+            segment = ':id'
+        elif segments and segments[-1] == 'pages' and segment:
+            segment = ':url'
+        elif len(segment) > 32:
+            # Upload tokens and signatures
+            segment = ':token'
+        segments.append(segment)
+
+    path = '/'.join(segments)
+    # Uploads go to file storage rather than the Canvas API
+    return path if path.startswith('/api/') else f'{parsed.netloc}{path}'
+
+
+def _request_size(request: requests.PreparedRequest) -> int:
+    if isinstance(request.body, (bytes, str)):
+        return len(request.body)
+    return int(request.headers.get('Content-Length') or 0)
+
+
+def _response_size(response: requests.Response) -> int:
+    # Content-Length is the size on the wire (i.e. compressed, if the response is gzipped)
+    if length := response.headers.get('Content-Length'):
+        return int(length)
+    return len(response.content)
+
+
+@dataclasses.dataclass
+class RequestStats:
+    requests: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    latency_seconds: float = 0.0
+    request_cost: float = 0.0
+    statuses: Counter = dataclasses.field(default_factory=Counter)
+
+    def add(self, status: int, sent: int, received: int, latency: float, cost: float):
+        self.requests += 1
+        self.bytes_sent += sent
+        self.bytes_received += received
+        self.latency_seconds += latency
+        self.request_cost += cost
+        self.statuses[status] += 1
+
+    def to_dict(self) -> dict:
+        return {
+            'requests': self.requests,
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'latency_seconds': round(self.latency_seconds, 3),
+            'request_cost': round(self.request_cost, 3),
+            'statuses': {str(status): count for status, count in sorted(self.statuses.items())},
+        }
+
+
+class HttpMetrics:
+    """
+    Records every response received through a session, grouped by resource, resource type and endpoint.
+
+    Requests are attributed to the resource set with track_resource in the thread that made them.
+    """
+
+    def __init__(self):
+        self._total = RequestStats()
+        self._by_resource: dict[tuple[str, str], RequestStats] = defaultdict(RequestStats)
+        self._by_type: dict[str, RequestStats] = defaultdict(RequestStats)
+        # (rtype, method, endpoint) -> stats
+        self._by_endpoint: dict[tuple[str, str, str], RequestStats] = defaultdict(RequestStats)
+        self._rate_limit_remaining: float | None = None
+        self._min_rate_limit_remaining: float | None = None
+        self._lock = threading.Lock()
+
+    def observe_response(self, response: requests.Response, *_args, **_kwargs):
+        """Response hook for a requests.Session."""
+        resource_key = _current_resource.get()
+        rtype = resource_key[0] if resource_key else OTHER
+        method = response.request.method
+        endpoint = endpoint_template(response.url)
+
+        stats = (
+            response.status_code,
+            _request_size(response.request),
+            _response_size(response),
+            response.elapsed.total_seconds(),
+            _parse_header_float(response.headers.get('X-Request-Cost')) or 0.0,
+        )
+        remaining = _parse_header_float(response.headers.get('X-Rate-Limit-Remaining'))
+
+        with self._lock:
+            self._total.add(*stats)
+            self._by_type[rtype].add(*stats)
+            self._by_endpoint[rtype, method, endpoint].add(*stats)
+            if resource_key:
+                self._by_resource[resource_key].add(*stats)
+
+            if remaining is not None:
+                self._rate_limit_remaining = remaining
+                if self._min_rate_limit_remaining is None or remaining < self._min_rate_limit_remaining:
+                    self._min_rate_limit_remaining = remaining
+
+    @contextmanager
+    def watch(self, session: requests.Session) -> Iterator['HttpMetrics']:
+        """Observe every response made through the session while the context is active."""
+        session.hooks['response'].append(self.observe_response)
+        try:
+            yield self
+        finally:
+            session.hooks['response'].remove(self.observe_response)
+
+    def summary(self) -> dict:
+        """JSON-serializable summary for the deployment report."""
+        with self._lock:
+            resources_per_type = Counter(rtype for rtype, _ in self._by_resource)
+
+            by_type = {}
+            for rtype, stats in sorted(self._by_type.items()):
+                by_type[rtype] = stats.to_dict()
+                if count := resources_per_type.get(rtype):
+                    by_type[rtype]['resources'] = count
+                    by_type[rtype]['requests_per_resource'] = round(stats.requests / count, 2)
+                by_type[rtype]['endpoints'] = {
+                    f'{method} {endpoint}': endpoint_stats.to_dict()
+                    for (endpoint_type, method, endpoint), endpoint_stats in sorted(self._by_endpoint.items())
+                    if endpoint_type == rtype
+                }
+
+            return {
+                'total': self._total.to_dict(),
+                'rate_limit_remaining': self._rate_limit_remaining,
+                'min_rate_limit_remaining': self._min_rate_limit_remaining,
+                'by_type': by_type,
+                'by_resource': {
+                    f'{rtype}|{rid}': stats.to_dict()
+                    for (rtype, rid), stats in sorted(self._by_resource.items())
+                },
+            }
+
+    def write_prometheus(self, path: Path):
+        """Write the metrics in the Prometheus text exposition format (e.g. for the node_exporter textfile collector)."""
+        lines = [
+            '# HELP mdxcanvas_http_requests_total HTTP requests made to Canvas.',
+            '# TYPE mdxcanvas_http_requests_total counter',
+        ]
+        with self._lock:
+            endpoints = sorted(self._by_endpoint.items())
+            for (rtype, method, endpoint), stats in endpoints:
+                for status, count in sorted(stats.statuses.items()):
+                    lines.append(f'mdxcanvas_http_requests_total{{type="{rtype}",method="{method}",'
+                                 f'endpoint="{endpoint}",status="{status}"}} {count}')
+
+            for name, help_text, attr in [
+                ('mdxcanvas_http_request_duration_seconds_total', 'Time spent waiting for Canvas responses.',
+                 'latency_seconds'),
+                ('mdxcanvas_http_sent_bytes_total', 'Bytes sent to Canvas.', 'bytes_sent'),
+                ('mdxcanvas_http_received_bytes_total', 'Bytes received from Canvas.', 'bytes_received'),
+                ('mdxcanvas_http_request_cost_total', 'Canvas rate-limit cost of the requests (X-Request-Cost).',
+                 'request_cost'),
+            ]:
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+                for (rtype, method, endpoint), stats in endpoints:
+                    lines.append(f'{name}{{type="{rtype}",method="{method}",endpoint="{endpoint}"}} '
+                                 f'{getattr(stats, attr)}')
+
+            lines += [
+                '# HELP mdxcanvas_resources_total Resources deployed or removed.',
+                '# TYPE mdxcanvas_resources_total counter',
+            ]
+            for rtype, count in sorted(Counter(rtype for rtype, _ in self._by_resource).items()):
+                lines.append(f'mdxcanvas_resources_total{{type="{rtype}"}} {count}')
+
+            if self._min_rate_limit_remaining is not None:
+                lines += [
+                    '# HELP mdxcanvas_rate_limit_remaining_min Lowest X-Rate-Limit-Remaining seen.',
+                    '# TYPE mdxcanvas_rate_limit_remaining_min gauge',
+                    f'mdxcanvas_rate_limit_remaining_min {self._min_rate_limit_remaining}',
+                ]
+
+        path.write_text('\n'.join(lines) + '\n')
@@ -0,0 +1,55 @@
+"""The HTTP session shared by all Canvas and file-storage traffic."""
+
+import requests
+from canvasapi import Canvas
+from canvasapi.course import Course
+from requests.adapters import HTTPAdapter
+
+from .concurrency import DEFAULT_MAX_WORKERS
+from .retry import record_response
+from .tracing import trace_response
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (10.0, 120.0)
+
+
+class _TimeoutHTTPAdapter(HTTPAdapter):
+    """Applies a default timeout; canvasapi never passes one, so requests would otherwise wait forever."""
+
+    def __init__(self, timeout: tuple[float, float], **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def make_session(pool_size: int = DEFAULT_MAX_WORKERS,
+                 timeout: tuple[float, float] = DEFAULT_TIMEOUT) -> requests.Session:
+    """
+    Build a keep-alive session whose connection pool is large enough for every worker,
+    so concurrent requests reuse connections instead of discarding and re-handshaking them.
+    """
+    session = requests.Session()
+
+    adapter = _TimeoutHTTPAdapter(timeout, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    session.headers['Accept-Encoding'] = 'gzip, deflate'
+    session.hooks['response'].append(record_response)
+    session.hooks['response'].append(trace_response)
+
+    return session
+
+
+def use_session(canvas: Canvas, session: requests.Session):
+    """Route every request canvasapi makes for this Canvas instance through the session."""
+    canvas._Canvas__requester._session = session
+
+
+def get_session(course: Course) -> requests.Session:
+    """The session canvasapi uses for every request made on behalf of the course."""
+    return course._requester._session
@@ -1,20 +1,19 @@
 import argparse
-import json
-import logging
 import os
 from pathlib import Path
-from typing import TypedDict
 
-import markdowndata
-import yaml
-from canvasapi import Canvas
-from canvasapi.course import Course
-
-from .deploy.canvas_deploy import deploy_to_canvas
+from .bundle import write_bundle
+from .cli import add_deploy_arguments, add_trace_argument, configure_logging
+from .course_info import CourseInfo, get_course, get_deploy_root, load_config
+from .deploy.canvas_deploy import deploy_to_canvas, get_dependencies
 from .deployment_report import DeploymentReport
+from .http_metrics import HttpMetrics
+from .http_session import get_session
 from .our_logging import get_logger
 from .processing_context import FileContext
+from .recording import record_to
 from .resources import ResourceManager
+from .tracing import span, trace_to
 from .text_processing.jinja_processing import process_jinja
 from .text_processing.markdown_processing import process_markdown
 from .util import parse_soup_from_xml
@@ -24,28 +23,6 @@ from .xml_processing.xml_processing import process_canvas_xml, preprocess_xml
 logger = get_logger()
 
 
-class CourseInfo(TypedDict):
-    CANVAS_API_URL: str
-    CANVAS_COURSE_ID: int
-    LOCAL_TIME_ZONE: str
-    DEPLOY_ROOT: str
-
-
-def load_config(config_path: Path):
-    ext = config_path.suffix.lower()
-    if ext in ['.yaml', '.yml']:
-        return yaml.safe_load(config_path.read_text())
-
-    elif ext in ['.json']:
-        return json.loads(config_path.read_text())
-
-    elif ext in ['.md', '.mdd']:
-        return markdowndata.loads(config_path.read_text())
-
-    else:
-        raise NotImplementedError(f'Unsupported course info format: {config_path.suffix}')
-
-
 def read_content(input_file: Path) -> tuple[list[str], str]:
     return input_file.suffixes, input_file.read_text()
 
@@ -84,13 +61,14 @@ def process_file(
     Post-process the content (whole XML in, whole XML out, e.g. bake CSS)
     """
     if is_jinja(content_type):
-        content = process_jinja(
-            content,
-            global_args,
-            parent_folder,
-            args_path=args_file,
-            templates=templates
-        )
+        with span('process_jinja'):
+            content = process_jinja(
+                content,
+                global_args,
+                parent_folder,
+                args_path=args_file,
+                templates=templates
+            )
 
     if '.md' in content_type:
         # Process Markdown
@@ -99,7 +77,8 @@ def process_file(
             'br', 'a', 'strong', 'em', 'span', 'file',
             'link', 'zip', 'course-link', 'timestamp'
         ]
-        xml_content = process_markdown(content, excluded=excluded, inline=inline)
+        with span('process_markdown'):
+            xml_content = process_markdown(content, excluded=excluded, inline=inline)
 
     else:
         xml_content = content
@@ -109,7 +88,8 @@ def process_file(
         return process_file(resources, deploy_root, parent, content, content_type,
                             global_args, templates=templates, **kwargs)
 
-    xml_content = preprocess_xml(deploy_root, parent_folder, xml_content, resources, load_and_process_file_contents)
+    with span('preprocess_xml'):
+        xml_content = preprocess_xml(deploy_root, parent_folder, xml_content, resources, load_and_process_file_contents)
 
     # Post-process the XML
     global_css = css_file.read_text() if css_file else ''
@@ -117,25 +97,39 @@ def process_file(
     # TODO - after April 2026, the default style in BYU Canvas will
     #  probably address this issue and this line can be removed.
     global_css += 'a { color: oklch(62.3% 0.214 259.815); }\n'
-    return _post_process_content(xml_content, global_css)
-
+    with span('bake_css'):
+        return _post_process_content(xml_content, global_css)
 
-def get_course(api_token: str, api_url: str, canvas_course_id: int) -> Course:
-    """
-    Returns a Canvas Course object for the given API URL, API token, and course ID.
 
-    :param api_url: str: The URL for the Canvas API.
-    :param api_token: str: The authentication token for the Canvas API.
-    :param canvas_course_id: int: The ID of the Canvas course.
-    :return: Course: A Canvas Course object.
-    """
-    canvas = Canvas(api_url, api_token)
-    course: Course = canvas.get_course(canvas_course_id)
-
-    # NB: this is a hack, but it makes things MUCH easier down the line when dealing with announcements
-    course.canvas = canvas  # type: ignore
+def build_resources(
+        input_file: Path,
+        deploy_root: Path,
+        global_args: dict,
+        args_file: Path | None = None,
+        templates: list[Path] | None = None,
+        css_file: Path | None = None
+) -> ResourceManager:
+    """Process the input file into the resources to deploy."""
+    resources = ResourceManager()
+
+    logger.debug('Reading file: ' + str(input_file))
+    content_type, content = read_content(input_file)
+    with span('process_file', path=str(input_file)):
+        processed_content = process_file(
+            resources,
+            deploy_root,
+            input_file.parent,
+            content,
+            content_type,
+            global_args,
+            args_file,
+            templates,
+            css_file
+        )
 
-    return course
+    # Parse file into XML
+    with span('process_canvas_xml'):
+        return process_canvas_xml(resources, processed_content)
 
 
 def main(
@@ -148,62 +142,83 @@ def main(
         css_file: Path | None = None,
         dryrun: bool = False,
         cleanup: bool = False,
-        output_file: str | None = None
+        discard_journal: bool = False,
+        output_file: str | None = None,
+        max_workers: int | None = None,
+        type_worker_limits: dict[str, int] | None = None,
+        metrics_file: Path | None = None,
+        record_file: Path | None = None
 ):
     # Initialize deployment report
     report = DeploymentReport(output_file)
+    http_metrics = HttpMetrics()
     logger = get_logger()
 
     try:
         # Make sure the course actually exists before doing any real effort
         course_info = load_config(course_info_file)
-        course_info_dir = course_info_file.parent.resolve().absolute()
-        deploy_root = (course_info_dir / Path(course_info['DEPLOY_ROOT'])).resolve().absolute()
+        deploy_root = get_deploy_root(course_info_file, course_info)
         global_args = course_info.get('GLOBAL_ARGS', {})
 
-        course = get_course(canvas_api_token, course_info['CANVAS_API_URL'], course_info['CANVAS_COURSE_ID'])
+        with span('get_course'):
+            course = get_course(canvas_api_token, course_info['CANVAS_API_URL'], course_info['CANVAS_COURSE_ID'],
+                                max_workers=max_workers)
         logger.info(f'Connected to Canvas: {course.name} - {course_info["CANVAS_API_URL"]}/courses/{course.id}')
 
         if global_args_file:
             global_args |= load_config(global_args_file)
 
-        resources = ResourceManager()
-
         # Track the input file in context for error messages
         with FileContext(input_file):
-            # Load file
-            logger.debug('Reading file: ' + str(input_file))
-            content_type, content = read_content(input_file)
-            processed_content = process_file(
-                resources,
-                deploy_root,
-                input_file.parent,
-                content,
-                content_type,
-                global_args,
-                args_file,
-                templates,
-                css_file
-            )
-
-            # Parse file into XML
-            resources = process_canvas_xml(resources, processed_content)
+            resources = build_resources(input_file, deploy_root, global_args, args_file, templates, css_file)
 
             # Deploy XML
-            deploy_to_canvas(course, course_info['LOCAL_TIME_ZONE'], resources, report, dryrun=dryrun, cleanup=cleanup,
-                            deploy_root=deploy_root)
+            with http_metrics.watch(get_session(course)), record_to(record_file, course, deploy_root):
+                deploy_to_canvas(course, course_info['LOCAL_TIME_ZONE'], resources, report, dryrun=dryrun,
+                                 cleanup=cleanup, discard_journal=discard_journal, deploy_root=deploy_root, max_workers=max_workers,
+                                 type_worker_limits=type_worker_limits)
 
     except Exception as e:
         logger.exception(f"{type(e).__name__}: {e}")
         report.add_error(e)
 
     finally:
+        report.add_http_metrics(http_metrics.summary())
         report.save_report()
         report.print_report()
+        if metrics_file:
+            http_metrics.write_prometheus(metrics_file)
 
 
-def entry():
-    parser = argparse.ArgumentParser()
+def compile_bundle(
+        course_info_file: Path,
+        input_file: Path,
+        bundle_file: Path,
+        args_file: Path | None = None,
+        global_args_file: Path | None = None,
+        templates: list[Path] | None = None,
+        css_file: Path | None = None
+):
+    """Process the input file and write the result to a bundle that `mdxcanvas apply` can deploy."""
+    course_info = load_config(course_info_file)
+    deploy_root = get_deploy_root(course_info_file, course_info)
+    global_args = course_info.get('GLOBAL_ARGS', {})
+
+    if global_args_file:
+        global_args |= load_config(global_args_file)
+
+    with FileContext(input_file):
+        resources = build_resources(input_file, deploy_root, global_args, args_file, templates, css_file)
+
+    with span('get_dependencies'):
+        resource_dependencies = get_dependencies(resources)
+
+    with span('write_bundle'):
+        write_bundle(bundle_file, resources, resource_dependencies, deploy_root)
+    logger.info(f'Compiled {len(resources)} resources into {bundle_file}')
+
+
+def _add_content_arguments(parser: argparse.ArgumentParser):
     # Time zone identifiers: https://en.wikipedia.org/wiki/List_of_tz_database_time_zones
     # Use the time zone of the canvas course
     parser.add_argument("--course-info", type=Path, default="canvas_course_info.json")
@@ -212,36 +227,61 @@ def entry():
     parser.add_argument("--global-args", type=Path, default=None)
     parser.add_argument("--templates", nargs="+", type=Path, default=[])
     parser.add_argument("--css", type=Path, default=None)
+
+
+def compile_entry(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog='mdxcanvas compile',
+                                     description='Process content into a bundle for `mdxcanvas apply`')
+    _add_content_arguments(parser)
+    parser.add_argument('--output', '-o', type=Path, required=True, help='Path of the bundle to write')
     parser.add_argument('--debug', action='store_true')
-    parser.add_argument('--dryrun', '--dry-run', action='store_true')
-    parser.add_argument(
-        '--cleanup',
-        action='store_true',
-        help='Remove all Canvas resources not present in the input file. '
-             'Stale quiz questions and module items are removed by default.'
-    )
-    parser.add_argument('--output-file', type=str, default=None)
+    add_trace_argument(parser)
+    args = parser.parse_args(argv)
+
+    configure_logging(args)
+
+    with trace_to(args.trace):
+        compile_bundle(
+            course_info_file=args.course_info,
+            input_file=args.filename,
+            bundle_file=args.output,
+            args_file=args.args,
+            global_args_file=args.global_args,
+            templates=args.templates,
+            css_file=args.css
+        )
+
+
+def entry():
+    parser = argparse.ArgumentParser()
+    _add_content_arguments(parser)
+    add_deploy_arguments(parser)
     args = parser.parse_args()
 
     api_token = os.environ.get("CANVAS_API_TOKEN")
     if api_token is None:
         raise ValueError("Please set the CANVAS_API_TOKEN environment variable")
 
-    if args.debug:
-        logger.setLevel(logging.DEBUG)
-
-    main(
-        canvas_api_token=api_token,
-        course_info_file=args.course_info,
-        input_file=args.filename,
-        args_file=args.args,
-        global_args_file=args.global_args,
-        templates=args.templates,
-        css_file=args.css,
-        dryrun=args.dryrun,
-        cleanup=args.cleanup,
-        output_file=args.output_file
-    )
+    configure_logging(args)
+
+    with trace_to(args.trace):
+        main(
+            canvas_api_token=api_token,
+            course_info_file=args.course_info,
+            input_file=args.filename,
+            args_file=args.args,
+            global_args_file=args.global_args,
+            templates=args.templates,
+            css_file=args.css,
+            dryrun=args.dryrun,
+            cleanup=args.cleanup,
+            discard_journal=args.discard_journal,
+            output_file=args.output_file,
+            max_workers=args.max_workers,
+            type_worker_limits=dict(args.max_type_workers),
+            metrics_file=args.metrics_file,
+            record_file=args.record
+        )
 
 
 if __name__ == '__main__':
@@ -1,44 +1,133 @@
 """Parallel execution utilities with dependency-aware scheduling."""
 
-from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import heapq
 import time
 from typing import TypeVar, Callable, Sequence, Hashable
-from canvasapi.exceptions import RateLimitExceeded, CanvasException
 
+from .concurrency import DEFAULT_MAX_WORKERS, AdaptiveConcurrency
 from .our_logging import get_logger
+from .retry import (
+    CONNECTION_ERROR, RATE_LIMIT, SERVER_ERROR, CircuitBreaker, RetryPolicy, classify_error, pop_retry_after,
+    start_attempt
+)
+from .tracing import span
 
 K = TypeVar('K', bound=Hashable)
 T = TypeVar('T')
 
 
-def _execute_with_rate_limit_retry(
+def _execute_with_retry(
     key: Hashable,
     data: T,
     execute: Callable[[T], None],
-    max_rate_limit_retries: int,
-    rate_limit_cooldown_seconds: float,
+    retry_policy: RetryPolicy,
+    circuit_breaker: CircuitBreaker,
 ) -> None:
     logger = get_logger()
+    attempts: Counter = Counter()
+
+    while True:
+        if pause := circuit_breaker.remaining_open_time():
+            with span('circuit breaker open', category='wait'):
+                time.sleep(pause)
+            continue
 
-    for attempt in range(max_rate_limit_retries + 1):
         try:
+            start_attempt()
             execute(data)
+            circuit_breaker.record_success()
             return
-        except (RateLimitExceeded, CanvasException) as e:
-            if not isinstance(e, RateLimitExceeded) and not (
-                isinstance(e, CanvasException) and 'status code 429' in e.message
-            ):
+        except Exception as e:
+            if not (error_class := classify_error(e)):
                 raise
-            if attempt == max_rate_limit_retries:
+
+            if error_class != RATE_LIMIT:
+                circuit_breaker.record_failure()
+
+            attempt = attempts[error_class]
+            budget = retry_policy.budget(error_class)
+            if attempt >= budget:
                 raise
-            retry_number = attempt + 1
+            attempts[error_class] += 1
+
+            delay = retry_policy.delay(attempt, pop_retry_after())
             logger.warning(
-                f'Rate limited while processing task {key!r}; '
-                f'retrying in {rate_limit_cooldown_seconds:.1f}s '
-                f'({retry_number}/{max_rate_limit_retries})'
+                f'{error_class.replace("_", " ").capitalize()} while processing task {key!r}; '
+                f'retrying in {delay:.1f}s ({attempt + 1}/{budget})'
             )
-            time.sleep(rate_limit_cooldown_seconds)
+            with span(f'retry after {error_class}', category='wait'):
+                time.sleep(delay)
+
+
+def _build_task_graph(
+    items: Sequence[tuple[K, T]],
+    get_dependencies: Callable[[K], Sequence[K]] | None,
+) -> tuple[list[list[int]], list[int]]:
+    """
+    Build the item-level dependency graph.
+
+    An item depends on the most recent earlier item of each key it depends on,
+    and on the most recent earlier item sharing its own key.
+    Later items are ignored, which is how callers break cycles: the given order decides.
+
+    Returns the dependents of each item and the number of unfinished prerequisites of each item.
+    """
+    last_index_by_key: dict[K, int] = {}
+    dependents: list[list[int]] = [[] for _ in items]
+    in_degree = [0] * len(items)
+
+    for index, (key, _) in enumerate(items):
+        dep_keys = set(get_dependencies(key)) if get_dependencies else set()
+        dep_keys.add(key)
+
+        prerequisites = {last_index_by_key[dep_key] for dep_key in dep_keys if dep_key in last_index_by_key}
+        for prerequisite in prerequisites:
+            dependents[prerequisite].append(index)
+        in_degree[index] = len(prerequisites)
+
+        last_index_by_key[key] = index
+
+    return dependents, in_degree
+
+
+def _rank_tasks(
+    items: Sequence[tuple[K, T]],
+    dependents: list[list[int]],
+    get_cost: Callable[[K], float] | None,
+    get_priority: Callable[[K], float] | None,
+) -> list[tuple[float, float, int]]:
+    """
+    Rank each item for the ready queue: smaller ranks start first.
+
+    Items are ordered by priority, then by the length of the longest (costliest)
+    chain of work that waits on them, then by their position in items.
+    An item inherits the priority of anything that depends on it,
+    since a prioritized item cannot start before its prerequisites.
+    """
+    critical_path = [0.0] * len(items)
+    priority = [0.0] * len(items)
+
+    # Dependents always come later in items, so one reverse pass sees them first
+    for index in reversed(range(len(items))):
+        key = items[index][0]
+        critical_path[index] = (get_cost(key) if get_cost else 1.0) + max(
+            (critical_path[dependent] for dependent in dependents[index]), default=0.0)
+        priority[index] = max(
+            [get_priority(key) if get_priority else 0.0] + [priority[dependent] for dependent in dependents[index]])
+
+    return [(-priority[index], -critical_path[index], index) for index in range(len(items))]
+
+
+def _has_capacity(concurrency: AdaptiveConcurrency | None, running_count: int) -> bool:
+    limit = concurrency.limit if concurrency else DEFAULT_MAX_WORKERS
+    return running_count < limit
+
+
+def _group_has_capacity(concurrency: AdaptiveConcurrency | None, group: Hashable, running_by_group: Counter) -> bool:
+    group_limit = concurrency.group_limit(group) if concurrency else None
+    return group_limit is None or running_by_group[group] < group_limit
 
 
 def threaded_execute(
@@ -47,26 +136,49 @@ def threaded_execute(
     get_dependencies: Callable[[K], Sequence[K]] | None = None,
     max_rate_limit_retries: int = 3,
     rate_limit_cooldown_seconds: float = 2.0,
+    concurrency: AdaptiveConcurrency | None = None,
+    get_group: Callable[[K], Hashable] | None = None,
+    retry_policy: RetryPolicy | None = None,
+    circuit_breaker: CircuitBreaker | None = None,
+    get_cost: Callable[[K], float] | None = None,
+    get_priority: Callable[[K], float] | None = None,
 ):
     """
     Execute tasks in parallel using a thread pool, respecting dependency ordering.
 
-    Items are submitted to the thread pool in the order given. If get_dependencies is
-    provided, each item waits for its dependency futures to complete before being submitted.
-    Multiple items may share the same key; all futures for a key are tracked together.
+    Each item is submitted to the thread pool as soon as its last prerequisite completes,
+    so a slow task only delays the items that actually depend on it.
+    When several items are ready, higher priorities go first, then the items
+    with the longest chain of dependent work (the critical path).
+    The first failure cancels every task that has not started yet and is re-raised.
 
     Args:
         items: Sequence of (key, data) pairs in desired scheduling order.
             Keys are used for dependency tracking. Data is passed to the execute callable.
+            Items sharing a key run one after another, in the order given.
         execute: Callable that processes each item's data. Called once per item.
             May be called from different threads; callers are responsible for
             thread safety of any shared state accessed within execute.
         get_dependencies: Optional callable that returns dependency keys for a given key.
-            If provided, an item will not start until all its dependencies with futures
-            have completed. Only keys present in items are meaningful.
+            If provided, an item will not start until every earlier item with one of
+            those keys has completed. Keys of later items are ignored.
         max_rate_limit_retries: Number of retry attempts after an initial
             rate-limit failure (HTTP 429 / "Rate Limit Exceeded").
-        rate_limit_cooldown_seconds: Sleep duration between rate-limit retries.
+            Ignored when retry_policy is given.
+        rate_limit_cooldown_seconds: Base delay of the exponential backoff between retries.
+            Ignored when retry_policy is given.
+        concurrency: Optional controller that sizes the thread pool and limits how many
+            tasks are in flight at once, overall and per group.
+        get_group: Optional callable that returns the group of a key (e.g. its resource type),
+            used for the per-group limits of the concurrency controller.
+        retry_policy: Optional retry budgets per error class and backoff settings.
+            Defaults to retrying rate limits, 5xx responses and connection errors
+            max_rate_limit_retries times each.
+        circuit_breaker: Optional breaker shared by all workers; pauses them together
+            while Canvas keeps failing. A new breaker is used for each call by default.
+        get_cost: Optional callable that returns the expected duration of a key's task.
+            Every task costs 1 by default, so the critical path counts tasks.
+        get_priority: Optional callable that returns the priority of a key (higher starts sooner).
 
     Raises:
         Any exception raised by an execute callable is propagated.
@@ -79,28 +191,66 @@ def threaded_execute(
     if rate_limit_cooldown_seconds < 0:
         raise ValueError('rate_limit_cooldown_seconds must be >= 0')
 
-    futures_by_key: dict[K, list] = defaultdict(list)
-    futures = []
-
-    with ThreadPoolExecutor() as executor:
-        for key, data in items:
-            # Wait in the main thread for dependency futures before submitting
-            if get_dependencies:
-                for dep_key in get_dependencies(key):
-                    for fut in futures_by_key.get(dep_key, []):
-                        fut.result()
-
-            fut = executor.submit(
-                _execute_with_rate_limit_retry,
-                key,
-                data,
-                execute,
-                max_rate_limit_retries,
-                rate_limit_cooldown_seconds,
-            )
-            futures_by_key[key].append(fut)
-            futures.append(fut)
+    retry_policy = retry_policy or RetryPolicy(
+        retry_budgets={
+            RATE_LIMIT: max_rate_limit_retries,
+            SERVER_ERROR: max_rate_limit_retries,
+            CONNECTION_ERROR: max_rate_limit_retries,
+        },
+        base_delay=rate_limit_cooldown_seconds,
+    )
+    circuit_breaker = circuit_breaker or CircuitBreaker()
+
+    dependents, in_degree = _build_task_graph(items, get_dependencies)
+    ranks = _rank_tasks(items, dependents, get_cost, get_priority)
+    ready = [ranks[index] for index, degree in enumerate(in_degree) if degree == 0]
+    heapq.heapify(ready)
+    running: dict[Future, int] = {}
+    running_by_group: Counter = Counter()
+
+    def group_of(index: int) -> Hashable:
+        return get_group(items[index][0]) if get_group else None
+
+    with ThreadPoolExecutor(concurrency.max_limit if concurrency else DEFAULT_MAX_WORKERS) as executor:
+        try:
+            while ready or running:
+                # Only hand the pool as many tasks as it may run,
+                # so that the next free worker takes the best-ranked ready task
+                waiting = []
+                while ready and _has_capacity(concurrency, len(running)):
+                    rank = heapq.heappop(ready)
+                    index = rank[-1]
+                    group = group_of(index)
+                    if not _group_has_capacity(concurrency, group, running_by_group):
+                        waiting.append(rank)
+                        continue
+
+                    key, data = items[index]
+                    fut = executor.submit(
+                        _execute_with_retry,
+                        key,
+                        data,
+                        execute,
+                        retry_policy,
+                        circuit_breaker,
+                    )
+                    running[fut] = index
+                    running_by_group[group] += 1
+
+                for rank in waiting:
+                    heapq.heappush(ready, rank)
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    index = running.pop(fut)
+                    running_by_group[group_of(index)] -= 1
+                    fut.result()
+
+                    for dependent in dependents[index]:
+                        in_degree[dependent] -= 1
+                        if in_degree[dependent] == 0:
+                            heapq.heappush(ready, ranks[dependent])
 
-        # Wait for all remaining futures and propagate exceptions
-        for fut in as_completed(futures):
-            fut.result()
+        except BaseException:
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
@@ -0,0 +1,242 @@
+"""
+Record the Canvas traffic of a deployment and replay it.
+
+A recording holds every request (method and URL) and response (status, headers, body and latency)
+of one run. Authorization headers are never recorded; signatures and access tokens in URLs and
+JSON bodies (e.g. file verifiers and upload policies) are replaced by a digest of their value,
+so a redacted URL in a replayed response still matches the request made with it.
+The local manifest cache is saved with the recording, as it decides how the manifest is fetched.
+
+ReplayAdapter serves a recording back to canvasapi with the recorded latencies,
+so a deployment can be benchmarked against real Canvas timings without a network.
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import requests
+from canvasapi import Canvas
+from canvasapi.course import Course
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from . import __version__
+from .concurrency import DEFAULT_MAX_WORKERS
+from .deploy.checksums import get_manifest_cache_path
+from .http_metrics import _request_size, endpoint_template
+from .http_session import get_session, make_session, use_session
+
+RECORDING_FORMAT = 'mdxcanvas-recording'
+RECORDING_VERSION = 1
+
+REDACTED = 'redacted-'
+
+# Response headers needed to replay pagination and rate limiting
+RECORDED_HEADERS = ['Content-Type', 'Link', 'Retry-After', 'X-Rate-Limit-Remaining', 'X-Request-Cost']
+
+_SECRET_NAMES = (r'access_token|verifier|sf_verifier|signature|policy|key-pair-id'
+                 r'|x-amz-signature|x-amz-credential|x-amz-security-token|token')
+_QUERY_SECRET = re.compile(rf'(?i)\b({_SECRET_NAMES})=([^&"\'\s<>\\]+)')
+_JSON_SECRET = re.compile(rf'(?i)"({_SECRET_NAMES})"(\s*:\s*)"([^"\\]*)"')
+
+
+def _redact_value(value: str) -> str:
+    if value.startswith(REDACTED):
+        return value
+    return REDACTED + hashlib.sha256(value.encode('utf-8')).hexdigest()[:16]
+
+
+def redact(text: str) -> str:
+    """Replace secrets in URLs and JSON fields with a stable digest of their value."""
+    text = _QUERY_SECRET.sub(lambda m: f'{m[1]}={_redact_value(m[2])}', text)
+    return _JSON_SECRET.sub(lambda m: f'"{m[1]}"{m[2]}"{_redact_value(m[3])}"', text)
+
+
+class TrafficRecorder:
+    def __init__(self):
+        self._exchanges: list[dict] = []
+        self._course: dict = {}
+        self._api_url = ''
+        self._manifest_cache: str | None = None
+        self._origin = time.monotonic()
+        self._lock = threading.Lock()
+
+    def observe_response(self, response: requests.Response, *_args, **_kwargs):
+        """Response hook for a requests.Session."""
+        elapsed = response.elapsed.total_seconds()
+        exchange = {
+            'start': round(time.monotonic() - self._origin - elapsed, 6),
+            'elapsed': round(elapsed, 6),
+            'thread': threading.current_thread().name,
+            'method': response.request.method,
+            'url': redact(response.request.url),
+            'request_bytes': _request_size(response.request),
+            'status': response.status_code,
+            'headers': {
+                name: redact(value)
+                for name in RECORDED_HEADERS
+                if (value := response.headers.get(name)) is not None
+            },
+        }
+        try:
+            exchange['body'] = redact(response.content.decode('utf-8'))
+        except UnicodeDecodeError:
+            exchange['body_base64'] = base64.b64encode(response.content).decode('ascii')
+
+        with self._lock:
+            self._exchanges.append(exchange)
+
+    @contextmanager
+    def watch(self, course: Course, deploy_root: Path) -> Iterator['TrafficRecorder']:
+        """Record every response made on behalf of the course while the context is active."""
+        self._course = {'id': course.id, 'name': course.name}
+        self._api_url = course._requester.original_url
+        cache_path = get_manifest_cache_path(deploy_root, course.id)
+        self._manifest_cache = cache_path.read_text() if cache_path.exists() else None
+        self._origin = time.monotonic()
+
+        session = get_session(course)
+        session.hooks['response'].append(self.observe_response)
+        try:
+            yield self
+        finally:
+            session.hooks['response'].remove(self.observe_response)
+
+    def write(self, path: Path):
+        with self._lock:
+            recording = {
+                'format': RECORDING_FORMAT,
+                'version': RECORDING_VERSION,
+                'mdxcanvas_version': __version__,
+                'api_url': self._api_url,
+                'course': self._course,
+                'manifest_cache': self._manifest_cache,
+                'exchanges': sorted(self._exchanges, key=lambda exchange: exchange['start']),
+            }
+
+        data = json.dumps(recording, separators=(',', ':')).encode('utf-8')
+        path.write_bytes(gzip.compress(data, mtime=0) if path.suffix == '.gz' else data)
+
+
+@contextmanager
+def record_to(path: Path | None, course: Course, deploy_root: Path) -> Iterator[None]:
+    """Record the Canvas traffic of the course inside the context to the path (if a path is given)."""
+    if path is None:
+        yield
+        return
+
+    recorder = TrafficRecorder()
+    with recorder.watch(course, deploy_root):
+        try:
+            yield
+        finally:
+            # Also written when the deployment fails, so the recording can go with the bug report
+            recorder.write(path)
+
+
+def load_recording(path: Path) -> dict:
+    data = path.read_bytes()
+    recording = json.loads(gzip.decompress(data) if path.suffix == '.gz' else data)
+
+    if recording.get('format') != RECORDING_FORMAT:
+        raise ValueError(f'{path} is not an mdxcanvas recording')
+
+    if recording.get('version') != RECORDING_VERSION:
+        raise ValueError(f'Unsupported recording version {recording.get("version")} in {path} '
+                         f'(expected {RECORDING_VERSION})')
+
+    return recording
+
+
+def restore_manifest_cache(recording: dict, deploy_root: Path):
+    """Put the local manifest cache back in the state it was in when the recording started."""
+    cache_path = get_manifest_cache_path(deploy_root, recording['course']['id'])
+    if recording['manifest_cache'] is None:
+        cache_path.unlink(missing_ok=True)
+    else:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(recording['manifest_cache'])
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Answers requests from a recording, after waiting the recorded latency (times ``time_scale``).
+
+    Each request gets the next unused response recorded for the same method and URL.
+    Requests the recording does not have (e.g. because the code under test calls Canvas differently)
+    get a response recorded for the same endpoint, and are counted in ``unmatched``.
+    """
+
+    def __init__(self, recording: dict, time_scale: float = 1.0):
+        super().__init__()
+        self.time_scale = time_scale
+        self.matched = 0
+        self.unmatched = 0
+
+        self._by_url: dict[tuple[str, str], deque[dict]] = defaultdict(deque)
+        self._by_endpoint: dict[tuple[str, str], list[dict]] = defaultdict(list)
+        for exchange in recording['exchanges']:
+            self._by_url[exchange['method'], exchange['url']].append(exchange)
+            self._by_endpoint[exchange['method'], endpoint_template(exchange['url'])].append(exchange)
+
+        self._endpoint_uses: dict[tuple[str, str], int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def _next_exchange(self, method: str, url: str) -> dict:
+        with self._lock:
+            if exchanges := self._by_url.get((method, url)):
+                self.matched += 1
+                return exchanges.popleft()
+
+            endpoint = method, endpoint_template(url)
+            if not (samples := self._by_endpoint.get(endpoint)):
+                raise LookupError(f'The recording has no response for {method} {url}')
+
+            self.unmatched += 1
+            uses = self._endpoint_uses[endpoint]
+            self._endpoint_uses[endpoint] += 1
+            return samples[uses % len(samples)]
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        exchange = self._next_exchange(request.method, redact(request.url))
+        time.sleep(exchange['elapsed'] * self.time_scale)
+
+        response = requests.Response()
+        response.status_code = exchange['status']
+        response.url = request.url
+        response.request = request
+        response.headers = CaseInsensitiveDict(exchange['headers'])
+        response.encoding = 'utf-8'
+        if 'body_base64' in exchange:
+            response._content = base64.b64decode(exchange['body_base64'])
+        else:
+            response._content = exchange['body'].encode('utf-8')
+        return response
+
+    def close(self):
+        pass
+
+
+def connect_replay(recording: dict, time_scale: float = 1.0,
+                   max_workers: int | None = None) -> tuple[Course, ReplayAdapter]:
+    """The equivalent of `course_info.get_course` for a recording: every request is answered by the replay."""
+    replay = ReplayAdapter(recording, time_scale)
+
+    canvas = Canvas(recording['api_url'], 'replay-token')
+    session = make_session(max_workers or DEFAULT_MAX_WORKERS)
+    session.mount('https://', replay)
+    session.mount('http://', replay)
+    use_session(canvas, session)
+
+    course = Course(canvas._Canvas__requester, recording['course'])
+    course.canvas = canvas  # type: ignore
+    return course, replay
@@ -1,8 +1,13 @@
 import re
-from typing import Any, NotRequired, TypedDict, Iterator, no_type_check
-from bs4._typing import _AttributeValue
+from typing import TYPE_CHECKING, Any, NotRequired, TypedDict, Iterator, no_type_check
 
-StrLike = str | _AttributeValue
+if TYPE_CHECKING:
+    from bs4._typing import _AttributeValue
+
+    StrLike = str | _AttributeValue
+else:
+    # Deploying a compiled bundle must not import bs4
+    StrLike = str
 
 
 #
@@ -105,6 +110,7 @@ class CanvasResource(TypedDict):
     id: str | Any
     data: 'dict | FileData | ZipFileData | QuartoSlidesData | MermaidData | SyllabusData'
     content_path: str
+    priority: NotRequired[int]  # higher deploys sooner
 
 
 class CourseSettings(TypedDict):
@@ -175,14 +181,53 @@ def get_key(rtype: StrLike, rid: StrLike, field: str):
     return f'__@@{rtype}||{rid}||{field}@@__'
 
 
+def find_references(obj: Any) -> Iterator[tuple[str, str, str]]:
+    """The (type, id, field) of every placeholder in the strings of a resource, in the order they appear."""
+    if isinstance(obj, str):
+        # Most strings have no placeholder; the substring test is much cheaper than the regex
+        if '__@@' in obj:
+            for _, rtype, rid, field in iter_keys(obj):
+                yield rtype, rid, field
+    elif isinstance(obj, dict):
+        for key, value in obj.items():
+            yield from find_references(key)
+            yield from find_references(value)
+    elif isinstance(obj, (list, tuple)):
+        for item in obj:
+            yield from find_references(item)
+
+
+def find_dependencies(obj: Any) -> Iterator[tuple[str, str]]:
+    """The (type, id) of every placeholder in the strings of a resource, in the order they appear."""
+    for rtype, rid, _ in find_references(obj):
+        yield rtype, rid
+
+
 class ResourceManager(dict[tuple[str, str], CanvasResource]):
+    """
+    The resources of a course by (type, id).
+
+    The dependencies of a resource (the resources its placeholders refer to) are indexed when it is added,
+    so the dependency graph does not need another pass over every resource.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._dependencies: dict[tuple[str, str], list[tuple[str, str]]] = {}
 
     def _add_resource(self, resource: CanvasResource) -> tuple[str, str]:
         rtype = resource['type']
         rid = resource['id']
         self[rtype, rid] = resource
+        self._dependencies[rtype, rid] = list(find_dependencies(resource))
         return rtype, rid
 
+    def get_dependencies_of(self, key: tuple[str, str]) -> list[tuple[str, str]]:
+        if (dependencies := self._dependencies.get(key)) is None:
+            # Assigned directly rather than added
+            dependencies = self._dependencies[key] = list(find_dependencies(self[key]))
+        return list(dependencies)
+
     def add_resource_get_field(self, resource: CanvasResource, field: str) -> str:
         rtype, rid = self._add_resource(resource)
         return get_key(rtype, rid, field)
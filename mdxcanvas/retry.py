@@ -0,0 +1,214 @@
+"""Retry policy and circuit breaker for transient Canvas failures."""
+
+import dataclasses
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from urllib3.exceptions import NewConnectionError
+from canvasapi.exceptions import CanvasException, Forbidden, RateLimitExceeded
+
+from .our_logging import get_logger
+
+logger = get_logger()
+
+RATE_LIMIT = 'rate_limit'
+SERVER_ERROR = 'server_error'
+CONNECTION_ERROR = 'connection_error'
+
+RETRYABLE_SERVER_STATUSES = frozenset({500, 502, 503, 504})
+
+# Requests that have the same effect when sent twice
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+# Canvas throttles with "403 Forbidden (Rate Limit Exceeded)", which canvasapi raises as Forbidden
+RATE_LIMIT_EXCEEDED = 'Rate Limit Exceeded'
+
+# The Retry-After header of the latest response, and whether the current attempt of the task
+# running in this thread has sent a request that Canvas processed and that is not safe to repeat
+_last_response = threading.local()
+_attempt = threading.local()
+
+
+def start_attempt():
+    """Called before each attempt of a task, in the thread that runs it."""
+    _attempt.sent_unsafe_request = False
+
+
+def classify_error(error: BaseException) -> str | None:
+    """
+    Returns the retryable error class of the exception, or None if it should not be retried.
+
+    A retry runs the whole task again. So nothing is retried once the attempt has sent a request
+    that is not idempotent (see IDEMPOTENT_METHODS) and that Canvas did not reject as throttled:
+    e.g. a task that created a page and then failed to update its module would create the page twice.
+    Timeouts and lost connections are only retried if the failed request was idempotent or never reached Canvas.
+
+    Deployers wrap Canvas errors with resource context, so the chain of causes is followed.
+    """
+    if getattr(_attempt, 'sent_unsafe_request', False):
+        return None
+
+    while error is not None:
+        if error_class := _classify_single_error(error):
+            return error_class
+        error = error.__cause__
+
+    return None
+
+
+def _classify_single_error(error: BaseException) -> str | None:
+    if isinstance(error, RateLimitExceeded):
+        return RATE_LIMIT
+
+    if isinstance(error, Forbidden) and RATE_LIMIT_EXCEEDED in str(error):
+        return RATE_LIMIT
+
+    if isinstance(error, CanvasException):
+        if m := re.search(r'status code (\d{3})', str(error)):
+            status = int(m.group(1))
+            if status == 429:
+                return RATE_LIMIT
+            if status in RETRYABLE_SERVER_STATUSES:
+                return SERVER_ERROR
+        return None
+
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        # A request that never reached Canvas can always be sent again; one that timed out
+        # or lost its connection while Canvas was processing it only if it is idempotent
+        if _failed_to_connect(error) or _is_idempotent(getattr(error.request, 'method', None)):
+            return CONNECTION_ERROR
+
+    return None
+
+
+def _is_idempotent(method: str | None) -> bool:
+    return method is not None and method.upper() in IDEMPOTENT_METHODS
+
+
+def is_throttled(response: requests.Response) -> bool:
+    """Whether Canvas rejected the request because of its rate limit, without processing it."""
+    # Canvas throttles with "403 Forbidden (Rate Limit Exceeded)"; other 403s are permission errors
+    if response.status_code == 403:
+        return RATE_LIMIT_EXCEEDED in getattr(response, 'text', '')
+    return response.status_code == 429
+
+
+def _failed_to_connect(error: requests.RequestException) -> bool:
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    # requests wraps urllib3's MaxRetryError, whose reason is the error of the last attempt
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(error, requests.ConnectionError) and isinstance(reason, NewConnectionError)
+
+
+def _parse_retry_after(value: str) -> float | None:
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def record_response(response: requests.Response, *_args, **_kwargs):
+    """
+    Response hook for a requests.Session.
+
+    canvasapi does not expose the response on its exceptions,
+    so the Retry-After header of the latest response, and whether a request that is not safe to repeat
+    was processed, are kept per thread for the retry loop running in that same thread.
+    """
+    value = response.headers.get('Retry-After')
+    _last_response.seconds = _parse_retry_after(value) if value else None
+
+    method = getattr(getattr(response, 'request', None), 'method', None)
+    if method is not None and not _is_idempotent(method) and not is_throttled(response):
+        _attempt.sent_unsafe_request = True
+
+
+def pop_retry_after() -> float | None:
+    seconds = getattr(_last_response, 'seconds', None)
+    _last_response.seconds = None
+    return seconds
+
+
+@dataclasses.dataclass
+class RetryPolicy:
+    """
+    How many times each error class is retried, and how long to wait between attempts.
+
+    The delay doubles with every attempt (capped at max_delay) and is randomly reduced
+    by up to ``jitter`` of its value so that workers throttled together do not retry together.
+    A Retry-After header from Canvas is honored when it asks for a longer wait.
+
+    Note that a retry re-runs the whole task, so a task is not retried once it has sent a request
+    that is not safe to repeat (see classify_error): repeating a create would make a duplicate page,
+    assignment or quiz. Throttled requests are rejected before Canvas processes them.
+    """
+    retry_budgets: dict[str, int] = dataclasses.field(default_factory=lambda: {
+        RATE_LIMIT: 3,
+        SERVER_ERROR: 3,
+        CONNECTION_ERROR: 3,
+    })
+    base_delay: float = 2.0
+    max_delay: float = 60.0
+    jitter: float = 0.5
+
+    def __post_init__(self):
+        if any(budget < 0 for budget in self.retry_budgets.values()):
+            raise ValueError('retry budgets must be >= 0')
+        if self.base_delay < 0:
+            raise ValueError('base_delay must be >= 0')
+        if not 0 <= self.jitter <= 1:
+            raise ValueError('jitter must be between 0 and 1')
+
+    def budget(self, error_class: str) -> int:
+        return self.retry_budgets.get(error_class, 0)
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        backoff = min(self.max_delay, self.base_delay * 2 ** attempt)
+        backoff *= random.uniform(1 - self.jitter, 1)
+        if retry_after is not None:
+            backoff = max(backoff, min(retry_after, self.max_delay))
+        return backoff
+
+
+class CircuitBreaker:
+    """
+    Pauses every worker together while Canvas is degraded.
+
+    After ``failure_threshold`` consecutive server or connection failures (from any worker),
+    the breaker opens for ``reset_timeout`` seconds. Workers wait for it to close before
+    starting their next attempt. A single failure after reopening trips it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive_failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= self.failure_threshold and time.monotonic() >= self._open_until:
+                self._open_until = time.monotonic() + self.reset_timeout
+                # Half-open: the next failure reopens the breaker immediately
+                self._consecutive_failures = self.failure_threshold - 1
+                logger.warning(f'Canvas appears degraded; pausing all requests for {self.reset_timeout:.0f}s')
+
+    def remaining_open_time(self) -> float:
+        with self._lock:
+            return max(0.0, self._open_until - time.monotonic())
@@ -0,0 +1,104 @@
+"""
+Stage-level tracing in the Chrome trace event format.
+
+The trace loads in Perfetto (https://ui.perfetto.dev) or chrome://tracing.
+Spans on the same thread nest by time, so the content pipeline, each deployment task,
+and the HTTP requests made by that task show up as a flame chart per worker thread.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import requests
+
+from .http_metrics import endpoint_template
+
+
+class Tracer:
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._events: list[dict] = []
+        self._thread_names: dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, category: str, start: float, end: float, args: dict):
+        tid = threading.get_native_id()
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': round((start - self._origin) * 1e6),
+            'dur': round((end - start) * 1e6),
+            'pid': self._pid,
+            'tid': tid,
+        }
+        if args:
+            event['args'] = args
+
+        with self._lock:
+            self._events.append(event)
+            self._thread_names.setdefault(tid, threading.current_thread().name)
+
+    def write(self, path: Path):
+        with self._lock:
+            metadata = [
+                {'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': tid, 'args': {'name': name}}
+                for tid, name in self._thread_names.items()
+            ]
+            events = metadata + sorted(self._events, key=lambda event: event['ts'])
+
+        path.write_text(json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'}))
+
+
+_tracer: Tracer | None = None
+
+
+@contextmanager
+def span(name: str, category: str = 'stage', **args) -> Iterator[None]:
+    """Record the time spent in the context. Does nothing unless tracing is enabled."""
+    tracer = _tracer
+    if tracer is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        tracer.record(name, category, start, time.perf_counter(), args)
+
+
+def trace_response(response: requests.Response, *_args, **_kwargs):
+    """
+    Response hook for a requests.Session: records the time spent waiting for the response.
+    Traces are meant to be shared, so only the endpoint is recorded, not the URL with its upload tokens and signatures.
+    """
+    if (tracer := _tracer) is None:
+        return
+
+    end = time.perf_counter()
+    tracer.record(f'{response.request.method} {response.status_code}', 'http',
+                  end - response.elapsed.total_seconds(), end, {'endpoint': endpoint_template(response.url)})
+
+
+@contextmanager
+def trace_to(path: Path | None) -> Iterator[None]:
+    """Trace everything inside the context and write the trace to the path (if a path is given)."""
+    global _tracer
+
+    if path is None:
+        yield
+        return
+
+    _tracer = tracer = Tracer()
+    try:
+        yield
+    finally:
+        _tracer = None
+        tracer.write(path)
@@ -1,29 +1,47 @@
+import hashlib
 import os
 import textwrap
 import warnings
+from functools import cache
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from bs4 import BeautifulSoup, MarkupResemblesLocatorWarning
-from bs4.element import NavigableString, Tag
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+    from bs4.element import Tag
 
-# We parse basic strings (no tags) all the time.
-# bs4 warns that these might be names or urls.
-# We can ignore these warnings.
-warnings.filterwarnings("ignore", category=MarkupResemblesLocatorWarning)
+# Course files (datasets, videos) can be hundreds of MB: read them in chunks of this size
+CHUNK_SIZE = 1024 * 1024
 
 
-def parse_soup_from_xml(text: str) -> BeautifulSoup:
+@cache
+def _ignore_locator_warnings():
+    from bs4 import MarkupResemblesLocatorWarning
+
+    # We parse basic strings (no tags) all the time.
+    # bs4 warns that these might be names or urls.
+    # We can ignore these warnings.
+    warnings.filterwarnings("ignore", category=MarkupResemblesLocatorWarning)
+
+
+def parse_soup_from_xml(text: str) -> 'BeautifulSoup':
+    # Imported here so that deploying a compiled bundle does not import bs4
+    from bs4 import BeautifulSoup
+
+    _ignore_locator_warnings()
     return BeautifulSoup(text, 'html.parser')
 
 
 def retrieve_contents(
-        tag: Tag,
+        tag: 'Tag',
         ignored_child_tag_names: list[str] = ()  # type: ignore[reportIncompatibleVariableOverride]
 ) -> str:
     """
     Return all the HTML contents of the specified tag
     Excludes the contents of specific sub-tags.
     """
+    from bs4.element import NavigableString, Tag
+
     return textwrap.dedent(
         ''.join(
             str(c)
@@ -54,6 +72,15 @@ def relative_to_abs(path: Path, deploy_root: Path) -> Path:
     return (deploy_root / path).resolve().absolute()
 
 
+def hash_file(path: Path, algorithm: str = 'md5') -> str:
+    """Hex digest of the file's contents, read in chunks so memory use does not grow with the file size."""
+    digest = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 def find_quarto_root(slide_file: Path) -> Path:
     """Returns the folder containing _quarto.yaml, or the slide_file.parent"""
     cur_dir = slide_file.absolute().parent
@@ -2,7 +2,7 @@ from datetime import datetime
 
 from bs4.element import Tag
 
-from .attributes import parse_settings, Attribute, parse_date, parse_bool
+from .attributes import parse_settings, Attribute, parse_date, parse_bool, parse_int
 from ..resources import ResourceManager, CanvasResource
 from ..util import retrieve_contents
 from ..processing_context import get_current_file_str
@@ -19,6 +19,7 @@ class AnnouncementTagProcessor:
             Attribute('is_announcement', True, parser=parse_bool),
             Attribute('publish_date', required=True, new_name='delayed_post_at', parser=parse_date,
                       default=datetime.now().isoformat()),
+            Attribute('priority', parser=parse_int),
         ]
 
         # https://canvas.instructure.com/doc/api/discussion_topics.html#method.discussion_topics.create
@@ -38,6 +39,7 @@ class AnnouncementTagProcessor:
         announcement = CanvasResource(
             type='announcement',
             id=settings.pop('id'),
+            priority=settings.pop('priority', 0),
             data=settings,
             content_path=get_current_file_str()
         )
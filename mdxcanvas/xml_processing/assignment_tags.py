@@ -43,6 +43,7 @@ class AssignmentTagProcessor:
             Attribute('peer_reviews', False, parse_bool),
             Attribute('points_possible', parser=parse_int),
             Attribute('position', parser=parse_int),
+            Attribute('priority', parser=parse_int),
             Attribute('published', parser=parse_bool),
             Attribute('quiz_lti'),  # TODO - keep?
             Attribute('submission_types', parser=parse_list),  # TODO - keep?
@@ -63,6 +64,7 @@ class AssignmentTagProcessor:
         assignment = CanvasResource(
             type='assignment',
             id=rid,
+            priority=settings.pop('priority', 0),
             data=settings,
             content_path=get_current_file_str()
         )
@@ -1,6 +1,6 @@
 from bs4.element import Tag
 
-from .attributes import parse_settings, Attribute, parse_bool, parse_date
+from .attributes import parse_settings, Attribute, parse_bool, parse_date, parse_int
 from ..util import retrieve_contents
 from ..resources import ResourceManager, CanvasResource
 from ..processing_context import get_current_file_str
@@ -24,7 +24,8 @@ class PageTagProcessor:
             Attribute('student_todo_at', parser=parse_date),
             Attribute('front_page', False, parse_bool),
             Attribute('published', parser=parse_bool),
-            Attribute('publish_at', parser=parse_date)
+            Attribute('publish_at', parser=parse_date),
+            Attribute('priority', parser=parse_int)
         ]
 
         settings.update(parse_settings(page_tag, fields))
@@ -32,6 +33,7 @@ class PageTagProcessor:
         page = CanvasResource(
             type='page',
             id=settings.pop('id'),
+            priority=settings.pop('priority', 0),
             data=settings,
             content_path=get_current_file_str()
         )
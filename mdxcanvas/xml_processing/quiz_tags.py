@@ -42,13 +42,14 @@ class QuizTagProcessor:
         quiz.update(self._parse_quiz_settings(quiz_tag))
 
         rid = quiz.pop('id')
+        priority = quiz.pop('priority', 0)
 
         for tag in quiz_tag.children:
             if not isinstance(tag, Tag):
                 continue  # Top-level content is not supported in a quiz tag
 
             if tag.name == "questions":
-                self._parse_questions(rid, tag)
+                self._parse_questions(rid, tag, priority)
 
             elif tag.name == "description":
                 quiz["description"] = retrieve_contents(tag)
@@ -56,6 +57,7 @@ class QuizTagProcessor:
         info = CanvasResource(
             type='quiz',
             id=rid,
+            priority=priority,
             data=quiz,
             content_path=get_current_file_str()
         )
@@ -88,6 +90,7 @@ class QuizTagProcessor:
             Attribute('due_at', parser=parse_date),
             Attribute('access_code'),
             Attribute('position', parser=parse_int),
+            Attribute('priority', parser=parse_int),
             Attribute('published', parser=parse_bool),
             Attribute('one_time_results', False, parse_bool),
             Attribute('only_visible_to_overrides', parser=parse_bool),
@@ -96,7 +99,8 @@ class QuizTagProcessor:
 
         return parse_settings(settings_tag, fields)
 
-    def _parse_questions(self, quiz_rid: StrLike, questions_tag: Tag):
+    def _parse_questions(self, quiz_rid: StrLike, questions_tag: Tag, priority: int):
+        # Questions share the priority of their quiz: a prioritized quiz is not usable without them
         order_items = []
 
         for tag in questions_tag.find_all('question', recursive=False):
@@ -116,6 +120,7 @@ class QuizTagProcessor:
                 self._resources.add_resource(CanvasResource(
                     type='quiz_question',
                     id=question_rid,
+                    priority=priority,
                     data=question,
                     content_path=get_current_file_str()
                 ))
@@ -131,6 +136,7 @@ class QuizTagProcessor:
             self._resources.add_resource(CanvasResource(
                 type='quiz_question_order',
                 id=f'{quiz_rid}|order',
+                priority=priority,
                 data={
                     'quiz_id': get_key('quiz', quiz_rid, 'id'),
                     'order': order_items
@@ -8,6 +8,7 @@ from ..error_helpers import format_tag, get_file_path, validate_required_attribu
 from ..our_logging import get_logger
 from ..processing_context import FileContext, get_current_file_str
 from ..resources import ResourceManager, FileData, StrLike, ZipFileData, CanvasResource, get_key
+from ..tracing import span
 from ..util import parse_soup_from_xml, to_relative_posix
 from ..xml_processing.attributes import parse_bool
 
@@ -307,7 +308,7 @@ def make_include_preprocessor(
                 )
 
         # Track the included file in context for error messages
-        with FileContext(imported_file):
+        with FileContext(imported_file), span('include', path=str(imported_file)):
             imported_raw_content = imported_file.read_text(encoding='utf-8')
             suffixes = imported_file.suffixes
 
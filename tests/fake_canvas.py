@@ -0,0 +1,446 @@
+"""
+An in-process stand-in for the Canvas REST endpoints that mdxcanvas uses.
+
+FakeCanvas is a requests transport adapter: mounted on the session canvasapi uses,
+it answers every request from an in-memory course instead of the network.
+It models the parts of Canvas that matter for deployment throughput:
+
+- per-endpoint latency
+- Canvas' leaky-bucket throttle, including the pre-flight charge for requests in flight,
+  reported in X-Rate-Limit-Remaining / X-Request-Cost and enforced with 403 Forbidden (Rate Limit Exceeded)
+- randomly injected throttling responses
+- paginated list endpoints with Link headers
+
+Use `connect` to get a canvasapi Course backed by a FakeCanvas.
+"""
+import json
+import re
+import secrets
+import threading
+import time
+from collections import Counter
+from email.parser import BytesParser
+from random import Random
+from typing import Callable
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from canvasapi import Canvas
+from canvasapi.course import Course
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from mdxcanvas.concurrency import DEFAULT_MAX_WORKERS
+from mdxcanvas.http_metrics import endpoint_template
+from mdxcanvas.http_session import make_session, use_session
+
+BASE_URL = 'https://canvas.fake'
+API_PREFIX = '/api/v1/'
+ROOT_FOLDER = 'course files'
+
+Handler = Callable[[dict, dict], tuple[int, dict | list | bytes | None]]
+
+
+class NotFound(Exception):
+    pass
+
+
+def parse_params(pairs: list[tuple[str, str]]) -> dict:
+    """Rebuild the nested structure canvasapi flattens into `a[b][]`-style form fields."""
+    result = {}
+    for key, value in pairs:
+        path = [key.split('[', 1)[0], *re.findall(r'\[([^\]]*)\]', key)]
+        _assign(result, path, value)
+    return result
+
+
+def _assign(node: dict | list, path: list[str], value):
+    head, *rest = path
+    if isinstance(node, list):
+        if not rest:
+            node.append(value)
+            return
+        # A new list element starts when the field being set is already in the last one
+        if not node or not isinstance(node[-1], dict) or rest[0] in node[-1]:
+            node.append({})
+        _assign(node[-1], rest, value)
+        return
+
+    if not rest:
+        node[head] = value
+    else:
+        _assign(node.setdefault(head, [] if rest[0] == '' else {}), rest, value)
+
+
+def _slug(title: str) -> str:
+    return re.sub(r'[^a-z0-9]+', '-', title.lower()).strip('-') or 'page'
+
+
+class FakeCanvas(BaseAdapter):
+    """
+    Latency is looked up by `'{METHOD} {endpoint}'` (see `mdxcanvas.http_metrics.endpoint_template`),
+    then by `'{METHOD}'`, then falls back to ``default_latency`` (seconds).
+
+    The throttle follows Canvas: every request adds ``request_cost`` to a bucket that leaks
+    ``leak_rate`` units per second, and each request in flight holds an extra ``preflight_cost``.
+    A request that would push the bucket over ``high_water_mark`` is rejected, as Canvas does,
+    with a 403 whose body is "403 Forbidden (Rate Limit Exceeded)".
+    """
+
+    def __init__(
+            self,
+            base_url: str = BASE_URL,
+            course_id: int = 1,
+            default_latency: float = 0.0,
+            latency: dict[str, float] | None = None,
+            high_water_mark: float = 700.0,
+            leak_rate: float = 10.0,
+            request_cost: float = 1.0,
+            preflight_cost: float = 50.0,
+            throttle_probability: float = 0.0,
+            retry_after: float | None = None,
+            page_size: int = 100,
+            seed: int = 0
+    ):
+        super().__init__()
+        self.base_url = base_url
+        self.course_id = course_id
+        self.default_latency = default_latency
+        self.latency = latency or {}
+        self.high_water_mark = high_water_mark
+        self.leak_rate = leak_rate
+        self.request_cost = request_cost
+        self.preflight_cost = preflight_cost
+        self.throttle_probability = throttle_probability
+        self.retry_after = retry_after
+        self.page_size = page_size
+
+        self.requests: Counter[str] = Counter()
+        self.throttled = 0
+        self.max_in_flight = 0
+
+        self._random = Random(seed)
+        self._lock = threading.Lock()
+        self._bucket = 0.0
+        self._last_leak = time.monotonic()
+        self._in_flight = 0
+
+        self._next_id = 1
+        self._changes = 0
+        self._course = {'id': course_id, 'name': 'Fake Course', 'course_code': 'FAKE 101'}
+        self._objects: dict[str, dict[int, dict]] = {}
+        self._file_contents: dict[int, bytes] = {}
+        self._pending_uploads: dict[str, dict] = {}
+        self._root_folder_id = self._create('folders', {'name': ROOT_FOLDER, 'full_name': ROOT_FOLDER})['id']
+
+        c = rf'courses/{course_id}'
+        self._routes: list[tuple[str, re.Pattern, Handler]] = []
+        self._route('GET', c, lambda _m, _p: (200, self._course))
+        self._route('PUT', c, self._update_course)
+
+        for collection, wrapper in [
+            ('pages', 'wiki_page'),
+            ('assignments', 'assignment'),
+            ('assignment_groups', None),
+            ('quizzes', 'quiz'),
+            ('modules', 'module'),
+            ('discussion_topics', None),
+            ('folders', None),
+        ]:
+            self._crud(rf'{c}/{collection}', collection, wrapper)
+
+        self._crud(rf'{c}/quizzes/(?P<quiz_id>\d+)/questions', 'questions', 'question')
+        self._crud(rf'{c}/modules/(?P<module_id>\d+)/items', 'module_items', 'module_item')
+        self._crud(rf'{c}/assignments/(?P<assignment_id>\d+)/overrides', 'overrides', 'assignment_override')
+        self._route('GET', rf'{c}/quizzes/(?P<quiz_id>\d+)/submissions', lambda _m, _p: (200, {'quiz_submissions': []}))
+        self._route('POST', rf'{c}/quizzes/(?P<quiz_id>\d+)/reorder', self._reorder_questions)
+
+        self._route('GET', rf'{c}/folders/by_path/(?P<path>.+)', self._resolve_path)
+        self._route('GET', rf'folders/(?P<folder_id>\d+)/files', lambda m, p: (200, self._list('files', m, p)))
+        self._route('GET', rf'{c}/files', lambda m, p: (200, self._list('files', m, p)))
+        self._route('GET', rf'(?:{c}/)?files/(?P<id>\d+)', lambda m, _p: (200, self._find('files', m['id'])))
+        self._route('PUT', rf'files/(?P<id>\d+)', lambda m, p: (200, self._update('files', m['id'], p)))
+        self._route('DELETE', rf'files/(?P<id>\d+)', self._delete_file)
+        self._route('POST', rf'folders/(?P<folder_id>\d+)/files', self._preflight_upload)
+        self._route('POST', rf'{c}/files', self._preflight_upload)
+
+    # ----------------------------------------------------------------
+    # Routing
+    # ----------------------------------------------------------------
+
+    def _route(self, method: str, pattern: str, handler: Handler):
+        self._routes.append((method, re.compile(pattern), handler))
+
+    def _crud(self, prefix: str, collection: str, wrapper: str | None):
+        def fields(params: dict) -> dict:
+            return params.get(wrapper, {}) if wrapper else params
+
+        self._route('GET', prefix, lambda m, p: (200, self._list(collection, m, p)))
+        self._route('POST', prefix, lambda m, p: (200, self._create(collection, fields(p) | _parents(m))))
+        item = rf'{prefix}/(?P<id>[^/]+)'
+        self._route('GET', item, lambda m, _p: (200, self._find(collection, m['id'])))
+        self._route('PUT', item, lambda m, p: (200, self._update(collection, m['id'], fields(p))))
+        self._route('DELETE', item, lambda m, _p: (200, self._delete(collection, m['id'])))
+
+    def _dispatch(self, method: str, path: str, params: dict) -> tuple[int, dict | list | bytes | None]:
+        if path.startswith(API_PREFIX):
+            api_path = path[len(API_PREFIX):]
+            for route_method, pattern, handler in self._routes:
+                if route_method == method and (m := pattern.fullmatch(api_path)):
+                    return handler(m.groupdict(), params)
+
+        elif method == 'POST' and (m := re.fullmatch(r'/upload/(?P<token>\w+)', path)):
+            return self._upload(m['token'], params)
+
+        elif method == 'GET' and (m := re.fullmatch(r'/files/(?P<id>\d+)/download', path)):
+            if (content := self._file_contents.get(int(m['id']))) is None:
+                raise NotFound()
+            return 200, content
+
+        raise NotImplementedError(f'FakeCanvas does not implement {method} {path}')
+
+    # ----------------------------------------------------------------
+    # Objects
+    # ----------------------------------------------------------------
+
+    def _html_url(self, collection: str, obj: dict) -> str:
+        key = obj['url'] if collection == 'pages' else obj['id']
+        return f'{self.base_url}/courses/{self.course_id}/{collection}/{key}'
+
+    def _create(self, collection: str, fields: dict) -> dict:
+        obj_id = self._next_id
+        self._next_id += 1
+
+        obj = {'id': obj_id, 'published': False, 'updated_at': self._timestamp()} | fields
+        if collection == 'pages':
+            obj.update(page_id=obj_id, url=_slug(obj.get('title', '')))
+        elif collection == 'quizzes':
+            # Graded quizzes are backed by an assignment
+            obj['assignment_id'] = self._create('assignments', {'name': obj.get('title', '')})['id']
+        elif collection == 'files':
+            obj['url'] = f'{self.base_url}/files/{obj_id}/download'
+
+        if collection in ['pages', 'assignments', 'quizzes', 'discussion_topics']:
+            obj['html_url'] = self._html_url(collection, obj)
+
+        self._objects.setdefault(collection, {})[obj_id] = obj
+        return obj
+
+    def _timestamp(self) -> str:
+        # Unique per change, like a version
+        self._changes += 1
+        return f'2026-01-01T00:00:00.{self._changes:06d}Z'
+
+    def _find(self, collection: str, key: str) -> dict:
+        objects = self._objects.get(collection, {})
+        if key.isdigit() and (obj := objects.get(int(key))):
+            return obj
+        if collection == 'pages':
+            for obj in objects.values():
+                if obj['url'] == key:
+                    return obj
+        raise NotFound()
+
+    def _update(self, collection: str, key: str, fields: dict) -> dict:
+        obj = self._find(collection, key)
+        obj.update({k: v for k, v in fields.items() if k != 'id'})
+        obj['updated_at'] = self._timestamp()
+        return obj
+
+    def _delete(self, collection: str, key: str) -> dict:
+        obj = self._find(collection, key)
+        return self._objects[collection].pop(obj['id'])
+
+    def _list(self, collection: str, match: dict, _params: dict) -> list[dict]:
+        parents = _parents(match)
+        return [
+            obj for obj in self._objects.get(collection, {}).values()
+            if all(obj.get(k) == v for k, v in parents.items())
+        ]
+
+    def _resolve_path(self, match: dict, _params: dict) -> tuple[int, list[dict]]:
+        folders = [self._find('folders', str(self._root_folder_id))]
+        for name in match['path'].strip('/').split('/'):
+            if not (found := [f for f in self._objects['folders'].values() if f['name'] == name]):
+                raise NotFound()
+            folders.append(found[0])
+        return 200, folders
+
+    def _update_course(self, _match: dict, params: dict) -> tuple[int, dict]:
+        self._course.update(params.get('course', {}))
+        return 200, self._course
+
+    def _reorder_questions(self, match: dict, params: dict) -> tuple[int, None]:
+        quiz = self._find('quizzes', match['quiz_id'])
+        quiz['question_order'] = [item['id'] for item in params.get('order', [])]
+        return 204, None
+
+    # ----------------------------------------------------------------
+    # Files
+    # ----------------------------------------------------------------
+
+    def _preflight_upload(self, match: dict, params: dict) -> tuple[int, dict]:
+        folder_id = int(match.get('folder_id') or self._root_folder_id)
+        self._find('folders', str(folder_id))
+
+        token = secrets.token_hex(20)
+        self._pending_uploads[token] = {'folder_id': folder_id, 'name': params['name']}
+        return 200, {'upload_url': f'{self.base_url}/upload/{token}', 'upload_params': {'token': token}}
+
+    def _upload(self, token: str, params: dict) -> tuple[int, dict]:
+        if (pending := self._pending_uploads.pop(token, None)) is None:
+            raise NotFound()
+
+        # Canvas overwrites a file with the same name in the folder
+        for obj in list(self._objects.get('files', {}).values()):
+            if obj['folder_id'] == pending['folder_id'] and obj['display_name'] == pending['name']:
+                self._delete_file({'id': str(obj['id'])}, {})
+
+        content = params['file']
+        file = self._create('files', {
+            'display_name': pending['name'],
+            'filename': pending['name'],
+            'folder_id': pending['folder_id'],
+            'size': len(content),
+        })
+        self._file_contents[file['id']] = content
+        return 201, file
+
+    def _delete_file(self, match: dict, _params: dict) -> tuple[int, dict]:
+        self._file_contents.pop(int(match['id']), None)
+        return 200, self._delete('files', match['id'])
+
+    # ----------------------------------------------------------------
+    # Transport
+    # ----------------------------------------------------------------
+
+    def _leak(self):
+        now = time.monotonic()
+        self._bucket = max(0.0, self._bucket - (now - self._last_leak) * self.leak_rate)
+        self._last_leak = now
+
+    def _admit(self) -> bool:
+        with self._lock:
+            self._leak()
+            if (self._bucket + self.preflight_cost > self.high_water_mark
+                    or self._random.random() < self.throttle_probability):
+                self.throttled += 1
+                return False
+
+            self._bucket += self.preflight_cost
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            return True
+
+    def _release(self) -> float:
+        with self._lock:
+            self._leak()
+            self._bucket += self.request_cost - self.preflight_cost
+            self._in_flight -= 1
+            return self.high_water_mark - self._bucket
+
+    def _get_latency(self, method: str, endpoint: str) -> float:
+        return self.latency.get(f'{method} {endpoint}', self.latency.get(method, self.default_latency))
+
+    def _read_params(self, request: requests.PreparedRequest) -> dict:
+        url = urlsplit(request.url)
+        pairs = parse_qsl(url.query, keep_blank_values=True)
+
+        body = request.body or b''
+        content_type = request.headers.get('Content-Type', '')
+        if content_type.startswith('multipart/form-data'):
+            message = BytesParser().parsebytes(f'Content-Type: {content_type}\r\n\r\n'.encode() + body)
+            params = parse_params(pairs)
+            for part in message.get_payload():
+                name = part.get_param('name', header='content-disposition')
+                payload = part.get_payload(decode=True)
+                params[name] = payload if part.get_filename() else payload.decode('utf-8')
+            return params
+
+        if isinstance(body, bytes):
+            body = body.decode('utf-8')
+        return parse_params(pairs + parse_qsl(body, keep_blank_values=True))
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        method = request.method or 'GET'
+        endpoint = endpoint_template(request.url)
+        with self._lock:
+            self.requests[f'{method} {endpoint}'] += 1
+
+        if not self._admit():
+            with self._lock:
+                remaining = self.high_water_mark - self._bucket
+            headers = {'X-Rate-Limit-Remaining': f'{remaining:.1f}', 'X-Request-Cost': '0'}
+            if self.retry_after is not None:
+                headers['Retry-After'] = str(self.retry_after)
+            return self._response(request, 403, b'403 Forbidden (Rate Limit Exceeded)', headers)
+
+        try:
+            time.sleep(self._get_latency(method, endpoint))
+            params = self._read_params(request)
+            with self._lock:
+                try:
+                    status, body = self._dispatch(method, urlsplit(request.url).path, params)
+                except NotFound:
+                    status, body = 404, {'errors': [{'message': 'The specified resource does not exist.'}]}
+        finally:
+            remaining = self._release()
+
+        headers = {'X-Rate-Limit-Remaining': f'{remaining:.1f}', 'X-Request-Cost': f'{self.request_cost}'}
+        if status == 200 and isinstance(body, list):
+            body, headers['Link'] = self._paginate(request, body)
+
+        if isinstance(body, bytes):
+            content = body
+        else:
+            content = json.dumps(body).encode('utf-8') if body is not None else b''
+            headers['Content-Type'] = 'application/json'
+        return self._response(request, status, content, headers)
+
+    def _paginate(self, request: requests.PreparedRequest, items: list) -> tuple[list, str]:
+        url = urlsplit(request.url)
+        query = dict(parse_qsl(url.query))
+        page = int(query.get('page', 1))
+        per_page = min(int(query.get('per_page', 10)), self.page_size)
+
+        links = []
+        if page * per_page < len(items):
+            next_query = urlencode(query | {'page': page + 1, 'per_page': per_page})
+            links.append(f'<{self.base_url}{url.path}?{next_query}>; rel="next"')
+        return items[(page - 1) * per_page:page * per_page], ', '.join(links)
+
+    @staticmethod
+    def _response(request: requests.PreparedRequest, status: int, content: bytes, headers: dict) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response.url = request.url
+        response.request = request
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = 'utf-8'
+        response._content = content
+        return response
+
+    def close(self):
+        pass
+
+    def objects(self, collection: str) -> list[dict]:
+        """The objects of a collection (e.g. 'pages', 'quizzes', 'files') currently in the fake course."""
+        with self._lock:
+            return list(self._objects.get(collection, {}).values())
+
+
+def _parents(match: dict) -> dict[str, int]:
+    """The ids of the parent objects in the path (e.g. quiz_id), as Canvas reports them on the child."""
+    return {k: int(v) for k, v in match.items() if k != 'id' and v is not None}
+
+
+def connect(fake: FakeCanvas, max_workers: int | None = None) -> Course:
+    """The equivalent of `mdxcanvas.course_info.get_course` for a FakeCanvas."""
+    canvas = Canvas(fake.base_url, 'fake-token')
+    session = make_session(max_workers or DEFAULT_MAX_WORKERS)
+    session.mount(fake.base_url, fake)
+    use_session(canvas, session)
+
+    course: Course = canvas.get_course(fake.course_id)
+    course.canvas = canvas  # type: ignore
+    return course
@@ -0,0 +1,40 @@
+"""Helpers shared by the tests that deploy a course to a FakeCanvas (see fake_canvas.py)."""
+from pathlib import Path
+
+from canvasapi.course import Course
+
+from mdxcanvas.deploy.canvas_deploy import deploy_to_canvas
+from mdxcanvas.deployment_report import DeploymentReport
+from mdxcanvas.main import build_resources
+
+# An intro page linking to a details page; without link text, the link renders the title of the details page
+COURSE = '''
+<page id="intro" title="Intro">
+See the <course-link type="page" id="details">{link_text}</course-link>.
+</page>
+
+<page id="details" title="{title}">
+{body}
+</page>
+'''
+
+
+def write_course(deploy_root: Path, title: str = 'Details', body: str = 'Details', link_text: str = 'details',
+                 extra: str = '') -> Path:
+    """Write COURSE, followed by ``extra``, to the input file in the deploy root. Returns the input file."""
+    input_file = deploy_root / 'course.canvas.md.xml'
+    input_file.write_text(COURSE.format(title=title, body=body, link_text=link_text) + extra)
+    return input_file
+
+
+def deploy(course: Course, input_file: Path, deploy_root: Path, dryrun: bool = False) -> DeploymentReport:
+    """Deploy the input file, and check that no resource failed."""
+    report = DeploymentReport()
+    deploy_to_canvas(course, 'America/Denver', dict(build_resources(input_file, deploy_root, {})), report,
+                     deploy_root=deploy_root, dryrun=dryrun, max_workers=4)
+    assert report.report['error'] == ''
+    return report
+
+
+def deployed_ids(report: DeploymentReport) -> list[str]:
+    return sorted(rid for _, rid, _ in report.get_deployed_content())
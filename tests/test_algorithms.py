@@ -0,0 +1,73 @@
+import random
+import sys
+
+from mdxcanvas.deploy.algorithms import kahns_topological_sort, linearize_dependencies, tarjan_scc
+
+SHELL_TYPES = ['assignment', 'page', 'quiz']
+
+
+def _chain(length: int) -> dict:
+    """Each module item depends on the one before it, like the previous-item links of a long module."""
+    return {
+        ('module_item', f'i{n}'): [('module_item', f'i{n - 1}')] if n else []
+        for n in range(length)
+    }
+
+
+def _see_also(pages: int, links: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    return {('page', f'p{n}'): [('page', f'p{m}') for m in rng.sample(range(pages), links)] for n in range(pages)}
+
+
+def test_tarjan_finds_components_in_dependency_order():
+    graph = {
+        ('page', 'a'): [('page', 'b')],
+        ('page', 'b'): [('page', 'c'), ('file', 'x')],
+        ('page', 'c'): [('page', 'b')],
+    }
+    assert tarjan_scc(graph) == [[('file', 'x')], [('page', 'c'), ('page', 'b')], [('page', 'a')]]
+
+
+def test_deep_chains_do_not_recurse():
+    graph = _chain(100_000)
+
+    assert len(tarjan_scc(graph)) == 100_000
+    assert kahns_topological_sort(graph)[:2] == [('module_item', 'i0'), ('module_item', 'i1')]
+
+    order = linearize_dependencies(graph, SHELL_TYPES)
+    assert order[0] == (('module_item', 'i0'), False)
+    assert order[-1] == (('module_item', 'i99999'), False)
+
+
+def test_large_cyclic_graphs_are_linearized():
+    graph = _see_also(100_000, 2)
+    order = linearize_dependencies(graph, SHELL_TYPES)
+
+    done = set()
+    for node, is_shell in order:
+        if not is_shell:
+            assert all((dep, False) in done or (dep, True) in done for dep in graph[node])
+        done.add((node, is_shell))
+    assert len(done) == len(order)
+    assert {node for node, is_shell in order if not is_shell} == set(graph)
+
+
+def test_deep_cycles_do_not_recurse():
+    # A ring of pages, and a chain of pages that link back and forth with the next one
+    ring = {('page', f'r{n}'): [('page', f'r{(n + 1) % 50_000}')] for n in range(50_000)}
+    ladder = {
+        ('page', f'l{n}'): [('page', f'l{m}') for m in (n - 1, n + 1) if 0 <= m < 50_000]
+        for n in range(50_000)
+    }
+
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(100)
+    try:
+        ring_order = linearize_dependencies(ring, SHELL_TYPES)
+        ladder_order = linearize_dependencies(ladder, SHELL_TYPES)
+    finally:
+        sys.setrecursionlimit(limit)
+
+    assert sum(is_shell for _, is_shell in ring_order) == 1
+    # Every other page breaks the cycles with both of its neighbours
+    assert sum(is_shell for _, is_shell in ladder_order) == 25_000
@@ -0,0 +1,54 @@
+import subprocess
+import sys
+
+import pytest
+
+from mdxcanvas.bundle import read_bundle, write_bundle
+
+
+def _resources():
+    return {
+        ('file', 'logo.png'): {
+            'type': 'file', 'id': 'logo.png', 'content_path': 'course.md',
+            'data': {'path': 'logo.png', 'checksum_paths': ['logo.png'], 'canvas_folder': None,
+                     'lock_at': None, 'unlock_at': None},
+        },
+        ('page', 'home'): {
+            'type': 'page', 'id': 'home', 'content_path': 'course.md', 'priority': 2,
+            'data': {'title': 'Home', 'body': '<img src="__@@file||logo.png||uri@@__">'},
+        },
+    }
+
+
+def test_bundle_round_trip(tmp_path):
+    (tmp_path / 'logo.png').write_bytes(b'png')
+    dependencies = {('file', 'logo.png'): [], ('page', 'home'): [('file', 'logo.png')]}
+
+    write_bundle(tmp_path / 'course.bundle', _resources(), dependencies, tmp_path)
+    resources, resource_dependencies = read_bundle(tmp_path / 'course.bundle', tmp_path)
+
+    assert resources == _resources()
+    assert resource_dependencies == dependencies
+
+
+def test_bundle_rejects_files_changed_since_compile(tmp_path):
+    (tmp_path / 'logo.png').write_bytes(b'png')
+    write_bundle(tmp_path / 'course.bundle', _resources(), {}, tmp_path)
+
+    (tmp_path / 'logo.png').write_bytes(b'new png')
+
+    with pytest.raises(ValueError, match='logo.png'):
+        read_bundle(tmp_path / 'course.bundle', tmp_path)
+
+
+def test_apply_does_not_import_content_processors():
+    result = subprocess.run(
+        [sys.executable, '-c',
+         'import sys, mdxcanvas.bundle; '
+         'print(" ".join(m for m in ["bs4", "markdown", "cssutils", "jinja2"] if m in sys.modules))'],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.stdout.strip() == ''
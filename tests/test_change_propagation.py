@@ -0,0 +1,84 @@
+from mdxcanvas.deploy.checksums import MD5Sums
+from mdxcanvas.deploy.invalidation import propagate_changes
+from mdxcanvas.deployment_report import DeploymentReport
+from mdxcanvas.resources import get_key
+from tests.fake_canvas import FakeCanvas, connect
+from tests.support import deploy, deployed_ids, write_course
+
+
+def _deploy(course, tmp_path, title: str, body: str, dryrun=False) -> DeploymentReport:
+    # The intro renders the title of the details page as its link text
+    return deploy(course, write_course(tmp_path, title, body, link_text=''), tmp_path, dryrun=dryrun)
+
+
+def test_dependents_are_redeployed_only_when_a_rendered_value_changes(tmp_path):
+    fake = FakeCanvas(default_latency=0)
+    course = connect(fake, max_workers=4)
+    _deploy(course, tmp_path, 'Details', 'First draft')
+
+    # The intro links to the details page, but renders neither its body nor anything that changes with it.
+    # Whether the title or uri change is only known once the details page is deployed.
+    plan = _deploy(course, tmp_path, 'Details', 'Second draft', dryrun=True).report['plan']
+    assert [(p['id'], p['action'], p['reason']) for p in plan] == [
+        ('details', 'update', 'checksum changed'),
+        ('intro', 'possible update', 'dependency changed: title, uri of page details (checksum changed)'),
+    ]
+    assert deployed_ids(_deploy(course, tmp_path, 'Details', 'Second draft')) == ['details']
+
+    # The link text of the intro is the title of the details page
+    assert deployed_ids(_deploy(course, tmp_path, 'More details', 'Second draft')) == ['details', 'intro']
+    intro = next(page for page in fake.objects('pages') if page['title'] == 'Intro')
+    assert '>More details</a>' in intro['body']
+
+    assert deployed_ids(_deploy(course, tmp_path, 'More details', 'Second draft')) == []
+
+
+def test_propagation_is_transitive_and_explains_the_chain():
+    def page(rid: str, *links: tuple[str, str, str]) -> dict:
+        return {'type': 'page', 'id': rid, 'data': {'body': ' '.join(get_key(*link) for link in links)}}
+
+    resources = {
+        ('page', 'a'): page('a', ('file', 'logo.png', 'id')),
+        ('page', 'b'): page('b', ('page', 'a', 'uri'), ('page', 'a', 'title')),
+        ('page', 'c'): page('c', ('page', 'b', 'uri')),
+        ('page', 'd'): page('d'),
+    }
+    dependencies = {
+        ('page', 'a'): [('file', 'logo.png')],
+        ('page', 'b'): [('page', 'a'), ('page', 'a')],
+        ('page', 'c'): [('page', 'b')],
+        ('page', 'd'): [],
+    }
+
+    propagated = propagate_changes(
+        {('file', 'logo.png'): 'checksum changed'}, set(resources), dependencies, resources.__getitem__)
+
+    assert propagated == {
+        ('page', 'a'): 'dependency changed: id of file logo.png (checksum changed)',
+        ('page', 'b'): 'dependency changed: title, uri of page a '
+                       '(dependency changed: id of file logo.png (checksum changed))',
+        ('page', 'c'): 'dependency changed: uri of page b '
+                       '(dependency changed: title, uri of page a '
+                       '(dependency changed: id of file logo.png (checksum changed)))',
+    }
+
+
+def test_links_of_entries_recorded_without_them_are_saved_by_a_deployment(tmp_path):
+    fake = FakeCanvas(default_latency=0)
+    course = connect(fake, max_workers=4)
+    _deploy(course, tmp_path, 'Details', 'First draft')
+
+    # A manifest saved before links were recorded
+    with MD5Sums(course, tmp_path) as md5s:
+        for key, entry in list(md5s.items()):
+            md5s[key] = {field: value for field, value in entry.items() if field != 'links'}
+
+    _deploy(course, tmp_path, 'Details', 'Second draft', dryrun=True)
+    with MD5Sums(course, tmp_path, dryrun=True) as md5s:
+        assert 'links' not in md5s.get(('page', 'intro'))
+
+    assert deployed_ids(_deploy(course, tmp_path, 'Details', 'Second draft')) == ['details']
+    with MD5Sums(course, tmp_path, dryrun=True) as md5s:
+        assert {(rtype, rid, field) for rtype, rid, field, _ in md5s.get(('page', 'intro'))['links']} == {
+            ('page', 'details', 'title'), ('page', 'details', 'uri')
+        }
@@ -0,0 +1,51 @@
+import hashlib
+
+from mdxcanvas.deploy.checksums import CHECKSUM_ALGORITHM, MD5Sums
+from tests.fake_canvas import FakeCanvas, connect
+from tests.support import deploy, write_course
+
+
+def test_checksums_are_rekeyed_without_redeploying(tmp_path, monkeypatch):
+    input_file = write_course(tmp_path)
+    course = connect(FakeCanvas(), max_workers=4)
+
+    # A course deployed before the algorithm changed
+    monkeypatch.setattr('mdxcanvas.deploy.checksums.CHECKSUM_ALGORITHM', 'md5')
+    monkeypatch.setattr('mdxcanvas.deploy.canvas_deploy.CHECKSUM_ALGORITHM', 'md5')
+    deploy(course, input_file, tmp_path)
+    monkeypatch.undo()
+
+    write_course(tmp_path, body='New details')
+    report = deploy(course, input_file, tmp_path)
+
+    # Only the changed page is redeployed
+    assert [(rtype, rid) for rtype, rid, *_ in report.get_deployed_content()] == [('page', 'details')]
+    with MD5Sums(course, tmp_path, dryrun=True) as md5s:
+        assert md5s.get_checksum_algorithm() == CHECKSUM_ALGORITHM
+        assert {len(entry['checksum']) for _, entry in md5s.items()} == {hashlib.new(CHECKSUM_ALGORITHM).digest_size * 2}
+
+    assert deploy(course, input_file, tmp_path).get_deployed_content() == []
+
+
+def test_entries_of_other_input_files_are_rekeyed_when_deployed(tmp_path, monkeypatch):
+    input_file = write_course(tmp_path)
+    other_file = tmp_path / 'other.canvas.md.xml'
+    other_file.write_text('<page id="other" title="Other">\nAnother input file\n</page>')
+    course = connect(FakeCanvas(), max_workers=4)
+
+    monkeypatch.setattr('mdxcanvas.deploy.checksums.CHECKSUM_ALGORITHM', 'md5')
+    monkeypatch.setattr('mdxcanvas.deploy.canvas_deploy.CHECKSUM_ALGORITHM', 'md5')
+    deploy(course, input_file, tmp_path)
+    deploy(course, other_file, tmp_path)
+    monkeypatch.undo()
+
+    # The page of the other input file keeps its md5 checksum, and says so
+    assert deploy(course, input_file, tmp_path).get_deployed_content() == []
+    with MD5Sums(course, tmp_path, dryrun=True) as md5s:
+        assert md5s.get_checksum_algorithm() == CHECKSUM_ALGORITHM
+        assert md5s.get(('page', 'other'))['checksum_algorithm'] == 'md5'
+        assert 'checksum_algorithm' not in md5s.get(('page', 'intro'))
+
+    assert deploy(course, other_file, tmp_path).get_deployed_content() == []
+    with MD5Sums(course, tmp_path, dryrun=True) as md5s:
+        assert all('checksum_algorithm' not in entry for _, entry in md5s.items())
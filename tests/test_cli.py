@@ -1,7 +1,12 @@
+import argparse
 import subprocess
 import sys
 from pathlib import Path
 
+import pytest
+
+from mdxcanvas.cli import add_deploy_arguments
+
 
 def test_skilldir_prints_packaged_skills_directory():
     result = subprocess.run(
@@ -14,3 +19,13 @@ def test_skilldir_prints_packaged_skills_directory():
     skill_directory = Path(result.stdout.strip())
     assert skill_directory == Path(__file__).parents[1] / 'mdxcanvas' / 'skills'
     assert skill_directory.is_dir()
+
+
+def test_worker_limits_must_be_positive():
+    parser = argparse.ArgumentParser()
+    add_deploy_arguments(parser)
+
+    assert parser.parse_args(['--max-workers', '4']).max_workers == 4
+    for value in ['0', '-2', 'many']:
+        with pytest.raises(SystemExit):
+            parser.parse_args(['--max-workers', value])
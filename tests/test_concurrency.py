@@ -0,0 +1,69 @@
+import threading
+import time
+
+from mdxcanvas.concurrency import AdaptiveConcurrency
+from mdxcanvas.parallel import threaded_execute
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None, text=''):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.text = text
+
+
+def test_concurrency_grows_while_budget_is_healthy():
+    concurrency = AdaptiveConcurrency(max_limit=10, initial_limit=2)
+
+    for _ in range(20):
+        concurrency.observe_response(FakeResponse(headers={'X-Rate-Limit-Remaining': '650', 'X-Request-Cost': '1'}))
+
+    assert concurrency.limit > 2
+    assert concurrency.limit <= 10
+
+
+def test_concurrency_halves_when_budget_runs_low_or_throttled():
+    concurrency = AdaptiveConcurrency(max_limit=16, initial_limit=16, decrease_interval=0)
+
+    concurrency.observe_response(FakeResponse(headers={'X-Rate-Limit-Remaining': '20'}))
+    assert concurrency.limit == 8
+
+    concurrency.observe_response(FakeResponse(status_code=429))
+    assert concurrency.limit == 4
+
+    concurrency.observe_response(FakeResponse(status_code=403, text='403 Forbidden (Rate Limit Exceeded)'))
+    assert concurrency.limit == 2
+
+
+def test_concurrency_is_not_reduced_by_permission_errors():
+    concurrency = AdaptiveConcurrency(max_limit=16, initial_limit=16, decrease_interval=0)
+
+    concurrency.observe_response(FakeResponse(status_code=403, text='{"status":"unauthorized"}'))
+    assert concurrency.limit == 16
+
+
+def test_threaded_execute_respects_group_limits():
+    concurrency = AdaptiveConcurrency(max_limit=8, initial_limit=8, group_limits={'file': 1})
+    running = {'file': 0}
+    max_running = {'file': 0}
+    lock = threading.Lock()
+
+    def execute(key):
+        rtype, _ = key
+        with lock:
+            running[rtype] = running.get(rtype, 0) + 1
+            max_running[rtype] = max(max_running.get(rtype, 0), running[rtype])
+        time.sleep(0.01)
+        with lock:
+            running[rtype] -= 1
+
+    keys = [('file', str(i)) for i in range(4)] + [('page', str(i)) for i in range(4)]
+    threaded_execute(
+        items=[(key, key) for key in keys],
+        execute=execute,
+        concurrency=concurrency,
+        get_group=lambda key: key[0],
+    )
+
+    assert max_running['file'] == 1
+    assert max_running['page'] > 1
@@ -0,0 +1,79 @@
+import random
+
+from mdxcanvas.deploy.algorithms import linearize_dependencies
+from tests.fake_canvas import FakeCanvas, connect
+from tests.support import deploy
+
+SHELL_TYPES = ['assignment', 'page', 'quiz']
+
+
+def _page(i: int) -> tuple[str, str]:
+    return 'page', f'p{i}'
+
+
+def _assert_deployable(graph: dict, order: list):
+    """Every full deployment comes after the full deployment or the shell of each of its dependencies."""
+    done = set()
+    for node, is_shell in order:
+        if not is_shell:
+            for dep in graph[node]:
+                assert (dep, False) in done or (dep, True) in done, f'{node} is deployed before {dep}'
+        done.add((node, is_shell))
+    assert {node for node, is_shell in order if not is_shell} == set(graph)
+
+
+def test_a_ring_needs_a_single_shell():
+    graph = {_page(i): [_page((i + 1) % 5)] for i in range(5)}
+    order = linearize_dependencies(graph, SHELL_TYPES)
+
+    assert sum(is_shell for _, is_shell in order) == 1
+    _assert_deployable(graph, order)
+
+
+def test_dense_links_use_fewer_shells_than_pages():
+    rng = random.Random(1)
+    graph = {_page(i): [_page(j) for j in rng.sample(range(40), 4) if j != i] for i in range(40)}
+    order = linearize_dependencies(graph, SHELL_TYPES)
+
+    assert sum(is_shell for _, is_shell in order) < 25
+    _assert_deployable(graph, order)
+
+
+def test_only_shell_types_break_cycles():
+    module, item = ('module', 'm'), ('module_item', 'i')
+    assignment, group = ('assignment', 'a'), ('assignment_group', 'g')
+    graph = {module: [item], item: [module, assignment], assignment: [item, group], group: []}
+    order = linearize_dependencies(graph, SHELL_TYPES)
+
+    assert order[:2] == [(group, False), (assignment, True)]
+    # The module and its item are on a cycle that no shell breaks; they are still ordered
+    assert {node for node, _ in order} == set(graph)
+
+
+def test_self_reference_gets_a_shell():
+    graph = {_page(0): [_page(0)]}
+    assert linearize_dependencies(graph, SHELL_TYPES) == [(_page(0), True), (_page(0), False)]
+
+
+def test_deploy_a_web_of_pages(tmp_path):
+    pages = 4
+    input_file = tmp_path / 'course.canvas.md.xml'
+    input_file.write_text('\n'.join(
+        f'<page id="p{i}" title="Page {i}">\n'
+        + ' '.join(f'<course-link type="page" id="p{j}">see {j}</course-link>' for j in range(pages) if j != i)
+        + '\n</page>'
+        for i in range(pages)
+    ))
+
+    fake = FakeCanvas(default_latency=0)
+    course = connect(fake, max_workers=4)
+    deploy(course, input_file, tmp_path)
+
+    # Every page links to every other: all but one are created as shells first, then updated
+    assert fake.requests['POST /api/v1/courses/:id/pages'] == pages
+    assert fake.requests['PUT /api/v1/courses/:id/pages/:url'] == pages - 1
+    by_title = {page['title']: page for page in fake.objects('pages')}
+    for i in range(pages):
+        for j in range(pages):
+            if j != i:
+                assert f'/courses/1/pages/{by_title[f"Page {j}"]["url"]}' in by_title[f'Page {i}']['body']
@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+
+import pytest
+
+from mdxcanvas.deploy.checksums import MD5Sums
+from mdxcanvas.deploy.journal import get_journal_path
+
+
+@pytest.fixture
+def saved_manifests(monkeypatch):
+    saved = []
+    monkeypatch.setattr('mdxcanvas.deploy.checksums.get_file', lambda *_args: None)
+    monkeypatch.setattr('mdxcanvas.deploy.checksums.MD5Sums._save_md5s', lambda self: saved.append(dict(self._md5s)))
+    return saved
+
+
+def _interrupted_deployment(course, deploy_root):
+    md5s = MD5Sums(course, deploy_root).__enter__()
+    md5s['page', 'home'] = {'checksum': 'abc', 'canvas_info': {'id': 1}}
+    md5s['file', 'old.png'] = {'checksum': 'def', 'canvas_info': {'id': 2}}
+    md5s.remove(('file', 'old.png'))
+    # The process dies here: __exit__ never runs
+
+
+def test_journal_of_interrupted_deployment_is_replayed(tmp_path, saved_manifests):
+    course = SimpleNamespace(id=42)
+    _interrupted_deployment(course, tmp_path)
+    assert get_journal_path(tmp_path, course.id).exists()
+
+    with MD5Sums(course, tmp_path) as md5s:
+        assert md5s.get_canvas_info(('page', 'home')) == {'id': 1}
+        assert md5s.get(('file', 'old.png')) is None
+
+    assert saved_manifests[-1] == {('page', 'home'): {'checksum': 'abc', 'canvas_info': {'id': 1}}}
+    assert not get_journal_path(tmp_path, course.id).exists()
+
+
+def test_journal_is_discarded_on_request(tmp_path, saved_manifests):
+    course = SimpleNamespace(id=42)
+    _interrupted_deployment(course, tmp_path)
+
+    with MD5Sums(course, tmp_path, discard_journal=True) as md5s:
+        assert md5s.get(('page', 'home')) is None
+
+    assert not get_journal_path(tmp_path, course.id).exists()
+
+
+def test_journal_is_kept_if_manifest_upload_fails(tmp_path, monkeypatch, saved_manifests):
+    course = SimpleNamespace(id=42)
+    md5s = MD5Sums(course, tmp_path).__enter__()
+    md5s['page', 'home'] = {'checksum': 'abc', 'canvas_info': {'id': 1}}
+
+    def fail(_self):
+        raise ConnectionError('Canvas is down')
+
+    monkeypatch.setattr('mdxcanvas.deploy.checksums.MD5Sums._save_md5s', fail)
+    with pytest.raises(ConnectionError):
+        md5s.__exit__(None, None, None)
+
+    assert get_journal_path(tmp_path, course.id).exists()
@@ -0,0 +1,97 @@
+from pathlib import Path
+
+from mdxcanvas.deploy.canvas_deploy import deploy_to_canvas
+from mdxcanvas.deploy.plan import plan_deployment
+from mdxcanvas.deployment_report import DeploymentReport
+
+
+class FakeMD5Sums:
+    def __init__(self, data):
+        self._data = data
+
+    def items(self):
+        return self._data.items()
+
+    def get(self, item, *args):
+        return self._data.get(item, *args)
+
+    def get_canvas_info(self, item):
+        return self._data.get(item, {}).get('canvas_info')
+
+
+def _resource(rtype, rid, canvas_id=None):
+    return {'type': rtype, 'id': rid, 'data': {'canvas_id': canvas_id}, 'content_path': ''}
+
+
+def test_plan_describes_actions_reasons_and_costs():
+    md5s = FakeMD5Sums({('page', 'home'): {'checksum': 'x', 'canvas_info': {'id': 1}, 'duration': 4.2}})
+    to_deploy = {
+        (('page', 'syllabus'), True): ('a', _resource('page', 'syllabus'), 'new'),
+        (('page', 'home'), False): ('b', _resource('page', 'home', canvas_id=1), 'checksum changed'),
+        (('page', 'syllabus'), False): ('a', _resource('page', 'syllabus'), 'new'),
+    }
+    stale = [('quiz_question', 'q1', {'id': 7, 'quiz_id': 3})]
+
+    plan = plan_deployment(to_deploy, stale, md5s)
+
+    assert [(p['action'], p['id'], p['reason']) for p in plan] == [
+        ('shell', 'syllabus', 'new'),
+        ('update', 'home', 'checksum changed'),
+        ('create', 'syllabus', 'new'),
+        ('delete', 'q1', 'stale'),
+    ]
+    assert [p['estimated_calls'] for p in plan] == [1, 2, 1, 3]
+    # Measured duration from the last deployment wins over the type default
+    assert plan[1]['estimated_seconds'] == 4.2
+
+
+def test_dryrun_plans_without_writing_to_canvas(monkeypatch):
+    created = []
+
+    class StubMD5Sums:
+        def __init__(self, *_args, dryrun=False, **_kwargs):
+            created.append(dryrun)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_args):
+            return False
+
+    def forbidden(*_args, **_kwargs):
+        raise AssertionError('dry run must not change Canvas')
+
+    monkeypatch.setattr('mdxcanvas.deploy.canvas_deploy.MD5Sums', StubMD5Sums)
+    monkeypatch.setattr('mdxcanvas.deploy.canvas_deploy.migrate', forbidden)
+    monkeypatch.setattr('mdxcanvas.deploy.canvas_deploy.migrate_checksum_algorithm', lambda *_args: None)
+    monkeypatch.setattr('mdxcanvas.deploy.canvas_deploy._deploy_resources', forbidden)
+    monkeypatch.setattr('mdxcanvas.deploy.canvas_deploy._remove_stale_resources', forbidden)
+    monkeypatch.setattr(
+        'mdxcanvas.deploy.canvas_deploy._prepare_deployment_order',
+        lambda _resources, _dependencies: ({}, []),
+    )
+    monkeypatch.setattr(
+        'mdxcanvas.deploy.canvas_deploy.identify_modified_or_outdated',
+        lambda *_args, **_kwargs: {(('page', 'home'), False): ('x', _resource('page', 'home'), 'new')},
+    )
+    monkeypatch.setattr(
+        'mdxcanvas.deploy.canvas_deploy.get_stale_resources',
+        lambda *_args, **_kwargs: [],
+    )
+    monkeypatch.setattr('mdxcanvas.deploy.plan.get_deploy_cost', lambda *_args: 1.0)
+
+    report = DeploymentReport()
+    deploy_to_canvas(
+        course=object(),
+        timezone='America/Denver',
+        resources={},
+        report=report,
+        deploy_root=Path('.'),
+        dryrun=True,
+    )
+
+    assert created == [True]
+    assert report.report['plan'] == [{
+        'type': 'page', 'id': 'home', 'action': 'create', 'reason': 'new',
+        'estimated_calls': 1, 'estimated_seconds': 1.0,
+    }]
@@ -0,0 +1,68 @@
+import os
+
+from mdxcanvas.deploy.checksums import PathDigestCache, _compute_checksum_of_path, compute_checksums, compute_md5
+
+OLD = 1_600_000_000
+
+
+def _write(path, text, mtime=OLD):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    os.utime(path, (mtime, mtime))
+
+
+def test_unchanged_files_are_not_read_again(tmp_path):
+    data = tmp_path / 'data'
+    _write(data / 'a.csv', 'a')
+    _write(data / 'nested' / 'b.csv', 'b')
+    cache_path = tmp_path / 'digests.json'
+
+    cache = PathDigestCache(cache_path)
+    assert cache.get(data) == _compute_checksum_of_path(data)
+    assert cache.hashed == 2
+    cache.save()
+
+    cache = PathDigestCache(cache_path)
+    assert cache.get(data) == _compute_checksum_of_path(data)
+    assert cache.hashed == 0
+    cache.save()
+
+    # Same size, later mtime: only the changed file is read
+    _write(data / 'nested' / 'b.csv', 'c', mtime=OLD + 1)
+    cache = PathDigestCache(cache_path)
+    assert cache.get(data) == _compute_checksum_of_path(data)
+    assert cache.hashed == 1
+
+
+def test_recently_modified_files_are_not_remembered(tmp_path):
+    path = tmp_path / 'notes.txt'
+    path.write_text('draft')
+    cache_path = tmp_path / 'digests.json'
+
+    cache = PathDigestCache(cache_path)
+    cache.get(path)
+    cache.save()
+
+    cache = PathDigestCache(cache_path)
+    cache.get(path)
+    assert cache.hashed == 1
+
+
+def test_parallel_checksums_match_sequential_ones(tmp_path):
+    resources = {}
+    for i in range(20):
+        _write(tmp_path / f'file_{i}.txt', f'file {i}')
+        resources['file', f'file_{i}'] = {
+            'type': 'file', 'id': f'file_{i}',
+            'data': {'path': f'file_{i}.txt', 'checksum_paths': [f'file_{i}.txt']}
+        }
+        resources['page', f'page_{i}'] = {'type': 'page', 'id': f'page_{i}', 'data': {'body': f'page {i}'}}
+    resources['page', 'reference'] = {'type': 'page', 'id': 'reference', 'data': None}
+
+    checksums = compute_checksums(resources, tmp_path, PathDigestCache(), max_workers=4)
+
+    assert checksums == {
+        key: compute_md5(resource['data'], tmp_path)
+        for key, resource in resources.items()
+        if resource['data'] is not None
+    }
@@ -0,0 +1,51 @@
+from tests.fake_canvas import FakeCanvas, connect, parse_params
+from tests.support import deploy, write_course
+
+QUIZ = '''
+<quiz id="check" title="Check">
+<questions>
+    <question id="q1" type="multiple-choice">
+        One plus one?
+        <correct>2</correct>
+        <incorrect>3</incorrect>
+    </question>
+</questions>
+</quiz>
+'''
+
+
+def test_parse_params_rebuilds_nested_fields():
+    assert parse_params([
+        ('quiz[title]', 'Check'),
+        ('order[][id]', '1'), ('order[][type]', 'question'),
+        ('order[][id]', '2'), ('order[][type]', 'question'),
+    ]) == {
+        'quiz': {'title': 'Check'},
+        'order': [{'id': '1', 'type': 'question'}, {'id': '2', 'type': 'question'}],
+    }
+
+
+def test_deploy_to_fake_canvas(tmp_path):
+    input_file = write_course(tmp_path, extra=QUIZ)
+
+    # A small page size makes the manifest lookup follow pagination links
+    fake = FakeCanvas(page_size=1)
+    course = connect(fake, max_workers=4)
+    deploy(course, input_file, tmp_path)
+
+    pages = {page['title']: page for page in fake.objects('pages')}
+    assert set(pages) == {'Intro', 'Details'}
+    assert f'/courses/1/pages/{pages["Details"]["url"]}' in pages['Intro']['body']
+    assert [question['quiz_id'] for question in fake.objects('questions')] == [fake.objects('quizzes')[0]['id']]
+    assert sorted(file['display_name'] for file in fake.objects('files')) == [
+        '_manifest.json', '_manifest.page.json.gz', '_manifest.quiz.json.gz',
+        '_manifest.quiz_question.json.gz', '_manifest.quiz_question_order.json.gz',
+    ]
+
+    # Unchanged content is not written again, and neither is the manifest
+    def content_writes():
+        return sum(n for endpoint, n in fake.requests.items() if not endpoint.startswith('GET'))
+
+    writes_before = content_writes()
+    assert deploy(course, input_file, tmp_path).get_deployed_content() == []
+    assert content_writes() == writes_before
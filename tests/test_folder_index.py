@@ -0,0 +1,44 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from mdxcanvas.deploy.checksums import MD5Sums
+from mdxcanvas.deploy.file import deploy_file, get_file
+from tests.fake_canvas import FakeCanvas, connect
+
+
+def test_concurrent_uploads_list_and_create_the_folder_once(tmp_path):
+    fake = FakeCanvas(default_latency=0.005)
+    course = connect(fake, max_workers=8)
+    for i in range(8):
+        (tmp_path / f'file_{i}.txt').write_text(f'file {i}')
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda i: deploy_file(course, {'path': f'file_{i}.txt'}, tmp_path), range(8)))
+
+    assert fake.requests['GET /api/v1/courses/:id/folders'] == 1
+    assert fake.requests['POST /api/v1/courses/:id/folders'] == 1
+    assert len([f for f in fake.objects('folders') if f['name'] == 'deployed_files']) == 1
+
+
+def test_uploads_invalidate_the_file_listing(tmp_path):
+    course = connect(FakeCanvas())
+    (tmp_path / 'a.txt').write_text('a')
+    (tmp_path / 'b.txt').write_text('b')
+
+    deploy_file(course, {'path': 'a.txt'}, tmp_path)
+    assert get_file(course, 'b.txt', 'deployed_files') is None
+
+    deploy_file(course, {'path': 'b.txt'}, tmp_path)
+    assert get_file(course, 'b.txt', 'deployed_files') is not None
+
+
+def test_manifest_lookup_of_a_new_course_lists_the_course_files_once(tmp_path):
+    fake = FakeCanvas()
+    course = connect(fake)
+
+    # Neither the manifest nor the legacy manifest exists yet, and neither does their folder
+    with MD5Sums(course, tmp_path, dryrun=True):
+        pass
+
+    assert fake.requests['GET /api/v1/courses/:id/folders/by_path/_md5s'] == 1
+    assert fake.requests['GET /api/v1/courses/:id/folders'] == 0
+    assert fake.requests['GET /api/v1/courses/:id/files'] == 1
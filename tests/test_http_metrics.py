@@ -0,0 +1,58 @@
+import requests
+from requests.adapters import BaseAdapter
+
+from mdxcanvas.http_metrics import HttpMetrics, endpoint_template, track_resource
+
+
+class CannedAdapter(BaseAdapter):
+    def send(self, request, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response.url = request.url
+        response.request = request
+        response._content = b'{"id": 1}'
+        response.headers['X-Request-Cost'] = '1.5'
+        response.headers['X-Rate-Limit-Remaining'] = '600.0'
+        return response
+
+    def close(self):
+        pass
+
+
+def test_endpoint_template_groups_requests_for_different_objects():
+    assert endpoint_template('https://canvas.test/api/v1/courses/12/pages/my-page?x=1') \
+           == '/api/v1/courses/:id/pages/:url'
+    assert endpoint_template('https://canvas.test/api/v1/courses/12/quizzes/3/questions/45') \
+           == '/api/v1/courses/:id/quizzes/:id/questions/:id'
+
+
+def test_metrics_are_attributed_to_the_current_resource(tmp_path):
+    session = requests.Session()
+    session.mount('https://', CannedAdapter())
+    metrics = HttpMetrics()
+
+    with metrics.watch(session):
+        session.get('https://canvas.test/api/v1/courses/1')
+        with track_resource(('quiz_question', 'q1')):
+            session.get('https://canvas.test/api/v1/courses/1/quizzes/2')
+            session.put('https://canvas.test/api/v1/courses/1/quizzes/2/questions/3', data=b'question')
+
+    summary = metrics.summary()
+    assert summary['total']['requests'] == 3
+    assert summary['min_rate_limit_remaining'] == 600.0
+
+    quiz_questions = summary['by_type']['quiz_question']
+    assert quiz_questions['requests'] == 2
+    assert quiz_questions['requests_per_resource'] == 2
+    assert quiz_questions['bytes_sent'] == len(b'question')
+    assert set(quiz_questions['endpoints']) == {
+        'GET /api/v1/courses/:id/quizzes/:id',
+        'PUT /api/v1/courses/:id/quizzes/:id/questions/:id',
+    }
+    assert summary['by_resource']['quiz_question|q1']['statuses'] == {'200': 2}
+    assert summary['by_type']['other']['requests'] == 1
+
+    metrics.write_prometheus(tmp_path / 'metrics.prom')
+    assert ('mdxcanvas_http_requests_total{type="quiz_question",method="PUT",'
+            'endpoint="/api/v1/courses/:id/quizzes/:id/questions/:id",status="200"} 1'
+            ) in (tmp_path / 'metrics.prom').read_text()
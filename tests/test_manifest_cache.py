@@ -0,0 +1,87 @@
+import json
+
+from mdxcanvas.deploy.checksums import MD5_FOLDER_NAME, MD5Sums, get_manifest_cache_path
+from mdxcanvas.deploy.file import get_canvas_folder
+from tests.fake_canvas import FakeCanvas, connect
+
+
+def _requests(fake: FakeCanvas) -> int:
+    return sum(fake.requests.values())
+
+
+def test_warm_start_reads_the_manifest_by_id(tmp_path):
+    fake = FakeCanvas()
+    course = connect(fake)
+
+    with MD5Sums(course, tmp_path) as md5s:
+        md5s['page', 'home'] = {'checksum': 'abc', 'canvas_info': {'id': 1}}
+    assert get_manifest_cache_path(tmp_path, course.id).exists()
+
+    # Only the file metadata is fetched; the manifest is unchanged, so it is neither downloaded nor uploaded
+    before = _requests(fake)
+    with MD5Sums(course, tmp_path) as md5s:
+        assert md5s.get_checksum(('page', 'home')) == 'abc'
+    assert _requests(fake) - before == 1
+
+    # Another machine deployed: the new version is downloaded
+    with MD5Sums(course, tmp_path / 'elsewhere') as md5s:
+        md5s['page', 'home'] = {'checksum': 'xyz', 'canvas_info': {'id': 1}}
+    with MD5Sums(course, tmp_path) as md5s:
+        assert md5s.get_checksum(('page', 'home')) == 'xyz'
+
+
+def test_missing_cached_file_falls_back_to_the_manifest_folder(tmp_path):
+    fake = FakeCanvas()
+    course = connect(fake)
+
+    with MD5Sums(course, tmp_path) as md5s:
+        md5s['page', 'home'] = {'checksum': 'abc', 'canvas_info': {'id': 1}}
+    get_manifest_cache_path(tmp_path, course.id).write_text('{"file_id": 999999}')
+    fake.requests.clear()
+
+    with MD5Sums(course, tmp_path) as md5s:
+        assert md5s.get_checksum(('page', 'home')) == 'abc'
+
+    assert fake.requests['GET /api/v1/courses/:id/folders'] == 0  # Listed by the first deployment
+    assert fake.requests['GET /api/v1/folders/:id/files'] == 1
+    # The course-wide file listing is not needed once the manifest folder exists
+    assert fake.requests['GET /api/v1/courses/:id/files'] == 0
+
+
+def test_only_changed_shards_are_uploaded(tmp_path):
+    fake = FakeCanvas()
+    course = connect(fake)
+
+    with MD5Sums(course, tmp_path) as md5s:
+        md5s['page', 'home'] = {'checksum': 'abc', 'canvas_info': {'id': 1}}
+        md5s['file', 'logo.png'] = {'checksum': 'def', 'canvas_info': {'id': 2}}
+    fake.requests.clear()
+
+    with MD5Sums(course, tmp_path) as md5s:
+        md5s['page', 'home'] = {'checksum': 'xyz', 'canvas_info': {'id': 1}}
+
+    # The page shard and the header
+    assert fake.requests['POST canvas.fake/upload/:token'] == 2
+    with MD5Sums(course, tmp_path / 'elsewhere', dryrun=True) as md5s:
+        assert md5s.get_checksum(('page', 'home')) == 'xyz'
+        assert md5s.get_checksum(('file', 'logo.png')) == 'def'
+
+
+def test_single_file_manifest_is_converted(tmp_path):
+    fake = FakeCanvas()
+    course = connect(fake)
+    legacy = tmp_path / '_md5sums.json'
+    legacy.write_text(json.dumps({
+        'mdxcanvas_version': '0.7.0',
+        'resources': {'page|home': {'checksum': 'abc', 'canvas_info': {'id': 1}}}
+    }))
+    get_canvas_folder(course, MD5_FOLDER_NAME).upload(legacy)
+
+    with MD5Sums(course, tmp_path / 'first') as md5s:
+        assert md5s.get_checksum(('page', 'home')) == 'abc'
+        assert md5s.get_checksum_algorithm() == 'md5'
+
+    with MD5Sums(course, tmp_path / 'second', dryrun=True) as md5s:
+        assert md5s.get_checksum(('page', 'home')) == 'abc'
+        assert md5s.get_mdxcanvas_version() == '0.7.0'
+    assert '_manifest.page.json.gz' in {file['display_name'] for file in fake.objects('files')}
@@ -1,5 +1,8 @@
+import threading
+import time
 from typing import Any
 
+from mdxcanvas.concurrency import AdaptiveConcurrency
 from mdxcanvas.parallel import threaded_execute
 from canvasapi.exceptions import RateLimitExceeded
 
@@ -18,6 +21,7 @@ def test_threaded_execute_retries_rate_limit(monkeypatch):
         sleeps.append(seconds)
 
     monkeypatch.setattr('mdxcanvas.parallel.time.sleep', fake_sleep)
+    monkeypatch.setattr('mdxcanvas.retry.random.uniform', lambda _low, high: high)
 
     def execute(_):
         calls['count'] += 1
@@ -99,3 +103,117 @@ def test_threaded_execute_validates_retry_options():
         assert False, 'Expected ValueError for cooldown'
     except ValueError:
         pass
+
+
+def test_threaded_execute_does_not_block_independent_items_behind_slow_dependency():
+    fast_done = threading.Event()
+    slow_saw_fast = {}
+
+    def execute(name):
+        if name == 'slow':
+            slow_saw_fast['value'] = fast_done.wait(timeout=2)
+        elif name == 'fast':
+            fast_done.set()
+
+    dependencies = {'dependent': ['slow']}
+
+    threaded_execute(
+        items=[('slow', 'slow'), ('dependent', 'dependent'), ('fast', 'fast')],
+        execute=execute,
+        get_dependencies=lambda key: dependencies.get(key, []),
+    )
+
+    assert slow_saw_fast['value'] is True
+
+
+def test_threaded_execute_respects_dependencies_and_key_order():
+    finished = []
+    lock = threading.Lock()
+
+    def execute(name):
+        time.sleep(0.01 if name.startswith('a') else 0)
+        with lock:
+            finished.append(name)
+
+    dependencies = {'b': ['a'], 'c': ['b']}
+
+    threaded_execute(
+        items=[('a', 'a-shell'), ('b', 'b'), ('c', 'c'), ('a', 'a-full')],
+        execute=execute,
+        get_dependencies=lambda key: dependencies.get(key, []),
+    )
+
+    assert finished.index('a-shell') < finished.index('b') < finished.index('c')
+    assert finished.index('a-shell') < finished.index('a-full')
+
+
+def test_threaded_execute_fails_fast_without_running_dependents():
+    calls = []
+
+    def execute(name):
+        calls.append(name)
+        if name == 'a':
+            raise ValueError('boom')
+
+    try:
+        threaded_execute(
+            items=[('a', 'a'), ('b', 'b'), ('independent', 'independent')],
+            execute=execute,
+            get_dependencies=lambda key: ['a'] if key == 'b' else [],
+            # One task at a time: the independent task is still queued when 'a' fails
+            concurrency=AdaptiveConcurrency(max_limit=1, initial_limit=1),
+        )
+        assert False, 'Expected ValueError'
+    except ValueError:
+        pass
+
+    assert calls == ['a']
+
+
+def test_threaded_execute_cancels_queued_tasks_after_a_failure():
+    started = []
+    failing_started = threading.Event()
+
+    def execute(name):
+        started.append(name)
+        if name == 'fail':
+            failing_started.set()
+            raise ValueError('boom')
+        if name == 'slow':
+            # Keeps the other worker busy until the failure is reported, so 'queued' has not started yet
+            failing_started.wait(timeout=2)
+            time.sleep(0.05)
+
+    try:
+        threaded_execute(
+            items=[('slow', 'slow'), ('fail', 'fail'), ('queued', 'queued')],
+            execute=execute,
+            concurrency=AdaptiveConcurrency(max_limit=2, initial_limit=2),
+        )
+        assert False, 'Expected ValueError'
+    except ValueError:
+        pass
+
+    assert 'queued' not in started
+
+
+def test_threaded_execute_starts_critical_path_and_priorities_first():
+    started = []
+
+    def execute(name):
+        started.append(name)
+
+    concurrency = AdaptiveConcurrency(max_limit=1, initial_limit=1)
+    dependencies = {'chain-2': ['chain-1'], 'chain-3': ['chain-2'], 'urgent': ['urgent-file']}
+
+    threaded_execute(
+        items=[(name, name) for name in ['leaf', 'chain-1', 'chain-2', 'chain-3', 'urgent-file', 'urgent']],
+        execute=execute,
+        get_dependencies=lambda key: dependencies.get(key, []),
+        concurrency=concurrency,
+        get_priority=lambda key: 1 if key == 'urgent' else 0,
+    )
+
+    assert started[:2] == ['urgent-file', 'urgent']
+    assert started[2] == 'chain-1'
+    assert started.index('chain-2') < started.index('leaf')
@@ -0,0 +1,45 @@
+from mdxcanvas.recording import connect_replay, load_recording, record_to, redact, restore_manifest_cache
+from tests.fake_canvas import FakeCanvas, connect
+from tests.support import deploy, write_course
+
+
+def test_redact_is_stable_and_idempotent():
+    url = 'https://canvas.test/files/1/download?verifier=abc123&download_frd=1'
+    body = '{"upload_params": {"key": "a/b.png", "x-amz-signature": "s3cr3t"}}'
+
+    assert 'abc123' not in redact(url)
+    assert 's3cr3t' not in redact(body)
+    assert 'a/b.png' in redact(body)
+    # The same secret gets the same digest wherever it appears, so replayed URLs still match
+    digest = redact(url).split('verifier=')[1].split('&')[0]
+    assert digest in redact('{"verifier": "abc123"}')
+    assert redact(redact(url)) == redact(url)
+
+
+def test_redact_inst_fs_upload_urls():
+    body = '{"upload_url": "https://inst-fs-iad-prod.inscloudgate.net/files?token=eyJhbGciOi.abc&foo=bar"}'
+
+    redacted = redact(body)
+    assert 'eyJhbGciOi.abc' not in redacted
+    assert 'https://inst-fs-iad-prod.inscloudgate.net/files?token=redacted-' in redacted
+    assert '&foo=bar' in redacted
+
+
+def test_replay_serves_a_recorded_deployment(tmp_path):
+    input_file = write_course(tmp_path)
+    recording_file = tmp_path / 'recording.json.gz'
+
+    course = connect(FakeCanvas(default_latency=0.001), max_workers=4)
+    with record_to(recording_file, course, tmp_path):
+        deploy(course, input_file, tmp_path)
+
+    recording = load_recording(recording_file)
+    assert all(exchange['elapsed'] >= 0.001 for exchange in recording['exchanges'])
+
+    restore_manifest_cache(recording, tmp_path)
+    course, replay = connect_replay(recording, max_workers=4)
+    report = deploy(course, input_file, tmp_path)
+
+    assert {rtype for rtype, _, _ in report.get_deployed_content()} == {'page'}
+    assert replay.unmatched == 0
+    assert replay.matched == len(recording['exchanges'])
@@ -0,0 +1,76 @@
+from datetime import datetime
+
+import pytest
+
+from mdxcanvas.deploy.canvas_deploy import update_links
+from mdxcanvas.deploy.rendering import ResourceRenderer, compile_string
+from mdxcanvas.resources import get_key
+
+NOW = datetime(2000, 1, 11, 1, 0, 0)
+
+
+class Manifest:
+    def __init__(self, info: dict):
+        self.info = info
+
+    def get_canvas_info(self, key):
+        return self.info.get(key)
+
+
+def test_compile_string_splits_literals_placeholders_and_timestamps():
+    link = get_key('page', 'intro', 'uri')
+    assert compile_string('No links here') is None
+    assert compile_string('A timestamp is not a <timestamp') is None
+    assert compile_string(f'See {link} at <timestamp format="%D"/>.') == [
+        'See ', (link, ('page', 'intro', 'uri')), ' at ', ('<timestamp format="%D"/>', '%D'), '.'
+    ]
+
+
+def test_render_resolves_every_string_in_one_pass():
+    link = get_key('page', 'intro', 'uri')
+    data = {
+        'title': 'Week 1',
+        'body': f'<a href="{link}">Intro</a> and again <a href="{link}">Intro</a>, updated <timestamp/>',
+        'items': [(link, 3), {'nested': get_key('assignment_group', 'hw', 'id')}],
+        'points': 10,
+    }
+    values = {('page', 'intro', 'uri'): '/courses/1/pages/intro', ('assignment_group', 'hw', 'id'): '42'}
+
+    rendered = ResourceRenderer().render(data, lambda *field: values[field], NOW)
+
+    assert rendered == {
+        'title': 'Week 1',
+        'body': '<a href="/courses/1/pages/intro">Intro</a> and again <a href="/courses/1/pages/intro">Intro</a>, '
+                'updated January 11, 2000 at 01:00 AM',
+        'items': [['/courses/1/pages/intro', 3], {'nested': '42'}],
+        'points': 10,
+    }
+    # The resource itself is left as it was
+    assert link in data['body']
+
+
+def test_render_leaves_unrequested_segments_alone():
+    text = f'{get_key("page", "intro", "uri")} <timestamp/>'
+    renderer = ResourceRenderer()
+    assert renderer.render(text) == text
+    assert renderer.render(text, now=NOW) == f'{get_key("page", "intro", "uri")} January 11, 2000 at 01:00 AM'
+
+
+def test_resolved_values_are_not_spliced_into_json():
+    # A title with quotes and backslashes used to break the JSON round trip
+    data = {'text': get_key('page', 'intro', 'title')}
+    manifest = Manifest({('page', 'intro'): {'title': 'The "quoted" \\ title'}})
+    resource = {'type': 'page', 'id': 'outline', 'content_path': 'course.md', 'data': data}
+
+    assert update_links(manifest, data, {}, resource) == {'text': 'The "quoted" \\ title'}
+
+
+def test_missing_canvas_info_names_the_reference():
+    data = {'text': get_key('page', 'missing', 'uri')}
+    resource = {'type': 'page', 'id': 'outline', 'content_path': 'course.md', 'data': data}
+
+    with pytest.raises(ValueError, match='No canvas info for page missing'):
+        update_links(Manifest({}), data, {}, resource)
+
+    with pytest.raises(ValueError, match="Missing field 'uri' in page missing"):
+        update_links(Manifest({}), data, {('page', 'missing'): {'id': 1}}, resource)
@@ -0,0 +1,26 @@
+from mdxcanvas.deploy.canvas_deploy import get_dependencies
+from mdxcanvas.resources import CanvasResource, ResourceManager, get_key
+
+
+def _page(rid, body):
+    return CanvasResource(type='page', id=rid, data={'title': rid, 'body': body}, content_path='')
+
+
+def test_dependencies_are_indexed_when_resources_are_added():
+    resources = ResourceManager()
+    logo = resources.add_resource_get_field(
+        CanvasResource(type='file', id='logo.png', data={'path': 'logo.png'}, content_path=''), 'uri')
+    resources.add_resource(_page('intro', f'<img src="{logo}"> <a href="{get_key("page", "details", "uri")}">'))
+    resources.add_resource(_page('details', 'No links yet'))
+    # Replacing a resource replaces its dependencies
+    resources.add_resource(_page('details', f'Back to {get_key("page", "intro", "title")} or {get_key("quiz", "q", "uri")}'))
+
+    expected = {
+        ('file', 'logo.png'): [],
+        ('page', 'intro'): [('file', 'logo.png'), ('page', 'details')],
+        ('page', 'details'): [('page', 'intro'), ('quiz', 'q')],
+    }
+    assert get_dependencies(dict(resources)) == expected
+    assert get_dependencies(resources) == expected
+    # Referenced resources that are not defined are added as references
+    assert resources['quiz', 'q']['data'] == {}
@@ -0,0 +1,160 @@
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+from canvasapi.exceptions import CanvasException, Forbidden, ResourceDoesNotExist
+
+from mdxcanvas.parallel import threaded_execute
+from mdxcanvas.retry import (
+    CONNECTION_ERROR, RATE_LIMIT, SERVER_ERROR, CircuitBreaker, RetryPolicy, classify_error, record_response,
+    start_attempt
+)
+
+
+def _request(method: str) -> requests.PreparedRequest:
+    return requests.Request(method, 'https://canvas.test/api/v1/courses/1/pages').prepare()
+
+
+class FakeResponse:
+    def __init__(self, headers=None, method='GET', status_code=200, text=''):
+        self.headers = headers or {}
+        self.request = _request(method)
+        self.status_code = status_code
+        self.text = text
+
+
+def test_classify_error_follows_wrapped_causes():
+    start_attempt()
+    record_response(FakeResponse(method='PUT', status_code=503))
+    try:
+        try:
+            raise CanvasException('Encountered an error: status code 503')
+        except CanvasException as e:
+            raise Exception('Error deploying page home') from e
+    except Exception as wrapped:
+        assert classify_error(wrapped) == SERVER_ERROR
+
+    assert classify_error(CanvasException('Encountered an error: status code 429')) == RATE_LIMIT
+    assert classify_error(requests.ConnectionError('reset', request=_request('GET'))) == CONNECTION_ERROR
+    assert classify_error(ResourceDoesNotExist('Not Found')) is None
+    assert classify_error(ValueError('boom')) is None
+
+
+def test_classify_error_treats_canvas_403_throttling_as_rate_limit():
+    start_attempt()
+    # What canvasapi raises for Canvas' throttling response
+    assert classify_error(Forbidden('403 Forbidden (Rate Limit Exceeded)')) == RATE_LIMIT
+    assert classify_error(Forbidden('user not authorized to perform that action')) is None
+
+
+def test_classify_error_does_not_repeat_requests_canvas_may_have_processed():
+    # Canvas may have created the page before the gateway failed or the response timed out
+    start_attempt()
+    record_response(FakeResponse(method='POST', status_code=502))
+    assert classify_error(CanvasException('Encountered an error: status code 502')) is None
+
+    start_attempt()
+    assert classify_error(requests.ReadTimeout('timed out', request=_request('POST'))) is None
+    assert classify_error(requests.ConnectionError('reset')) is None
+
+    # Requests that never reached Canvas are safe to send again
+    assert classify_error(requests.ConnectTimeout('timed out', request=_request('POST'))) == CONNECTION_ERROR
+    refused = MaxRetryError(None, '/api/v1/courses/1/pages', NewConnectionError(None, 'Connection refused'))
+    assert classify_error(requests.ConnectionError(refused, request=_request('POST'))) == CONNECTION_ERROR
+
+    # Throttled requests are rejected before they are processed
+    record_response(FakeResponse(method='POST', status_code=403, text='403 Forbidden (Rate Limit Exceeded)'))
+    assert classify_error(Forbidden('403 Forbidden (Rate Limit Exceeded)')) == RATE_LIMIT
+
+
+def test_classify_error_does_not_repeat_a_task_that_created_an_object():
+    # The page was created; retrying the task after its module update failed would create it again
+    start_attempt()
+    record_response(FakeResponse(method='POST', status_code=200))
+    record_response(FakeResponse(method='PUT', status_code=503))
+    assert classify_error(CanvasException('Encountered an error: status code 503')) is None
+    assert classify_error(requests.ReadTimeout('timed out', request=_request('GET'))) is None
+    assert classify_error(Forbidden('403 Forbidden (Rate Limit Exceeded)')) is None
+
+    # The next attempt starts over
+    start_attempt()
+    assert classify_error(CanvasException('Encountered an error: status code 503')) == SERVER_ERROR
+
+
+def test_retry_delay_is_exponential_jittered_and_honors_retry_after(monkeypatch):
+    monkeypatch.setattr('mdxcanvas.retry.random.uniform', lambda _low, high: high)
+    policy = RetryPolicy(base_delay=1, max_delay=10)
+
+    assert [policy.delay(attempt) for attempt in range(5)] == [1, 2, 4, 8, 10]
+    assert policy.delay(0, retry_after=5) == 5
+
+    monkeypatch.setattr('mdxcanvas.retry.random.uniform', lambda low, _high: low)
+    assert policy.delay(2) == 2
+
+
+def test_threaded_execute_retries_server_errors_with_retry_after(monkeypatch):
+    sleeps = []
+    calls = {'count': 0}
+    monkeypatch.setattr('mdxcanvas.parallel.time.sleep', sleeps.append)
+
+    def execute(_):
+        calls['count'] += 1
+        if calls['count'] < 3:
+            record_response(FakeResponse({'Retry-After': '7'}, status_code=502))
+            raise CanvasException('Encountered an error: status code 502')
+
+    threaded_execute(
+        items=[('a', 'data')],
+        execute=execute,
+        retry_policy=RetryPolicy(base_delay=0.1),
+    )
+
+    assert calls['count'] == 3
+    assert sleeps == [7, 7]
+
+
+def test_threaded_execute_does_not_retry_a_task_after_it_created_an_object(monkeypatch):
+    calls = {'count': 0}
+    monkeypatch.setattr('mdxcanvas.parallel.time.sleep', lambda _: None)
+
+    def execute(_):
+        calls['count'] += 1
+        record_response(FakeResponse(method='POST', status_code=200))
+        raise requests.ConnectionError('reset', request=_request('GET'))
+
+    try:
+        threaded_execute(items=[('a', 'data')], execute=execute, retry_policy=RetryPolicy())
+        assert False, 'Expected ConnectionError'
+    except requests.ConnectionError:
+        pass
+
+    assert calls['count'] == 1
+
+
+def test_threaded_execute_stops_after_error_class_budget(monkeypatch):
+    calls = {'count': 0}
+    monkeypatch.setattr('mdxcanvas.parallel.time.sleep', lambda _: None)
+
+    def execute(_):
+        calls['count'] += 1
+        raise requests.ConnectionError('reset', request=_request('DELETE'))
+
+    try:
+        threaded_execute(
+            items=[('a', 'data')],
+            execute=execute,
+            retry_policy=RetryPolicy(retry_budgets={CONNECTION_ERROR: 1}),
+        )
+        assert False, 'Expected ConnectionError'
+    except requests.ConnectionError:
+        pass
+
+    assert calls['count'] == 2
+
+
+def test_circuit_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure()
+    assert breaker.remaining_open_time() == 0
+
+    breaker.record_failure()
+    assert breaker.remaining_open_time() > 0
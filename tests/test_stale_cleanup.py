@@ -63,7 +63,7 @@ def test_deploy_to_canvas_applies_default_stale_cleanup(monkeypatch):
         def __exit__(self, *_args):
             return False
 
-    def fake_remove(_course, _resources, _md5s, allowed_types=None):
+    def fake_remove(_course, _resources, _md5s, allowed_types=None, concurrency=None):
         recorded['allowed_types'] = allowed_types
         return 2
 
@@ -72,9 +72,10 @@ def test_deploy_to_canvas_applies_default_stale_cleanup(monkeypatch):
 
     monkeypatch.setattr('mdxcanvas.deploy.canvas_deploy.MD5Sums', StubMD5Sums)
     monkeypatch.setattr('mdxcanvas.deploy.canvas_deploy.migrate', lambda *_args: None)
+    monkeypatch.setattr('mdxcanvas.deploy.canvas_deploy.migrate_checksum_algorithm', lambda *_args: None)
     monkeypatch.setattr(
         'mdxcanvas.deploy.canvas_deploy._prepare_deployment_order',
-        lambda _resources: ({}, []),
+        lambda _resources, _dependencies: ({}, []),
     )
     monkeypatch.setattr(
         'mdxcanvas.deploy.canvas_deploy.identify_modified_or_outdated',
@@ -115,15 +116,16 @@ def test_deploy_to_canvas_cleanup_flag_keeps_full_cleanup(monkeypatch):
         def __exit__(self, *_args):
             return False
 
-    def fake_remove(_course, _resources, _md5s, allowed_types=None):
+    def fake_remove(_course, _resources, _md5s, allowed_types=None, concurrency=None):
         recorded['allowed_types'] = allowed_types
         return 1
 
     monkeypatch.setattr('mdxcanvas.deploy.canvas_deploy.MD5Sums', StubMD5Sums)
     monkeypatch.setattr('mdxcanvas.deploy.canvas_deploy.migrate', lambda *_args: None)
+    monkeypatch.setattr('mdxcanvas.deploy.canvas_deploy.migrate_checksum_algorithm', lambda *_args: None)
     monkeypatch.setattr(
         'mdxcanvas.deploy.canvas_deploy._prepare_deployment_order',
-        lambda _resources: ({}, []),
+        lambda _resources, _dependencies: ({}, []),
     )
     monkeypatch.setattr(
         'mdxcanvas.deploy.canvas_deploy.identify_modified_or_outdated',
@@ -0,0 +1,61 @@
+import json
+from datetime import timedelta
+
+import requests
+
+from mdxcanvas.parallel import threaded_execute
+from mdxcanvas.tracing import span, trace_response, trace_to
+
+
+def test_trace_records_nested_spans_per_thread(tmp_path):
+    trace_file = tmp_path / 'trace.json'
+
+    def execute(name):
+        with span(name, category='deploy'):
+            pass
+
+    with trace_to(trace_file):
+        with span('deploy_resources'):
+            threaded_execute([('a', 'task-a'), ('b', 'task-b')], execute)
+
+    events = json.loads(trace_file.read_text())['traceEvents']
+    spans = {event['name']: event for event in events if event['ph'] == 'X'}
+    assert set(spans) == {'deploy_resources', 'task-a', 'task-b'}
+
+    outer = spans['deploy_resources']
+    for task in ['task-a', 'task-b']:
+        assert spans[task]['cat'] == 'deploy'
+        assert outer['ts'] <= spans[task]['ts']
+        assert spans[task]['ts'] + spans[task]['dur'] <= outer['ts'] + outer['dur']
+        # Tasks run on the pool's worker threads, which are named in the trace
+        assert spans[task]['tid'] != outer['tid']
+
+    thread_names = {event['tid'] for event in events if event['ph'] == 'M'}
+    assert {spans['task-a']['tid'], outer['tid']} <= thread_names
+
+
+def test_spans_are_not_recorded_without_a_trace(tmp_path):
+    with span('untraced'):
+        pass
+
+    with trace_to(tmp_path / 'trace.json'):
+        pass
+
+    assert json.loads((tmp_path / 'trace.json').read_text())['traceEvents'] == []
+
+
+def test_traced_requests_do_not_leak_upload_tokens(tmp_path):
+    response = requests.Response()
+    response.status_code = 201
+    response.elapsed = timedelta(seconds=0.5)
+    response.url = 'https://inst-fs-iad-prod.inscloudgate.net/files?token=eyJhbGciOi.abc'
+    response.request = requests.Request('POST', response.url).prepare()
+
+    with trace_to(tmp_path / 'trace.json'):
+        trace_response(response)
+
+    trace = (tmp_path / 'trace.json').read_text()
+    assert 'eyJhbGciOi' not in trace
+    event, = [event for event in json.loads(trace)['traceEvents'] if event['ph'] == 'X']
+    assert event['name'] == 'POST 201'
+    assert event['args'] == {'endpoint': 'inst-fs-iad-prod.inscloudgate.net/files'}
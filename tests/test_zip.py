@@ -0,0 +1,41 @@
+import hashlib
+import zipfile
+
+from mdxcanvas.deploy.zip import _write_files
+from mdxcanvas.util import CHUNK_SIZE, hash_file
+
+
+def test_hash_file_reads_in_chunks(tmp_path):
+    path = tmp_path / 'data.bin'
+    data = bytes(range(256)) * (CHUNK_SIZE // 100)
+    path.write_bytes(data)
+
+    assert hash_file(path) == hashlib.md5(data).hexdigest()
+
+
+def test_zip_normalizes_text_and_keeps_binary_files(tmp_path):
+    (tmp_path / 'notes.txt').write_bytes(b'one\r\ntwo\n' * CHUNK_SIZE)
+    binary = b'\xff\xfe\r\n' * CHUNK_SIZE
+    (tmp_path / 'image.bin').write_bytes(binary)
+
+    _write_files({'notes.txt': 'notes.txt', '/data/image.bin': 'image.bin'}, str(tmp_path / 'out.zip'), tmp_path)
+
+    with zipfile.ZipFile(tmp_path / 'out.zip') as zipf:
+        assert zipf.namelist() == ['data/image.bin', 'notes.txt']
+        assert zipf.read('notes.txt') == b'one\ntwo\n' * CHUNK_SIZE
+        assert zipf.read('data/image.bin') == binary
+
+
+def test_zip_decides_text_from_the_first_chunk(tmp_path):
+    # A character split by the end of the first chunk
+    split = b'a' * (CHUNK_SIZE - 1) + 'é\r\n'.encode('utf-8')
+    (tmp_path / 'split.txt').write_bytes(split)
+    # Bytes that are not UTF-8 after a text first chunk
+    tail = b'one\r\n' * CHUNK_SIZE + b'\xff\xfe\r\n'
+    (tmp_path / 'tail.txt').write_bytes(tail)
+
+    _write_files({'split.txt': 'split.txt', 'tail.txt': 'tail.txt'}, str(tmp_path / 'out.zip'), tmp_path)
+
+    with zipfile.ZipFile(tmp_path / 'out.zip') as zipf:
+        assert zipf.read('split.txt') == split.replace(b'\r\n', b'\n')
+        assert zipf.read('tail.txt') == tail.replace(b'\r\n', b'\n')